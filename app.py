@@ -1,25 +1,13 @@
-from flask import Flask, send_from_directory, request, jsonify
-from flask_cors import CORS
-from backend.app import create_app
+import logging
 import os
 
-# Create the Flask app
-app = create_app()
+# Startup timings and slow-request reports are logged at INFO/WARNING
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO'), format='%(asctime)s %(levelname)s %(name)s: %(message)s')
 
-# Configure CORS for production - allow frontend domain
-CORS(app, origins=[
-    "http://localhost:3000",
-    "https://college-football-frontend.onrender.com",
-    "https://your-custom-domain.com"
-], supports_credentials=True, allow_headers=['Content-Type', 'Authorization'], methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
+from backend.app import create_app
 
-# Get database URL from environment
-DATABASE_URL = os.environ.get('DATABASE_URL')
-if DATABASE_URL:
-    print(f"🔗 Using database URL: {DATABASE_URL}")
-    app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URL
-else:
-    print("⚠️  No DATABASE_URL found, using default")
+# Create the Flask app (DATABASE_URL, CORS_ORIGINS and BOOT_MODE are read by create_app)
+app = create_app()
 
 # Health check endpoint for Render
 @app.route('/health')
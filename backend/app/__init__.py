@@ -1,12 +1,36 @@
+import time
+_import_started = time.perf_counter()
+
+import logging
+import os
 from flask import Flask
-from flask_cors import CORS
-from flask_migrate import Migrate
 from .models import db
 from .auth import auth_bp
 from .vote import vote_bp
-import os
+from .tally import rebuild_tallies_command, cumulative_tally
+from .catalog import team_catalog
+from .cache import response_cache
+from .ballots import convert_ballots_command
+from .export import export_ballots_command
+from .snapshots import freeze_week_command
+from .teams import seed_teams_command
+from .synthetic import generate_season_command
+from .maintenance import clear_command
+from .ingest import ballot_writer
+from .passwords import password_hasher
+from .identity import identity_cache
+from .scoring import scoring_engine
+from . import metrics, conditional
+
+_import_seconds = time.perf_counter() - _import_started
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORS_ORIGINS = 'http://localhost:3000,https://college-football-frontend.onrender.com,https://your-custom-domain.com'
 
-def create_app():
+def create_app(test_config=None):
+    timings = {'imports': _import_seconds}
+    phase_started = time.perf_counter()
     app = Flask(__name__)
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-key-change-in-production')
     
@@ -21,16 +45,115 @@ def create_app():
     app.config['SQLALCHEMY_DATABASE_URI'] = database_url
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
+    # Seconds between checks of the team catalog version (see catalog.py)
+    app.config['TEAM_CATALOG_CHECK_INTERVAL'] = int(os.environ.get('TEAM_CATALOG_CHECK_INTERVAL', 30))
+    
+    # Consensus response cache bounds (see cache.py)
+    app.config['RESPONSE_CACHE_TTL'] = int(os.environ.get('RESPONSE_CACHE_TTL', 60))
+    app.config['RESPONSE_CACHE_MAX_ENTRIES'] = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 512))
+    # Smaller versioned responses are sent uncompressed
+    app.config['COMPRESS_MIN_BYTES'] = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))
+    
+    # Ballot layout: 'rows' (one Vote per rank) or 'packed' (one Ballot per user/week)
+    app.config['BALLOT_STORAGE'] = os.environ.get('BALLOT_STORAGE', 'rows')
+    
+    # Ballot ingestion: 'sync' writes in the request, 'async' queues for a background writer (see ingest.py)
+    app.config['BALLOT_INGEST_MODE'] = os.environ.get('BALLOT_INGEST_MODE', 'sync')
+    app.config['BALLOT_QUEUE_SIZE'] = int(os.environ.get('BALLOT_QUEUE_SIZE', 10000))
+    app.config['BALLOT_QUEUE_TIMEOUT'] = float(os.environ.get('BALLOT_QUEUE_TIMEOUT', 0.25))
+    app.config['BALLOT_BATCH_SIZE'] = int(os.environ.get('BALLOT_BATCH_SIZE', 200))
+    app.config['BALLOT_BATCH_LINGER_MS'] = int(os.environ.get('BALLOT_BATCH_LINGER_MS', 20))
+    
+    # Requests above either threshold are logged with their SQL (see metrics.py)
+    app.config['METRICS_SLOW_STATEMENTS'] = int(os.environ.get('METRICS_SLOW_STATEMENTS', 25))
+    app.config['METRICS_SLOW_REQUEST_MS'] = int(os.environ.get('METRICS_SLOW_REQUEST_MS', 500))
+    app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+    
+    # Session identity cache bounds (see identity.py)
+    app.config['IDENTITY_CACHE_TTL'] = int(os.environ.get('IDENTITY_CACHE_TTL', 60))
+    app.config['IDENTITY_CACHE_MAX_ENTRIES'] = int(os.environ.get('IDENTITY_CACHE_MAX_ENTRIES', 10000))
+    
+    # Password hashing: Werkzeug method string (work factor) and the process pool that runs it (see passwords.py)
+    app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    app.config['PASSWORD_HASH_MAX_PENDING'] = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 8))
+    
+    # Week warmed at worker start (see gunicorn.conf.py); unset means the latest week with ballots
+    app.config['CURRENT_WEEK'] = int(os.environ['CURRENT_WEEK']) if os.environ.get('CURRENT_WEEK') else None
+    
+    # 'production' trusts migrations for the schema and skips create_all (see README)
+    app.config['BOOT_MODE'] = os.environ.get('BOOT_MODE', 'development')
+    
+    # Frontend origins allowed to make credentialed requests
+    app.config['CORS_ORIGINS'] = [o.strip() for o in os.environ.get('CORS_ORIGINS', DEFAULT_CORS_ORIGINS).split(',') if o.strip()]
+    
+    if test_config:
+        app.config.update(test_config)
+    production = app.config['BOOT_MODE'] == 'production'
+    phase_started = _phase(timings, 'config', phase_started)
+    
     # Initialize extensions
     db.init_app(app)
-    migrate = Migrate(app, db)
+    # Process-local caches belong to a single app/database; start them empty
+    team_catalog.clear()
+    cumulative_tally.clear()
+    scoring_engine.clear()
+    response_cache.clear()
+    response_cache.configure(app.config['RESPONSE_CACHE_MAX_ENTRIES'], app.config['RESPONSE_CACHE_TTL'])
+    identity_cache.clear()
+    identity_cache.configure(app.config['IDENTITY_CACHE_MAX_ENTRIES'], app.config['IDENTITY_CACHE_TTL'])
+    ballot_writer.init_app(app)
+    password_hasher.init_app(app)
+    metrics.init_app(app)
+    metrics.register_stats('response_cache_events', 'Consensus response cache counters', response_cache.stats)
+    metrics.register_stats('ballot_ingest_events', 'Async ballot ingestion counters and queue depth', ballot_writer.stats)
+    metrics.register_stats('identity_cache_events', 'Session identity cache counters', identity_cache.stats)
+    metrics.register_stats('password_hash_events', 'Password hashing pool counters', password_hasher.stats)
+    metrics.register_stats('conditional_response_events', 'Versioned responses by outcome (304 or encoding)', conditional.stats)
+    phase_started = _phase(timings, 'extensions', phase_started)
+    
+    # Flask-Migrate pulls in Alembic; web workers in production never need it
+    if not production or os.environ.get('FLASK_RUN_FROM_CLI'):
+        from flask_migrate import Migrate
+        Migrate(app, db, render_as_batch=True)
+        phase_started = _phase(timings, 'migrate', phase_started)
+    
+    if app.config['CORS_ORIGINS']:
+        from flask_cors import CORS
+        CORS(app, origins=app.config['CORS_ORIGINS'], supports_credentials=True,
+             allow_headers=['Content-Type', 'Authorization'], methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
     
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(vote_bp, url_prefix='/api/vote')
     
-    # Create database tables
-    with app.app_context():
-        db.create_all()
+    # CLI commands (flask --app app <command>)
+    app.cli.add_command(rebuild_tallies_command)
+    app.cli.add_command(convert_ballots_command)
+    app.cli.add_command(export_ballots_command)
+    app.cli.add_command(freeze_week_command)
+    app.cli.add_command(seed_teams_command)
+    app.cli.add_command(generate_season_command)
+    app.cli.add_command(clear_command)
+    phase_started = _phase(timings, 'blueprints', phase_started)
+    
+    # Create database tables (development only: one reflection round-trip per table on every boot)
+    if not production:
+        with app.app_context():
+            db.create_all()
+        phase_started = _phase(timings, 'create_all', phase_started)
     
+    app.extensions['startup_timings'] = timings
+    logger.info('Started in %.1f ms (%s mode, database %s): %s',
+                sum(timings.values()) * 1000, app.config['BOOT_MODE'], _safe_url(app.config['SQLALCHEMY_DATABASE_URI']),
+                ', '.join(f'{name} {seconds * 1000:.1f} ms' for name, seconds in timings.items()))
     return app
+
+def _phase(timings, name, started):
+    now = time.perf_counter()
+    timings[name] = now - started
+    return now
+
+def _safe_url(url):
+    from sqlalchemy.engine import make_url
+    return make_url(url).render_as_string(hide_password=True)
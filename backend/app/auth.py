@@ -1,15 +1,23 @@
 from flask import Blueprint, request, jsonify, session
 from .models import db, User
+from .passwords import password_hasher, HasherBusy
+from .identity import identity_cache, current_identity, Identity
 
 auth_bp = Blueprint('auth', __name__)
 
+def _busy():
+    return jsonify({'error': 'Server busy, please retry'}), 503, {'Retry-After': '1'}
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     data = request.json
     if User.query.filter_by(username=data['username']).first():
         return jsonify({'error': 'Username taken'}), 400
-    user = User(username=data['username'])
-    user.set_password(data['password'])
+    try:
+        password_hash = password_hasher.hash(data['password'])
+    except HasherBusy:
+        return _busy()
+    user = User(username=data['username'], password_hash=password_hash)
     db.session.add(user)
     db.session.commit()
     return jsonify({'message': 'Registered successfully'})
@@ -18,9 +26,21 @@ def register():
 def login():
     data = request.json
     user = User.query.filter_by(username=data['username']).first()
-    if not user or not user.check_password(data['password']):
-        return jsonify({'error': 'Invalid credentials'}), 401
+    try:
+        if not user or not password_hasher.verify(user.password_hash, data['password']):
+            return jsonify({'error': 'Invalid credentials'}), 401
+    except HasherBusy:
+        return _busy()
+    if password_hasher.needs_rehash(user.password_hash):
+        # Upgrade to the current work factor while we have the plaintext; retry next login if busy
+        try:
+            user.password_hash = password_hasher.hash(data['password'])
+            db.session.commit()
+            password_hasher.rehashed()
+        except HasherBusy:
+            pass
     session['user_id'] = user.id
+    identity_cache.put(Identity(user.id, user.username))
     return jsonify({'message': 'Logged in'})
 
 @auth_bp.route('/logout', methods=['POST'])
@@ -32,7 +52,7 @@ def logout():
 def get_current_user():
     if 'user_id' not in session:
         return jsonify({'error': 'Not logged in'}), 401
-    user = User.query.get(session['user_id'])
-    if not user:
+    identity = current_identity()
+    if identity is None:
         return jsonify({'error': 'User not found'}), 404
-    return jsonify({'username': user.username, 'id': user.id})
+    return jsonify({'username': identity.username, 'id': identity.id})
@@ -0,0 +1,206 @@
+"""Ballot storage behind the two supported layouts.
+
+'rows' (default) keeps one Vote row per ranked team. 'packed' keeps one
+Ballot row per (user, week) whose team_ids column holds the ranked team ids
+as little-endian int32s. BALLOT_STORAGE selects the layout; everything that
+reads or writes ballots goes through this module.
+"""
+
+import struct
+from itertools import groupby
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import delete, func, insert, select
+from .models import db, Vote, Ballot, User
+
+PACKED = 'packed'
+ROWS = 'rows'
+
+def storage_mode():
+    return current_app.config.get('BALLOT_STORAGE', ROWS)
+
+def pack_team_ids(team_ids):
+    return struct.pack(f'<{len(team_ids)}i', *team_ids)
+
+def unpack_team_ids(blob):
+    return list(struct.unpack(f'<{len(blob) // 4}i', blob))
+
+def lock_users(user_ids):
+    """Lock the users' rows (SELECT ... FOR UPDATE, in id order) until the transaction ends.
+
+    Two concurrent replaces of the same user's ballot would otherwise both
+    DELETE before either INSERTs, and the second INSERT would hit the unique
+    constraint. SQLite ignores FOR UPDATE; it only ever runs one writer.
+    """
+    db.session.execute(select(User.id).where(User.id.in_(sorted(set(user_ids)))).order_by(User.id).with_for_update())
+
+def replace_ballot(user_id, week, team_ids, mode=None):
+    """Store team_ids (in rank order) as the user's ballot for week; returns the old {team_id: rank}
+
+    Callers that may race another request for the same user lock_users() first.
+    """
+    if (mode or storage_mode()) == PACKED:
+        old = db.session.execute(
+            delete(Ballot).where(Ballot.user_id == user_id, Ballot.week == week).returning(Ballot.team_ids)
+        ).scalar()
+        if team_ids:
+            db.session.execute(insert(Ballot), [
+                {'user_id': user_id, 'week': week, 'team_ids': pack_team_ids(team_ids)}
+            ])
+        return {team_id: rank for rank, team_id in enumerate(unpack_team_ids(old or b''), start=1)}
+
+    old_ranks = dict(db.session.execute(
+        delete(Vote).where(Vote.user_id == user_id, Vote.week == week).returning(Vote.team_id, Vote.rank)
+    ).all())
+    if team_ids:
+        db.session.execute(insert(Vote), [
+            {'user_id': user_id, 'week': week, 'team_id': team_id, 'rank': rank}
+            for rank, team_id in enumerate(team_ids, start=1)
+        ])
+    return old_ranks
+
+def iter_ballots(week=None, mode=None):
+    """Yield (user_id, week, [team_ids in rank order]) ordered by week, then user"""
+    if (mode or storage_mode()) == PACKED:
+        query = db.session.query(Ballot.user_id, Ballot.week, Ballot.team_ids)
+        if week is not None:
+            query = query.filter(Ballot.week == week)
+        for user_id, w, blob in query.order_by(Ballot.week, Ballot.user_id).yield_per(1000):
+            yield user_id, w, unpack_team_ids(blob)
+        return
+
+    query = db.session.query(Vote.user_id, Vote.week, Vote.team_id)
+    if week is not None:
+        query = query.filter(Vote.week == week)
+    rows = query.order_by(Vote.week, Vote.user_id, Vote.rank).yield_per(5000)
+    for (user_id, w), ballot in groupby(rows, key=lambda r: (r[0], r[1])):
+        yield user_id, w, [team_id for _, _, team_id in ballot]
+
+def user_ballots(user_id):
+    """{week: [team_ids in rank order]} for one user"""
+    if storage_mode() == PACKED:
+        rows = db.session.query(Ballot.week, Ballot.team_ids).filter(Ballot.user_id == user_id).all()
+        return {week: unpack_team_ids(blob) for week, blob in rows}
+
+    history = {}
+    rows = db.session.query(Vote.week, Vote.team_id).filter(Vote.user_id == user_id).order_by(Vote.week, Vote.rank)
+    for week, team_id in rows:
+        history.setdefault(week, []).append(team_id)
+    return history
+
+def delete_user_ballots(user_ids, mode=None):
+    """Delete every ballot of the given users in one statement; returns them as [(user_id, week, team_ids)]"""
+    if (mode or storage_mode()) == PACKED:
+        rows = db.session.execute(
+            delete(Ballot).where(Ballot.user_id.in_(user_ids)).returning(Ballot.user_id, Ballot.week, Ballot.team_ids)
+        ).all()
+        return [(user_id, week, unpack_team_ids(blob)) for user_id, week, blob in rows]
+
+    rows = db.session.execute(
+        delete(Vote).where(Vote.user_id.in_(user_ids)).returning(Vote.user_id, Vote.week, Vote.rank, Vote.team_id)
+    ).all()
+    rows.sort()
+    return [
+        (user_id, week, [team_id for _, _, _, team_id in ballot])
+        for (user_id, week), ballot in groupby(rows, key=lambda r: (r[0], r[1]))
+    ]
+
+def delete_week_ballots(week, limit, mode=None):
+    """Delete up to limit ballots of a week; returns how many were deleted"""
+    model = Ballot if (mode or storage_mode()) == PACKED else Vote
+    user_ids = [user_id for user_id, in db.session.query(model.user_id).filter(model.week == week).distinct().limit(limit)]
+    if user_ids:
+        db.session.execute(delete(model).where(model.week == week, model.user_id.in_(user_ids)))
+    return len(user_ids)
+
+def ballot_weeks(mode=None):
+    """Weeks that have at least one stored ballot"""
+    model = Ballot if (mode or storage_mode()) == PACKED else Vote
+    return [week for week, in db.session.query(model.week).distinct().order_by(model.week)]
+
+def iter_week_ballots_by_username(week, after=None):
+    """Yield (username, [team_ids in rank order]) for every ballot of a week, ordered by username.
+
+    Rows are fetched in chunks (a server-side cursor on PostgreSQL), so memory
+    does not grow with the number of voters. after skips usernames <= after.
+    """
+    if storage_mode() == PACKED:
+        query = db.session.query(User.username, Ballot.team_ids).join(User).filter(Ballot.week == week)
+        if after is not None:
+            query = query.filter(User.username > after)
+        for username, blob in query.order_by(User.username).yield_per(1000):
+            yield username, unpack_team_ids(blob)
+        return
+
+    query = db.session.query(User.username, Vote.team_id).join(User).filter(Vote.week == week)
+    if after is not None:
+        query = query.filter(User.username > after)
+    rows = query.order_by(User.username, Vote.rank).yield_per(5000)
+    for username, ballot in groupby(rows, key=lambda r: r[0]):
+        yield username, [team_id for _, team_id in ballot]
+
+def ballot_week_stats():
+    """[(week, voters, total_votes)] ordered by week"""
+    if storage_mode() == PACKED:
+        return db.session.query(
+            Ballot.week,
+            func.count(Ballot.user_id),
+            func.sum(func.length(Ballot.team_ids) / 4)
+        ).group_by(Ballot.week).order_by(Ballot.week).all()
+
+    return db.session.query(
+        Vote.week,
+        func.count(Vote.user_id.distinct()),
+        func.count(Vote.id)
+    ).group_by(Vote.week).order_by(Vote.week).all()
+
+def convert_ballots(to_mode, batch_size=1000, keep_source=False):
+    """Copy every ballot into the to_mode layout in batches; returns the number of ballots copied"""
+    from_mode = ROWS if to_mode == PACKED else PACKED
+    copied = 0
+    batch = []
+
+    def flush():
+        if to_mode == PACKED:
+            db.session.execute(insert(Ballot), [
+                {'user_id': user_id, 'week': week, 'team_ids': pack_team_ids(team_ids)}
+                for user_id, week, team_ids in batch
+            ])
+        else:
+            db.session.execute(insert(Vote), [
+                {'user_id': user_id, 'week': week, 'team_id': team_id, 'rank': rank}
+                for user_id, week, team_ids in batch
+                for rank, team_id in enumerate(team_ids, start=1)
+            ])
+        batch.clear()
+
+    source = Vote if from_mode == ROWS else Ballot
+    weeks = [week for week, in db.session.query(source.week).distinct().order_by(source.week)]
+    for week in weeks:
+        # Materialize one week at a time so inserts do not interleave with the open read cursor
+        for ballot in list(iter_ballots(week, mode=from_mode)):
+            batch.append(ballot)
+            if len(batch) >= batch_size:
+                copied += len(batch)
+                flush()
+    copied += len(batch)
+    if batch:
+        flush()
+    if not keep_source:
+        db.session.execute(delete(source))
+    return copied
+
+@click.command('convert-ballots')
+@click.argument('to_mode', type=click.Choice([PACKED, ROWS]))
+@click.option('--batch-size', type=int, default=1000, show_default=True)
+@click.option('--keep-source', is_flag=True, help='Leave the old layout in place.')
+@with_appcontext
+def convert_ballots_command(to_mode, batch_size, keep_source):
+    """Move stored ballots between the 'rows' and 'packed' layouts.
+
+    Run with the app stopped, then set BALLOT_STORAGE to the new layout.
+    """
+    copied = convert_ballots(to_mode, batch_size, keep_source)
+    db.session.commit()
+    click.echo(f"✅ Copied {copied} ballots into the '{to_mode}' layout")
@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import OrderedDict, Counter
+
+COUNTERS = ('hits', 'stale_hits', 'misses', 'recomputes', 'invalidations', 'evictions')
+
+class _Entry:
+    __slots__ = ('version', 'body', 'stored_at')
+
+    def __init__(self, version, body, stored_at):
+        self.version = version
+        self.body = body
+        self.stored_at = stored_at
+
+class ResponseCache:
+    """Bounded LRU of serialized responses with stale-while-revalidate.
+
+    An entry is fresh while its data version matches the caller's and it is
+    younger than the TTL. When it goes stale exactly one request recomputes
+    it; concurrent requests for the same key keep getting the stale body
+    (or wait for the first computation if there is none yet).
+    """
+
+    def __init__(self, max_entries=512, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._computing = {}
+        self._lock = threading.Lock()
+        self._counters = Counter()
+
+    def configure(self, max_entries=None, ttl=None):
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if ttl is not None:
+                self.ttl = ttl
+            self._evict()
+
+    def get_or_compute(self, key, version, compute):
+        """Return cached bytes for key at version, calling compute() to refresh them"""
+        return self.lookup(key, version, compute)[1]
+
+    def lookup(self, key, version, compute):
+        """Like get_or_compute, but returns (version, body) where version is that of the body served.
+
+        The version differs from the one asked for (it may be None) when a
+        stale body is served while another thread recomputes it.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version and time.monotonic() - entry.stored_at < self.ttl:
+                self._entries.move_to_end(key)
+                self._counters['hits'] += 1
+                return entry.version, entry.body
+            pending = self._computing.get(key)
+            if pending is None:
+                pending = self._computing[key] = threading.Event()
+                self._counters['misses' if entry is None else 'recomputes'] += 1
+                owner = True
+            elif entry is not None:
+                self._counters['stale_hits'] += 1
+                return entry.version, entry.body
+            else:
+                owner = False
+        if not owner:
+            # Nothing to serve yet; wait for the thread already computing this key
+            pending.wait(timeout=30)
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._counters['hits'] += 1
+                    return entry.version, entry.body
+            return version, compute()
+        try:
+            body = compute()
+            with self._lock:
+                self._entries[key] = _Entry(version, body, time.monotonic())
+                self._entries.move_to_end(key)
+                self._evict()
+            return version, body
+        finally:
+            with self._lock:
+                del self._computing[key]
+            pending.set()
+
+    def invalidate(self, match):
+        """Mark entries stale whose key satisfies match(key); stale bodies stay servable during recompute"""
+        with self._lock:
+            for key, entry in self._entries.items():
+                if match(key):
+                    entry.version = None
+                    self._counters['invalidations'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = {name: self._counters[name] for name in COUNTERS}
+            stats['entries'] = len(self._entries)
+            return stats
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters['evictions'] += 1
+
+response_cache = ResponseCache()
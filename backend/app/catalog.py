@@ -0,0 +1,62 @@
+import threading
+import time
+from collections import namedtuple
+from flask import current_app
+from .models import db, Team
+from .versions import get_version
+
+CATALOG_SCOPE = 'teams'
+
+CatalogSnapshot = namedtuple('CatalogSnapshot', ['version', 'ids_by_name', 'names_by_id', 'teams_json'])
+
+class TeamCatalog:
+    """Process-local copy of the Team table, rebuilt only when the 'teams' version changes.
+
+    The stored version is re-read at most every TEAM_CATALOG_CHECK_INTERVAL
+    seconds, so in steady state lookups never touch the database.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._checked_at = 0.0
+
+    def snapshot(self):
+        interval = current_app.config.get('TEAM_CATALOG_CHECK_INTERVAL', 30)
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < interval:
+            return snapshot
+        with self._lock:
+            # Another thread may have re-checked while we waited for the lock
+            snapshot = self._snapshot
+            if snapshot is not None and time.monotonic() - self._checked_at < interval:
+                return snapshot
+            version = get_version(CATALOG_SCOPE)
+            if snapshot is None or snapshot.version != version:
+                snapshot = self._load(version)
+                self._snapshot = snapshot
+            self._checked_at = time.monotonic()
+            return snapshot
+
+    def invalidate(self):
+        """Force a version check on the next lookup in this process"""
+        self._checked_at = 0.0
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = None
+            self._checked_at = 0.0
+
+    def _load(self, version):
+        rows = db.session.query(Team.id, Team.name, Team.conference, Team.division).order_by(Team.name).all()
+        return CatalogSnapshot(
+            version=version,
+            ids_by_name={name: team_id for team_id, name, _, _ in rows},
+            names_by_id={team_id: name for team_id, name, _, _ in rows},
+            teams_json=current_app.json.dumps(
+                [{'id': team_id, 'name': name, 'conference': conference, 'division': division}
+                 for team_id, name, conference, division in rows], separators=(',', ':')
+            ) + '\n'
+        )
+
+team_catalog = TeamCatalog()
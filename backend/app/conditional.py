@@ -0,0 +1,104 @@
+"""Conditional GET and compression for responses derived from a data version.
+
+versioned_response(key, version, render) serves render()'s JSON with a
+strong ETag built from the cache key and the data version:
+
+  * If-None-Match with that ETag gets a bodiless 304 before render() runs,
+    so a repeated poll costs only the version lookup (none for /teams,
+    whose version comes from the in-process catalog).
+  * Bodies of at least COMPRESS_MIN_BYTES go out brotli- (if the optional
+    `brotli` package is installed) or gzip-encoded, whichever the client
+    prefers. Compressed bytes live in the response cache under
+    key + (encoding,) at the same version, so each version is compressed
+    once per process.
+
+Each encoding gets its own ETag ("<tag>-gzip", "<tag>-br") because they are
+different byte sequences; If-None-Match accepts any of them, and the 304
+repeats the tag that matched so the client's stored copy is the one freshened.
+"""
+
+import gzip
+import hashlib
+import threading
+from collections import Counter
+from flask import current_app, request, has_request_context
+from .cache import response_cache
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+COUNTERS = ('not_modified', 'identity', 'gzip', 'br')
+_counters = Counter()
+_lock = threading.Lock()
+
+def _count(name):
+    with _lock:
+        _counters[name] += 1
+
+def stats():
+    with _lock:
+        return {name: _counters[name] for name in COUNTERS}
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+def _compress(encoding, body):
+    data = body.encode('utf-8') if isinstance(body, str) else body
+    if encoding == 'br':
+        return _brotli().compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+def etag_for(key, version):
+    """Strong entity tag (unquoted) for a cache key at a data version"""
+    return hashlib.sha1(repr((key, version)).encode('utf-8')).hexdigest()[:24]
+
+def _not_modified(tag):
+    """The If-None-Match candidate matching tag (ignoring the encoding suffix), or None"""
+    if not has_request_context():
+        # Called to warm the cache
+        return None
+    if_none_match = request.if_none_match
+    if if_none_match.star_tag:
+        return tag
+    # Weak comparison, ignoring the encoding suffix
+    for candidate in if_none_match.as_set(include_weak=True):
+        if candidate.split('-')[0] == tag:
+            return candidate
+    return None
+
+def _encoding(size):
+    if size < current_app.config['COMPRESS_MIN_BYTES'] or not has_request_context():
+        return None
+    offered = ['br', 'gzip'] if _brotli() is not None else ['gzip']
+    return request.accept_encodings.best_match(offered)
+
+def versioned_response(key, version, render):
+    """JSON response for render() at version, with ETag/304 handling and cached compression"""
+    tag = etag_for(key, version)
+    headers = {'Vary': 'Accept-Encoding', 'Cache-Control': 'no-cache'}
+    matched = _not_modified(tag)
+    if matched is not None:
+        _count('not_modified')
+        response = current_app.response_class(status=304, headers=headers)
+        # Echo the client's tag so a cache freshens the stored response with that encoding
+        response.set_etag(matched)
+        return response
+
+    served, body = response_cache.lookup(key, version, render)
+    encoding = _encoding(len(body))
+    if encoding is not None:
+        if served == version:
+            body = response_cache.get_or_compute(key + (encoding,), version, lambda: _compress(encoding, body))
+        else:
+            body = _compress(encoding, body)
+        headers['Content-Encoding'] = encoding
+    _count(encoding or 'identity')
+    response = current_app.response_class(body, mimetype='application/json', headers=headers)
+    # A stale body (served while another thread recomputes) must not carry the new version's tag
+    if served == version:
+        response.set_etag(f'{tag}-{encoding}' if encoding else tag)
+    return response
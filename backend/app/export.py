@@ -0,0 +1,199 @@
+"""Columnar ballot archive for offline analysis.
+
+One row per ranked team, stored column-wise in row groups so the writer
+never holds more than one group in memory and a reader can mmap the file:
+
+    header     b'CFBALLOT', u16 format version, u16 column count,
+               per column: u8 name length, name, u8 struct type code
+    teams      u32 count, per team: i32 id, u16 name length, UTF-8 name
+    groups     u32 row count, then each column's values back to back
+               (little-endian, widest first), zero-padded to 4 bytes
+    trailer    u32 0, u64 total rows
+
+Every group starts 4-byte aligned, so the int32 columns can be viewed in
+place (memoryview.cast / numpy.frombuffer) without copying.
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from datetime import date
+import click
+from flask.cli import with_appcontext
+from .models import db, Team
+from .ballots import iter_ballots
+
+MAGIC = b'CFBALLOT'
+FORMAT_VERSION = 1
+# (name, struct code): user/team ids int32, week uint16, rank uint8
+COLUMNS = (('user_id', 'i'), ('team_id', 'i'), ('week', 'H'), ('rank', 'B'))
+CHUNK_ROWS = 65536
+
+def _pad(n):
+    return b'\0' * (-n % 4)
+
+def _header(teams):
+    parts = [MAGIC, struct.pack('<HH', FORMAT_VERSION, len(COLUMNS))]
+    for name, code in COLUMNS:
+        parts.append(struct.pack('<B', len(name)) + name.encode() + code.encode())
+    parts.append(struct.pack('<I', len(teams)))
+    for team_id, name in teams:
+        encoded = name.encode()
+        parts.append(struct.pack('<iH', team_id, len(encoded)) + encoded)
+    header = b''.join(parts)
+    return header + _pad(len(header))
+
+def _group(columns):
+    parts = [struct.pack('<I', len(columns[0]))]
+    for values in columns:
+        if sys.byteorder == 'big':
+            values.byteswap()
+        parts.append(values.tobytes())
+    body = b''.join(parts)
+    return body + _pad(len(body))
+
+def iter_archive(week=None, chunk_rows=CHUNK_ROWS):
+    """Yield the archive for one week (or every week) as bytes, one row group at a time"""
+    teams = db.session.query(Team.id, Team.name).order_by(Team.id).all()
+    yield _header(teams)
+    total = 0
+    columns = [array(code) for _, code in COLUMNS]
+    user_ids, team_ids, weeks, ranks = columns
+    for user_id, w, ballot in iter_ballots(week):
+        n = len(ballot)
+        user_ids.extend([user_id] * n)
+        team_ids.extend(ballot)
+        weeks.extend([w] * n)
+        ranks.extend(range(1, n + 1))
+        if len(user_ids) >= chunk_rows:
+            total += len(user_ids)
+            yield _group(columns)
+            columns = [array(code) for _, code in COLUMNS]
+            user_ids, team_ids, weeks, ranks = columns
+    if user_ids:
+        total += len(user_ids)
+        yield _group(columns)
+    yield struct.pack('<IQ', 0, total)
+
+def archive_filename(week=None):
+    return f"ballots-{f'week{week}' if week is not None else 'season'}-{date.today().isoformat()}.cfb"
+
+class BallotArchive:
+    """Read-only, memory-mapped view of an archive written by iter_archive.
+
+        with BallotArchive('ballots.cfb') as archive:
+            names = archive.teams
+            for group in archive.row_groups():
+                group['team_id']  # memoryview of int32s, no copy
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError('Not a ballot archive (empty file)')
+        self._view = memoryview(self._map)
+        self._exported = []
+        self._groups = None
+        try:
+            self.columns, self.teams, self._groups_start = self._read_header()
+        except Exception:
+            self.close()
+            raise
+
+    def _read_header(self):
+        buf = self._map
+        if buf[:8] != MAGIC:
+            raise ValueError('Not a ballot archive')
+        version, column_count = struct.unpack_from('<HH', buf, 8)
+        if version != FORMAT_VERSION:
+            raise ValueError(f'Unsupported archive version {version}')
+        pos, columns = 12, []
+        for _ in range(column_count):
+            length = buf[pos]
+            columns.append((buf[pos + 1:pos + 1 + length].decode(), chr(buf[pos + 1 + length])))
+            pos += length + 2
+        team_count, = struct.unpack_from('<I', buf, pos)
+        pos += 4
+        teams = {}
+        for _ in range(team_count):
+            team_id, length = struct.unpack_from('<iH', buf, pos)
+            teams[team_id] = buf[pos + 6:pos + 6 + length].decode()
+            pos += 6 + length
+        return columns, teams, pos + (-pos % 4)
+
+    def _scan(self):
+        # (offset, rows) of every group, found by hopping over the fixed-width columns
+        if self._groups is None:
+            width = sum(struct.calcsize(code) for _, code in self.columns)
+            groups, pos = [], self._groups_start
+            while True:
+                rows, = struct.unpack_from('<I', self._map, pos)
+                if rows == 0:
+                    break
+                groups.append((pos + 4, rows))
+                size = 4 + rows * width
+                pos += size + (-size % 4)
+            self._groups = groups
+        return self._groups
+
+    def __len__(self):
+        return sum(rows for _, rows in self._scan())
+
+    def row_groups(self):
+        """Yield {column: memoryview} per row group, viewing the mapped file in place (valid until close)"""
+        for pos, rows in self._scan():
+            group = {}
+            for name, code in self.columns:
+                size = rows * struct.calcsize(code)
+                raw = self._view[pos:pos + size]
+                values = raw.cast(code)
+                self._exported += (values, raw)
+                if sys.byteorder == 'big':
+                    values = array(code, values)
+                    values.byteswap()
+                group[name] = values
+                pos += size
+            yield group
+
+    def column(self, name):
+        """One column for the whole archive as an array (copied)"""
+        code = dict(self.columns)[name]
+        values = array(code)
+        for group in self.row_groups():
+            values.extend(group[name])
+        return values
+
+    def close(self):
+        """Unmap the file; views handed out by row_groups() become unusable"""
+        for view in self._exported:
+            view.release()
+        self._exported = []
+        self._view.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+@click.command('export-ballots')
+@click.argument('output', type=click.Path(dir_okay=False, writable=True), required=False)
+@click.option('--week', type=int, default=None, help='Only export this week (default: the whole season)')
+@with_appcontext
+def export_ballots_command(output, week):
+    """Write every ballot (or one week's) to a columnar archive file"""
+    output = output or archive_filename(week)
+    size = 0
+    with open(output, 'wb') as f:
+        for chunk in iter_archive(week):
+            f.write(chunk)
+            size += len(chunk)
+    with BallotArchive(output) as archive:
+        rows = len(archive)
+    click.echo(f"✅ Wrote {rows} ranked rows ({size / 1024:.0f} KB) to {output}")
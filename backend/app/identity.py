@@ -0,0 +1,119 @@
+"""Process-local cache of user id -> identity for session checks.
+
+/api/auth/me and the logged-in vote routes only need to know that the
+session's user still exists and what it is called, so they ask
+current_identity() instead of loading the User row. Entries live for
+IDENTITY_CACHE_TTL seconds in an LRU of IDENTITY_CACHE_MAX_ENTRIES.
+
+Renaming or deleting a User through the ORM invalidates its entry once the
+transaction commits. Bulk UPDATE/DELETE statements bypass the ORM events and
+must call invalidate_on_commit() with the ids they touch. Other worker
+processes catch up within the TTL; until then a write for a user they still
+have cached fails its foreign key, and user_gone() tells the route to answer
+401 instead of 500.
+"""
+
+import threading
+import time
+from collections import OrderedDict, Counter, namedtuple
+from flask import session
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from .models import db, User
+
+Identity = namedtuple('Identity', 'id username')
+
+class IdentityCache:
+    def __init__(self, max_entries=10000, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = Counter()
+
+    def configure(self, max_entries=None, ttl=None):
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if ttl is not None:
+                self.ttl = ttl
+            self._evict()
+
+    def get(self, user_id):
+        """Identity for user_id, or None if there is no such user"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and time.monotonic() - entry[1] < self.ttl:
+                self._entries.move_to_end(user_id)
+                self._counters['hits'] += 1
+                return entry[0]
+            self._counters['misses'] += 1
+        row = db.session.query(User.id, User.username).filter(User.id == user_id).first()
+        if row is None:
+            return None
+        identity = Identity(row.id, row.username)
+        self.put(identity)
+        return identity
+
+    def put(self, identity):
+        with self._lock:
+            self._entries[identity.id] = (identity, time.monotonic())
+            self._entries.move_to_end(identity.id)
+            self._evict()
+
+    def invalidate(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                if self._entries.pop(user_id, None) is not None:
+                    self._counters['invalidations'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = {name: self._counters[name] for name in ('hits', 'misses', 'invalidations', 'evictions')}
+            stats['entries'] = len(self._entries)
+        return stats
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters['evictions'] += 1
+
+identity_cache = IdentityCache()
+
+def current_identity():
+    """Identity of the logged-in user, or None (not logged in, or the user is gone)"""
+    user_id = session.get('user_id')
+    if user_id is None:
+        return None
+    return identity_cache.get(user_id)
+
+def invalidate_on_commit(user_ids):
+    """Drop these users' entries once the current transaction commits (for bulk UPDATE/DELETE)"""
+    db.session.info.setdefault('changed_user_ids', set()).update(user_ids)
+
+def user_gone(identity):
+    """After a failed write: True (and the entry dropped) if identity's user no longer exists"""
+    if db.session.query(User.id).filter(User.id == identity.id).first() is not None:
+        return False
+    identity_cache.invalidate([identity.id])
+    return True
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_users(db_session, flush_context):
+    changed = db_session.info.setdefault('changed_user_ids', set())
+    changed.update(obj.id for obj in db_session.dirty if isinstance(obj, User))
+    changed.update(obj.id for obj in db_session.deleted if isinstance(obj, User))
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_changed_users(db_session):
+    changed = db_session.info.pop('changed_user_ids', None)
+    if changed:
+        identity_cache.invalidate(changed)
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_changed_users(db_session):
+    db_session.info.pop('changed_user_ids', None)
@@ -0,0 +1,196 @@
+"""Ballot writes, either inline in the request or through a write-behind queue.
+
+With BALLOT_INGEST_MODE=async, submit_vote validates the ballot, puts it on a
+bounded in-process queue and answers 202. A background thread drains the
+queue in batches: ballots from the same user and week collapse to the last
+one, and each batch is written (ballots plus one tally upsert per week) in a
+single transaction. Ballots for a week that was frozen after they were queued
+are dropped when the batch is written.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from .models import db
+from .ballots import lock_users, replace_ballot
+from .tally import ballot_delta, merge_delta, apply_tally_delta
+from .pairwise import pair_delta, merge_pair_delta, apply_pair_delta
+from .snapshots import is_frozen
+from .cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+def write_ballots(ballots):
+    """Store [(user_id, week, team_ids)] and their tally and pair-count changes in the current transaction.
+
+    The users' rows are locked first, so concurrent resubmissions of one
+    user's ballot run one after the other. Returns the set of weeks whose
+    consensus changed.
+    """
+    deltas = {}
+    pair_deltas = {}
+    lock_users([user_id for user_id, _, _ in ballots])
+    for user_id, week, team_ids in ballots:
+        old_ranks = replace_ballot(user_id, week, team_ids)
+        new_ranks = {team_id: rank for rank, team_id in enumerate(team_ids, start=1)}
+        merge_delta(deltas.setdefault(week, {}), ballot_delta(old_ranks, new_ranks))
+        merge_pair_delta(pair_deltas.setdefault(week, {}), pair_delta(old_ranks, new_ranks))
+    for week, delta in deltas.items():
+        apply_tally_delta(week, delta)
+        apply_pair_delta(week, pair_deltas[week])
+    return {week for week, delta in deltas.items() if delta}
+
+def invalidate_ballot_caches(weeks):
+    """Mark cached consensus/leaderboard responses stale after a committed ballot write"""
+    if weeks:
+        response_cache.invalidate(lambda key: (key[0] == 'consensus' and key[1] in weeks) or key[0] == 'leaderboard')
+
+class BallotWriter:
+    """Bounded queue plus a background thread that group-commits queued ballots"""
+
+    COUNTERS = ('queued', 'rejected', 'coalesced', 'closed', 'written', 'batches', 'failed')
+
+    def __init__(self):
+        self._app = None
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._counters = Counter()
+        # Counters are updated from request threads and the writer thread
+        self._counters_lock = threading.Lock()
+
+    def init_app(self, app):
+        self._app = app
+        if not hasattr(self, '_atexit_registered'):
+            atexit.register(self.stop)
+            self._atexit_registered = True
+
+    def submit(self, user_id, week, team_ids):
+        """Queue a validated ballot; returns False when the queue stays full (caller should shed load)"""
+        self._ensure_started()
+        timeout = self._app.config['BALLOT_QUEUE_TIMEOUT']
+        try:
+            self._queue.put((user_id, week, team_ids), timeout=timeout)
+        except queue.Full:
+            self._count('rejected')
+            return False
+        self._count('queued')
+        return True
+
+    def flush(self, timeout=30):
+        """Block until every queued ballot has been written (or timeout seconds pass)"""
+        if self._queue is None:
+            return True
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def stop(self, timeout=30):
+        """Drain the queue and stop the writer thread (registered with atexit)"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self.flush(timeout)
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self):
+        with self._counters_lock:
+            stats = {name: self._counters[name] for name in self.COUNTERS}
+        stats['depth'] = self._queue.qsize() if self._queue is not None else 0
+        return stats
+
+    def _count(self, name, n=1):
+        with self._counters_lock:
+            self._counters[name] += n
+
+    def _ensure_started(self):
+        # Started lazily (and re-created after fork) so a preloaded master never owns the thread
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self._app.config['BALLOT_QUEUE_SIZE'])
+            self._stopping.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='ballot-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        batch_size = self._app.config['BALLOT_BATCH_SIZE']
+        linger = self._app.config['BALLOT_BATCH_LINGER_MS'] / 1000
+        while not (self._stopping.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            # Give concurrent submitters a moment to join this transaction
+            deadline = time.monotonic() + linger
+            while len(batch) < batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        latest = {}
+        for user_id, week, team_ids in batch:
+            # Re-insert so dict order follows the latest submission
+            latest.pop((user_id, week), None)
+            latest[(user_id, week)] = team_ids
+        self._count('coalesced', len(batch) - len(latest))
+        ballots = [(user_id, week, team_ids) for (user_id, week), team_ids in latest.items()]
+
+        weeks = set()
+        with self._app.app_context():
+            try:
+                # submit_vote checked this when the ballot was queued; the week may have closed since
+                closed = {week for week in {week for _, week, _ in ballots} if is_frozen(week)}
+                if closed:
+                    open_ballots = [ballot for ballot in ballots if ballot[1] not in closed]
+                    self._count('closed', len(ballots) - len(open_ballots))
+                    logger.warning('Dropping %d queued ballots for frozen weeks %s',
+                                   len(ballots) - len(open_ballots), sorted(closed))
+                    ballots = open_ballots
+                weeks = write_ballots(ballots)
+                db.session.commit()
+                self._count('written', len(ballots))
+            except Exception:
+                db.session.rollback()
+                logger.exception('Batched ballot write failed; retrying %d ballots one by one', len(ballots))
+                for ballot in ballots:
+                    try:
+                        if is_frozen(ballot[1]):
+                            self._count('closed')
+                            continue
+                        weeks |= write_ballots([ballot])
+                        db.session.commit()
+                        self._count('written')
+                    except Exception:
+                        db.session.rollback()
+                        self._count('failed')
+                        logger.exception('Dropping ballot for user %s week %s', ballot[0], ballot[1])
+            finally:
+                db.session.remove()
+        self._count('batches')
+        invalidate_ballot_caches(weeks)
+
+ballot_writer = BallotWriter()
@@ -0,0 +1,145 @@
+"""Bulk cleanup that can run next to live traffic.
+
+`flask --app app clear users|week|season` deletes in bounded batches. Each
+batch is its own short transaction, so row locks are held briefly and the
+WAL is written a little at a time. --pause sleeps between batches to leave
+room for other traffic. The derived tables follow the ballots:
+
+  * users  - each batch deletes some users' ballots and subtracts them from
+             the weekly tallies and pair counts, then deletes their conference
+             picks and the users themselves, dropping them from the identity
+             cache when the batch commits
+  * week   - deletes the week's ballots in batches, then its frozen snapshot,
+             and rebuilds its tallies and pair counts from whatever ballots
+             remain (none, unless someone voted meanwhile)
+  * season - clears every week, then the conference champion picks
+
+Planner statistics of the touched tables are refreshed with ANALYZE at the end.
+"""
+
+import time
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import delete, text
+from .models import db, User, Vote, Ballot, ConferenceChampionVote, WeeklyTally, WeeklyPair, FrozenWeek, WeeklySnapshot
+from .ballots import delete_user_ballots, delete_week_ballots, ballot_weeks
+from .tally import ballot_delta, merge_delta, apply_tally_delta, rebuild_tallies
+from .pairwise import pair_delta, merge_pair_delta, apply_pair_delta, rebuild_pairs
+from .snapshots import SNAPSHOTS_SCOPE
+from .versions import bump_version
+from .identity import invalidate_on_commit
+
+BALLOT_TABLES = [Vote.__table__, Ballot.__table__]
+
+def _batches(pause, echo, label, delete_batch):
+    """Run delete_batch() in its own transaction until it deletes nothing; returns the total deleted"""
+    total = 0
+    while True:
+        deleted = delete_batch()
+        db.session.commit()
+        if not deleted:
+            return total
+        total += deleted
+        echo(f"🧹 {label}: {total} deleted")
+        if pause:
+            time.sleep(pause)
+
+def clear_users(pattern, batch_size=500, pause=0, echo=lambda message: None):
+    """Delete users whose username matches a LIKE pattern with everything they submitted; returns the count"""
+    from .vote import CONFERENCE_SCOPE
+
+    def delete_batch():
+        user_ids = [user_id for user_id, in db.session.query(User.id).filter(
+            User.username.like(pattern)).order_by(User.id).limit(batch_size)]
+        if not user_ids:
+            return 0
+        deltas, pair_deltas = {}, {}
+        for _, week, team_ids in delete_user_ballots(user_ids):
+            old_ranks = {team_id: rank for rank, team_id in enumerate(team_ids, start=1)}
+            merge_delta(deltas.setdefault(week, {}), ballot_delta(old_ranks, {}))
+            merge_pair_delta(pair_deltas.setdefault(week, {}), pair_delta(old_ranks, {}))
+        for week, delta in deltas.items():
+            apply_tally_delta(week, delta)
+            apply_pair_delta(week, pair_deltas[week])
+        picks = db.session.execute(delete(ConferenceChampionVote).where(ConferenceChampionVote.user_id.in_(user_ids)))
+        if picks.rowcount:
+            bump_version(CONFERENCE_SCOPE)
+        db.session.execute(delete(User).where(User.id.in_(user_ids)))
+        invalidate_on_commit(user_ids)
+        return len(user_ids)
+
+    return _batches(pause, echo, f"users like '{pattern}'", delete_batch)
+
+def clear_week(week, batch_size=5000, pause=0, echo=lambda message: None):
+    """Delete a week's ballots and snapshot and empty its tallies; returns the number of ballots deleted"""
+    deleted = _batches(pause, echo, f"week {week} ballots", lambda: delete_week_ballots(week, batch_size))
+    db.session.execute(delete(WeeklySnapshot).where(WeeklySnapshot.week == week))
+    if db.session.execute(delete(FrozenWeek).where(FrozenWeek.week == week)).rowcount:
+        bump_version(SNAPSHOTS_SCOPE)
+    rebuild_tallies(week)
+    rebuild_pairs(week)
+    db.session.commit()
+    return deleted
+
+def clear_season(batch_size=5000, pause=0, echo=lambda message: None):
+    """Clear every week and all conference champion picks; users and teams are kept"""
+    from .vote import CONFERENCE_SCOPE
+    weeks = set(ballot_weeks())
+    weeks.update(week for week, in db.session.query(WeeklyTally.week).distinct())
+    weeks.update(week for week, in db.session.query(FrozenWeek.week))
+    deleted = sum(clear_week(week, batch_size, pause, echo) for week in sorted(weeks))
+
+    def delete_picks():
+        ids = db.session.query(ConferenceChampionVote.id).limit(batch_size).scalar_subquery()
+        return db.session.execute(delete(ConferenceChampionVote).where(ConferenceChampionVote.id.in_(ids))).rowcount
+    if _batches(pause, echo, 'conference champion picks', delete_picks):
+        bump_version(CONFERENCE_SCOPE)
+        db.session.commit()
+    return deleted
+
+def analyze(tables):
+    """Refresh the planner statistics of the given tables"""
+    preparer = db.engine.dialect.identifier_preparer
+    with db.engine.begin() as connection:
+        for table in tables:
+            connection.execute(text(f'ANALYZE {preparer.format_table(table)}'))
+
+@click.group('clear')
+def clear_command():
+    """Delete test users, a week or a season in small batches."""
+
+@clear_command.command('users')
+@click.argument('pattern', default='testuser%')
+@click.option('--batch-size', type=int, default=500, show_default=True, help='Users deleted per transaction.')
+@click.option('--pause', type=float, default=0.0, show_default=True, help='Seconds to sleep between batches.')
+@click.confirmation_option(prompt='Delete these users and all of their votes?')
+@with_appcontext
+def clear_users_command(pattern, batch_size, pause):
+    """Delete users matching a LIKE PATTERN (default testuser%) and their votes"""
+    deleted = clear_users(pattern, batch_size, pause, click.echo)
+    analyze([User.__table__, ConferenceChampionVote.__table__, WeeklyTally.__table__, WeeklyPair.__table__] + BALLOT_TABLES)
+    click.echo(f"✅ Deleted {deleted} users")
+
+@clear_command.command('week')
+@click.argument('week', type=int)
+@click.option('--batch-size', type=int, default=5000, show_default=True, help='Ballots deleted per transaction.')
+@click.option('--pause', type=float, default=0.0, show_default=True, help='Seconds to sleep between batches.')
+@click.confirmation_option(prompt='Delete every ballot of this week?')
+@with_appcontext
+def clear_week_command(week, batch_size, pause):
+    """Delete WEEK's ballots, tallies and snapshot"""
+    deleted = clear_week(week, batch_size, pause, click.echo)
+    analyze([WeeklyTally.__table__, WeeklyPair.__table__, WeeklySnapshot.__table__] + BALLOT_TABLES)
+    click.echo(f"✅ Deleted {deleted} ballots from week {week}")
+
+@clear_command.command('season')
+@click.option('--batch-size', type=int, default=5000, show_default=True, help='Ballots deleted per transaction.')
+@click.option('--pause', type=float, default=0.0, show_default=True, help='Seconds to sleep between batches.')
+@click.confirmation_option(prompt='Delete every ballot and conference pick of the season?')
+@with_appcontext
+def clear_season_command(batch_size, pause):
+    """Delete every ballot, tally, snapshot and conference pick; keep users and teams"""
+    deleted = clear_season(batch_size, pause, click.echo)
+    analyze([ConferenceChampionVote.__table__, WeeklyTally.__table__, WeeklyPair.__table__,
+             FrozenWeek.__table__, WeeklySnapshot.__table__] + BALLOT_TABLES)
+    click.echo(f"✅ Deleted {deleted} ballots")
@@ -0,0 +1,170 @@
+"""Per-request instrumentation served in Prometheus text format on /metrics.
+
+Every request records its latency, the number of SQL statements it ran, the
+time spent in the database and the response size, labelled by endpoint
+(blueprint.view). Requests over METRICS_SLOW_STATEMENTS statements or
+METRICS_SLOW_REQUEST_MS milliseconds are logged together with their SQL.
+
+Streamed responses are recorded when the server closes them, so their
+latency, SQL and size cover the whole body.
+
+/metrics is off unless METRICS_TOKEN is set, and then answers only requests
+carrying "Authorization: Bearer <METRICS_TOKEN>". Metrics are per process;
+with several gunicorn workers each one reports its own counts.
+"""
+
+import hmac
+import logging
+import threading
+import time
+from bisect import bisect_left
+from flask import g, request, current_app, has_request_context, abort
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+SIZE_BUCKETS = (100, 1000, 5000, 10000, 50000, 100000, 500000, 1000000)
+
+class Histogram:
+    """Cumulative-bucket histogram per label value"""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label, value):
+        with self._lock:
+            counts, total = self._series.get(label, ([0] * (len(self.buckets) + 1), 0))
+            counts[bisect_left(self.buckets, value)] += 1
+            self._series[label] = (counts, total + value)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = {label: (list(counts), total) for label, (counts, total) in self._series.items()}
+        for label, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{endpoint="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{endpoint="{label}"}} {total}')
+            lines.append(f'{self.name}_count{{endpoint="{label}"}} {cumulative}')
+        return lines
+
+request_latency = Histogram('http_request_duration_seconds', 'Request latency by endpoint', LATENCY_BUCKETS)
+request_statements = Histogram('http_request_sql_statements', 'SQL statements executed per request', STATEMENT_BUCKETS)
+request_db_time = Histogram('http_request_db_seconds', 'Time spent in SQL per request', LATENCY_BUCKETS)
+response_size = Histogram('http_response_size_bytes', 'Response body size by endpoint', SIZE_BUCKETS)
+HISTOGRAMS = (request_latency, request_statements, request_db_time, response_size)
+
+_status_counts = {}
+_status_lock = threading.Lock()
+
+# name -> (help text, callable returning {event: value}); see register_stats
+_stats_sources = {}
+
+def register_stats(name, help_text, source):
+    """Export a component's counters dict (e.g. a cache's stats()) as name{event="..."}"""
+    _stats_sources[name] = (help_text, source)
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'request_stats' in g:
+        context._metrics_started = time.perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'request_stats' in g:
+        stats = g.request_stats
+        stats['sql_count'] += 1
+        stats['sql_seconds'] += time.perf_counter() - getattr(context, '_metrics_started', time.perf_counter())
+        if len(stats['sql_statements']) < 100:
+            stats['sql_statements'].append(statement)
+
+def _start_request():
+    # A dict rather than g attributes so a streamed response can still be recorded after the request context ends
+    g.request_stats = {'started': time.perf_counter(), 'sql_count': 0, 'sql_seconds': 0.0, 'sql_statements': []}
+
+def _counted(chunks, stats):
+    """Pass a streamed body through, adding up its size in stats['bytes']"""
+    try:
+        for chunk in chunks:
+            stats['bytes'] += len(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+            yield chunk
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+def _finish_request(response):
+    if 'request_stats' not in g:
+        return response
+    stats = g.request_stats
+    config = current_app.config
+    request_info = (request.method, request.path, request.endpoint or 'unmatched')
+    limits = (config['METRICS_SLOW_STATEMENTS'], config['METRICS_SLOW_REQUEST_MS'])
+    if response.is_streamed:
+        # The body (and the SQL behind it) is produced after this hook returns; record once it is closed
+        stats['bytes'] = 0
+        # Capture the status, not the response: a reference cycle would leave closing the stream to the GC
+        status = response.status_code
+        response.response = _counted(response.response, stats)
+        response.call_on_close(lambda: _record(stats, request_info, status, limits))
+    else:
+        stats['bytes'] = response.calculate_content_length() or 0
+        _record(stats, request_info, response.status_code, limits)
+    return response
+
+def _record(stats, request_info, status, limits):
+    method, path, endpoint = request_info
+    elapsed = time.perf_counter() - stats['started']
+    request_latency.observe(endpoint, elapsed)
+    request_statements.observe(endpoint, stats['sql_count'])
+    request_db_time.observe(endpoint, stats['sql_seconds'])
+    response_size.observe(endpoint, stats['bytes'])
+    with _status_lock:
+        key = (endpoint, status)
+        _status_counts[key] = _status_counts.get(key, 0) + 1
+
+    slow_statements, slow_request_ms = limits
+    if stats['sql_count'] > slow_statements or elapsed * 1000 > slow_request_ms:
+        logger.warning(
+            'Slow request %s %s (%s): %.1f ms, %d SQL statements, %.1f ms in SQL\n%s',
+            method, path, endpoint, elapsed * 1000, stats['sql_count'], stats['sql_seconds'] * 1000,
+            '\n'.join(f'  {statement}' for statement in stats['sql_statements'])
+        )
+
+def render_metrics():
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    lines += ['# HELP http_requests_total Requests by endpoint and status', '# TYPE http_requests_total counter']
+    with _status_lock:
+        counts = sorted(_status_counts.items())
+    for (endpoint, status), count in counts:
+        lines.append(f'http_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+    for name, (help_text, source) in sorted(_stats_sources.items()):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+        for key, value in sorted(source().items()):
+            lines.append(f'{name}{{event="{key}"}} {value}')
+    return '\n'.join(lines) + '\n'
+
+def init_app(app):
+    """Install the request hooks and the /metrics endpoint on app"""
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+    @app.route('/metrics')
+    def metrics():
+        token = app.config['METRICS_TOKEN']
+        if not token:
+            abort(404)
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            abort(401)
+        return app.response_class(render_metrics(), mimetype='text/plain; version=0.0.4')
@@ -1,17 +1,27 @@
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import UniqueConstraint, Index
 
 db = SQLAlchemy()
 
+def dialect_insert(model):
+    """Return an INSERT supporting on_conflict_do_* for the bound database"""
+    # Imported here so a worker only loads the dialect it actually talks to
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
 class User(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = generate_password_hash(password, current_app.config['PASSWORD_HASH_METHOD'])
     
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
@@ -22,11 +32,17 @@ class ConferenceChampionVote(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     conference = db.Column(db.String, nullable=False)
     team = db.Column(db.String, nullable=False)
-    __table_args__ = (UniqueConstraint('user_id', 'conference', name='unique_user_conference'),)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'conference', name='unique_user_conference'),
+        Index('ix_conference_champion_votes_conference_team', 'conference', 'team'),
+    )
 
 class Team(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
+    conference = db.Column(db.String(50))
+    # 'FBS' or 'FCS'
+    division = db.Column(db.String(10))
 
 class Vote(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -34,3 +50,59 @@ class Vote(db.Model):
     week = db.Column(db.Integer, nullable=False)
     team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False)
     rank = db.Column(db.Integer, nullable=False)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'week', 'rank', name='uq_vote_user_week_rank'),
+        UniqueConstraint('user_id', 'week', 'team_id', name='uq_vote_user_week_team'),
+        Index('ix_vote_week_user', 'week', 'user_id'),
+        Index('ix_vote_team_id', 'team_id'),
+    )
+
+class DataVersion(db.Model):
+    """Monotonic version counter per cached data scope (e.g. 'teams')"""
+    __tablename__ = 'data_versions'
+    scope = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+class WeeklyTally(db.Model):
+    """Pre-aggregated consensus points per (week, team), maintained by submit_vote"""
+    __tablename__ = 'weekly_tallies'
+    week = db.Column(db.Integer, primary_key=True)
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), primary_key=True)
+    points = db.Column(db.Integer, nullable=False, default=0)
+    ballots = db.Column(db.Integer, nullable=False, default=0)
+
+class WeeklyPair(db.Model):
+    """Ballots that ranked winner_id above loser_id in a week (both ranked), maintained by submit_vote"""
+    __tablename__ = 'weekly_pairs'
+    week = db.Column(db.Integer, primary_key=True)
+    winner_id = db.Column(db.Integer, db.ForeignKey('team.id'), primary_key=True)
+    loser_id = db.Column(db.Integer, db.ForeignKey('team.id'), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class FrozenWeek(db.Model):
+    """A closed week: no more ballots, consensus served from weekly_snapshots"""
+    __tablename__ = 'frozen_weeks'
+    week = db.Column(db.Integer, primary_key=True)
+    frozen_at = db.Column(db.DateTime, nullable=False)
+    voters = db.Column(db.Integer, nullable=False)
+
+class WeeklySnapshot(db.Model):
+    """Final consensus of a frozen week, one row per team that received votes"""
+    __tablename__ = 'weekly_snapshots'
+    week = db.Column(db.Integer, db.ForeignKey('frozen_weeks.week'), primary_key=True)
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), primary_key=True)
+    rank = db.Column(db.Integer, nullable=False)
+    points = db.Column(db.Integer, nullable=False)
+    first_place_votes = db.Column(db.Integer, nullable=False)
+    ballots = db.Column(db.Integer, nullable=False)
+
+class Ballot(db.Model):
+    """Compact ballot layout: one row per (user, week) with team ids packed in rank order.
+
+    Used instead of Vote rows when BALLOT_STORAGE is 'packed' (see ballots.py).
+    """
+    __tablename__ = 'ballots'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    week = db.Column(db.Integer, primary_key=True)
+    team_ids = db.Column(db.LargeBinary, nullable=False)
+    __table_args__ = (Index('ix_ballots_week_user', 'week', 'user_id'),)
@@ -0,0 +1,124 @@
+"""Pairwise preference counts and the Schulze (beatpath) ranking.
+
+weekly_pairs stores, per week, how many ballots ranked winner_id above
+loser_id with both teams on the ballot. write_ballots adds each ballot's
+difference, so the table holds at most teams x teams rows per week whatever
+the number of voters. A team on a ballot is preferred to every team left off
+it, so with N[a] = ballots ranking a (weekly_tallies.ballots):
+
+    ballots preferring a to b = N[a] - R[b][a]
+
+which is all Schulze needs. Ranking a week therefore costs O(teams^3) and
+never reads individual ballots.
+"""
+
+from collections import Counter
+from itertools import combinations
+from .models import db, WeeklyPair, WeeklyTally, dialect_insert
+from .ballots import iter_ballots
+
+def _pairs(ranks):
+    # ranks: {team_id: rank}
+    ordered = sorted(ranks, key=ranks.get)
+    return combinations(ordered, 2)
+
+def pair_delta(old_ranks, new_ranks):
+    """{(winner_id, loser_id): change} when a ballot goes from old_ranks to new_ranks"""
+    delta = Counter()
+    for pair in _pairs(old_ranks):
+        delta[pair] -= 1
+    for pair in _pairs(new_ranks):
+        delta[pair] += 1
+    return {pair: change for pair, change in delta.items() if change}
+
+def merge_pair_delta(total, delta):
+    for pair, change in delta.items():
+        total[pair] = total.get(pair, 0) + change
+        if not total[pair]:
+            del total[pair]
+
+def apply_pair_delta(week, delta):
+    """Upsert a {(winner_id, loser_id): change} delta into the week's pair counts in one statement"""
+    if not delta:
+        return
+    stmt = dialect_insert(WeeklyPair)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[WeeklyPair.week, WeeklyPair.winner_id, WeeklyPair.loser_id],
+        set_={'count': WeeklyPair.count + stmt.excluded['count']}
+    )
+    # Same key order in every writer, so concurrent upserts cannot deadlock on each other's rows
+    db.session.execute(stmt, [
+        {'week': week, 'winner_id': winner_id, 'loser_id': loser_id, 'count': change}
+        for (winner_id, loser_id), change in sorted(delta.items())
+    ])
+
+def compute_pairs(week=None):
+    """Recompute {(week, winner_id, loser_id): count} from the stored ballots"""
+    counts = Counter()
+    for _, w, team_ids in iter_ballots(week):
+        for winner_id, loser_id in combinations(team_ids, 2):
+            counts[(w, winner_id, loser_id)] += 1
+    return dict(counts)
+
+def stored_pairs(week=None):
+    query = db.session.query(WeeklyPair.week, WeeklyPair.winner_id, WeeklyPair.loser_id, WeeklyPair.count).filter(
+        WeeklyPair.count != 0
+    )
+    if week is not None:
+        query = query.filter(WeeklyPair.week == week)
+    return {(w, winner_id, loser_id): count for w, winner_id, loser_id, count in query}
+
+def rebuild_pairs(week=None):
+    """Replace the stored pair counts with ones recomputed from ballots; returns the mismatches found"""
+    from .tally import diff_tallies
+    expected = compute_pairs(week)
+    mismatches = diff_tallies(expected, stored_pairs(week))
+    delete = WeeklyPair.query
+    if week is not None:
+        delete = delete.filter(WeeklyPair.week == week)
+    delete.delete()
+    if expected:
+        db.session.execute(dialect_insert(WeeklyPair), [
+            {'week': w, 'winner_id': winner_id, 'loser_id': loser_id, 'count': count}
+            for (w, winner_id, loser_id), count in expected.items()
+        ])
+    return mismatches
+
+def schulze_ranking(week):
+    """[(team_id, place, beaten)] in Schulze order; tied teams share a place.
+
+    beaten is how many teams this one beats on strongest paths.
+    """
+    import numpy as np
+    ranked = dict(db.session.query(WeeklyTally.team_id, WeeklyTally.ballots).filter(
+        WeeklyTally.week == week, WeeklyTally.ballots > 0
+    ))
+    team_ids = sorted(ranked)
+    index = {team_id: i for i, team_id in enumerate(team_ids)}
+    n = len(team_ids)
+    above = np.zeros((n, n), dtype=np.int64)
+    for winner_id, loser_id, count in db.session.query(WeeklyPair.winner_id, WeeklyPair.loser_id, WeeklyPair.count).filter(
+        WeeklyPair.week == week, WeeklyPair.count != 0
+    ):
+        if winner_id in index and loser_id in index:
+            above[index[winner_id], index[loser_id]] = count
+
+    # d[a][b]: ballots preferring a to b
+    ballots = np.array([ranked[team_id] for team_id in team_ids], dtype=np.int64)
+    d = ballots[:, None] - above.T
+    np.fill_diagonal(d, 0)
+
+    # Strongest paths (Floyd-Warshall on widest paths), one vectorized step per intermediate team
+    p = np.where(d > d.T, d, 0)
+    for k in range(n):
+        p = np.maximum(p, np.minimum(p[:, k:k + 1], p[k:k + 1, :]))
+        np.fill_diagonal(p, 0)
+
+    beaten = (p > p.T).sum(axis=1)
+    order = sorted(range(n), key=lambda i: -beaten[i])
+    result, place = [], 0
+    for position, i in enumerate(order, start=1):
+        if position == 1 or beaten[i] != beaten[order[position - 2]]:
+            place = position
+        result.append((team_ids[i], place, int(beaten[i])))
+    return result
@@ -0,0 +1,141 @@
+"""Password hashing on a bounded process pool.
+
+Werkzeug's scrypt/PBKDF2 hashes are CPU-bound by design, so register and
+login hand them to a small pool of PASSWORD_HASH_WORKERS processes instead of
+hashing on the request thread. At most PASSWORD_HASH_MAX_PENDING hashes may
+be running or waiting; beyond that hash()/verify() raise HasherBusy at once
+and the route answers 503 rather than queueing behind a registration spike.
+PASSWORD_HASH_WORKERS=0 hashes inline (tests, scripts).
+
+PASSWORD_HASH_METHOD is a Werkzeug method string and sets the work factor,
+e.g. scrypt:32768:8:1 or pbkdf2:sha256:600000. Hashes stored with other
+parameters are upgraded on the user's next successful login.
+
+Every app process has its own pool, and a busy scrypt:32768:8:1 process
+holds about 60 MB (see process_memory_mb). gunicorn.conf.py therefore sizes
+the pool from the worker count and PASSWORD_HASH_MEMORY_MB.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+
+def canonical_method(method):
+    """The full method string Werkzeug stores for a method (defaults filled in), or None if unknown.
+
+    'scrypt' -> 'scrypt:32768:8:1', 'pbkdf2' -> 'pbkdf2:sha256:<DEFAULT_PBKDF2_ITERATIONS>',
+    mirroring the defaults in werkzeug.security.
+    """
+    name, *args = method.split(':')
+    if name == 'scrypt':
+        n, r, p = args or (2 ** 15, 8, 1)
+        return f'scrypt:{int(n)}:{int(r)}:{int(p)}'
+    if name == 'pbkdf2' and len(args) <= 2:
+        hash_name = args[0] if args else 'sha256'
+        iterations = int(args[1]) if len(args) == 2 else DEFAULT_PBKDF2_ITERATIONS
+        return f'pbkdf2:{hash_name}:{iterations}'
+    return None
+
+# Resident size of an idle hashing process: a spawned interpreter with Werkzeug imported
+PROCESS_OVERHEAD_MB = 30
+
+def process_memory_mb(method):
+    """Approximate peak memory of one hashing process using method"""
+    name, *args = (canonical_method(method) or method).split(':')
+    if name == 'scrypt':
+        n, r, p = map(int, args)
+        return PROCESS_OVERHEAD_MB + 128 * n * r * p / 2 ** 20
+    return PROCESS_OVERHEAD_MB
+
+class HasherBusy(Exception):
+    """Every hashing slot is taken; the caller should shed the request"""
+
+class PasswordHasher:
+    def __init__(self):
+        self._app = None
+        self._pool = None
+        self._slots = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._counters = Counter()
+        # Counters are updated from every request thread
+        self._counters_lock = threading.Lock()
+
+    def init_app(self, app):
+        # A pool sized for a previous app (tests) must not outlive it
+        self.stop()
+        self._app = app
+        if not hasattr(self, '_atexit_registered'):
+            atexit.register(self.stop)
+            self._atexit_registered = True
+
+    def hash(self, password):
+        password_hash = self._call(generate_password_hash, password, self._app.config['PASSWORD_HASH_METHOD'])
+        self._count('hashed')
+        return password_hash
+
+    def verify(self, password_hash, password):
+        ok = self._call(check_password_hash, password_hash, password)
+        self._count('verified' if ok else 'mismatched')
+        return ok
+
+    def needs_rehash(self, password_hash):
+        """True when a stored hash was made with another method or work factor than PASSWORD_HASH_METHOD"""
+        if '$' not in password_hash:
+            return True
+        try:
+            stored = canonical_method(password_hash.split('$', 1)[0])
+        except ValueError:
+            return True
+        return stored is None or stored != canonical_method(self._app.config['PASSWORD_HASH_METHOD'])
+
+    def rehashed(self):
+        self._count('rehashed')
+
+    def stop(self):
+        """Shut the pool down (registered with atexit)"""
+        if self._pool is None or self._pid != os.getpid():
+            return
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._pool = None
+
+    def stats(self):
+        with self._counters_lock:
+            return {name: self._counters[name] for name in ('hashed', 'verified', 'mismatched', 'rehashed', 'rejected', 'in_flight')}
+
+    def _count(self, name, n=1):
+        with self._counters_lock:
+            self._counters[name] += n
+
+    def _call(self, fn, *args):
+        if self._app.config['PASSWORD_HASH_WORKERS'] <= 0:
+            return fn(*args)
+        pool, slots = self._ensure_pool()
+        if not slots.acquire(blocking=False):
+            self._count('rejected')
+            raise HasherBusy()
+        self._count('in_flight')
+        try:
+            return pool.submit(fn, *args).result()
+        finally:
+            self._count('in_flight', -1)
+            slots.release()
+
+    def _ensure_pool(self):
+        # Created lazily and per pid so a preloaded master never owns worker processes
+        if self._pool is not None and self._pid == os.getpid():
+            return self._pool, self._slots
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                workers = self._app.config['PASSWORD_HASH_WORKERS']
+                # spawn, not fork: the web worker has threads (ballot writer, cache refreshes)
+                self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+                self._slots = threading.BoundedSemaphore(max(workers, self._app.config['PASSWORD_HASH_MAX_PENDING']))
+                self._pid = os.getpid()
+        return self._pool, self._slots
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,149 @@
+"""Alternative consensus scoring on an in-memory ballot matrix.
+
+A week's ballots are loaded once into a voters x 25 matrix of dense team
+indexes (-1 where a ballot is shorter) and kept while the week's data
+version is unchanged. Every registered scoring rule is then a vectorized
+NumPy computation over that matrix, so trying another rule costs no extra
+database scan. 'borda' (26 - rank, summed) reproduces the stored tally.
+
+NumPy is only imported when a rule is first computed.
+
+Add a rule with:
+
+    @scoring_rule('name', 'What it measures')
+    def name(ballots):   # BallotMatrix -> float/int array of length ballots.team_count
+        ...
+"""
+
+import threading
+from collections import OrderedDict
+from .ballots import iter_ballots
+from .versions import get_version
+from .tally import week_scope, BALLOT_LENGTH
+
+MAX_CACHED_WEEKS = 4
+
+SCORING_RULES = OrderedDict()
+
+def scoring_rule(name, description):
+    def register(fn):
+        SCORING_RULES[name] = (description, fn)
+        return fn
+    return register
+
+class BallotMatrix:
+    """One week's ballots: ranks[voter, rank - 1] is a dense team index, or -1"""
+
+    def __init__(self, team_ids, ranks):
+        self.team_ids = team_ids
+        self.ranks = ranks
+
+    @property
+    def voters(self):
+        return self.ranks.shape[0]
+
+    @property
+    def team_count(self):
+        return len(self.team_ids)
+
+    @classmethod
+    def load(cls, week):
+        import numpy as np
+        ballots = [team_ids for _, _, team_ids in iter_ballots(week)]
+        if all(len(team_ids) == BALLOT_LENGTH for team_ids in ballots):
+            raw = np.array(ballots, dtype=np.int32).reshape(-1, BALLOT_LENGTH)
+        else:
+            raw = np.full((len(ballots), BALLOT_LENGTH), -1, dtype=np.int32)
+            for row, team_ids in zip(raw, ballots):
+                row[:len(team_ids)] = team_ids
+        # Dense 0..n-1 column per team that appears on any ballot
+        team_ids, inverse = np.unique(raw, return_inverse=True)
+        offset = 1 if team_ids.size and team_ids[0] == -1 else 0
+        ranks = (inverse.reshape(raw.shape) - offset).astype(np.int16)
+        return cls(team_ids[offset:], ranks)
+
+    def points(self, weights):
+        """Sum weights[rank - 1] over every ballot, per team"""
+        import numpy as np
+        mask = self.ranks >= 0
+        cols = np.broadcast_to(np.arange(BALLOT_LENGTH), self.ranks.shape)
+        return np.bincount(self.ranks[mask], weights=np.asarray(weights, dtype=np.float64)[cols[mask]],
+                           minlength=self.team_count)
+
+    def voter_points(self, weights, dtype='int8'):
+        """voters x teams matrix of the points each voter gave each team (0 if unranked)"""
+        import numpy as np
+        dense = np.zeros((self.voters, self.team_count), dtype=dtype)
+        voters, cols = np.nonzero(self.ranks >= 0)
+        dense[voters, self.ranks[voters, cols]] = np.asarray(weights)[cols]
+        return dense
+
+@scoring_rule('borda', 'Current AP-style points: 25 for 1st down to 1 for 25th')
+def borda(ballots):
+    return ballots.points(range(BALLOT_LENGTH, 0, -1)).astype('int64')
+
+@scoring_rule('dowdall', 'Weighted Borda: 1 point for 1st, 1/2 for 2nd, ... 1/25 for 25th')
+def dowdall(ballots):
+    import numpy as np
+    return ballots.points(1 / np.arange(1, BALLOT_LENGTH + 1))
+
+@scoring_rule('top10', 'Borda truncated to each ballot\'s top 10: 10 for 1st down to 1 for 10th')
+def top10(ballots):
+    import numpy as np
+    return ballots.points(np.maximum(0, 10 - np.arange(BALLOT_LENGTH))).astype('int64')
+
+@scoring_rule('first_place', 'Number of first-place votes')
+def first_place(ballots):
+    import numpy as np
+    firsts = ballots.ranks[:, 0]
+    return np.bincount(firsts[firsts >= 0], minlength=ballots.team_count)
+
+@scoring_rule('trimmed_mean', 'Mean Borda points per voter after dropping the top and bottom 10% of each team\'s scores')
+def trimmed_mean(ballots):
+    import numpy as np
+    if ballots.voters == 0:
+        return np.zeros(0)
+    scores = np.sort(ballots.voter_points(range(BALLOT_LENGTH, 0, -1)), axis=0)
+    trim = int(ballots.voters * 0.1)
+    kept = scores[trim:ballots.voters - trim] if ballots.voters > 2 * trim else scores
+    return kept.mean(axis=0, dtype=np.float64)
+
+class ScoringEngine:
+    """Per-process cache of the last few weeks' matrices, keyed by the week's data version"""
+
+    def __init__(self, max_weeks=MAX_CACHED_WEEKS):
+        self.max_weeks = max_weeks
+        self._matrices = OrderedDict()
+        self._lock = threading.Lock()
+
+    def matrix(self, week):
+        version = get_version(week_scope(week))
+        with self._lock:
+            cached = self._matrices.get(week)
+            if cached is not None and cached[0] == version:
+                self._matrices.move_to_end(week)
+                return cached[1]
+        matrix = BallotMatrix.load(week)
+        with self._lock:
+            self._matrices[week] = (version, matrix)
+            self._matrices.move_to_end(week)
+            while len(self._matrices) > self.max_weeks:
+                self._matrices.popitem(last=False)
+        return matrix
+
+    def score(self, week, rule):
+        """[(team_id, points)] for every team on a ballot this week under a registered rule"""
+        ballots = self.matrix(week)
+        scores = SCORING_RULES[rule][1](ballots)
+        return [(int(team_id), _plain(score)) for team_id, score in zip(ballots.team_ids, scores)]
+
+    def clear(self):
+        with self._lock:
+            self._matrices.clear()
+
+def _plain(score):
+    # JSON-friendly: integers stay integers, fractional scores are rounded
+    score = score.item()
+    return score if isinstance(score, int) else round(score, 4)
+
+scoring_engine = ScoringEngine()
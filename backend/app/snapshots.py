@@ -0,0 +1,94 @@
+"""Frozen weeks and their immutable consensus snapshots.
+
+`flask --app app freeze-week N` closes week N to new ballots and stores its
+final consensus (rank, points, first-place votes and ballots per team) in
+weekly_snapshots. consensus(N) is then served from the snapshot, and the
+movement endpoint diffs a frozen week against the previous frozen week using
+only snapshot rows.
+"""
+
+from collections import Counter
+from datetime import datetime, timezone
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func, insert
+from .models import db, FrozenWeek, WeeklySnapshot, Team
+from .ballots import iter_ballots
+from .tally import compute_tallies, week_scope
+from .versions import bump_version
+
+SNAPSHOTS_SCOPE = 'snapshots'
+RANKED = 25
+
+def is_frozen(week):
+    return db.session.query(FrozenWeek.week).filter(FrozenWeek.week == week).first() is not None
+
+def freeze_week(week):
+    """Snapshot a week's consensus from its ballots and close it; returns the FrozenWeek"""
+    if is_frozen(week):
+        raise ValueError(f'Week {week} is already frozen')
+    tallies = {team_id: value for (_, team_id), value in compute_tallies(week).items()}
+    if not tallies:
+        raise ValueError(f'Week {week} has no ballots')
+    first_place = Counter()
+    voters = 0
+    for _, _, team_ids in iter_ballots(week):
+        voters += 1
+        if team_ids:
+            first_place[team_ids[0]] += 1
+
+    # Same order as the live consensus: points, then team name
+    names = dict(db.session.query(Team.id, Team.name).filter(Team.id.in_(tallies)))
+    order = sorted(tallies, key=lambda team_id: (-tallies[team_id][0], names[team_id]))
+    frozen = FrozenWeek(week=week, frozen_at=datetime.now(timezone.utc), voters=voters)
+    db.session.add(frozen)
+    db.session.flush()
+    db.session.execute(insert(WeeklySnapshot), [
+        {'week': week, 'team_id': team_id, 'rank': rank, 'points': tallies[team_id][0],
+         'first_place_votes': first_place[team_id], 'ballots': tallies[team_id][1]}
+        for rank, team_id in enumerate(order, start=1)
+    ])
+    bump_version(week_scope(week))
+    bump_version(SNAPSHOTS_SCOPE)
+    return frozen
+
+def snapshot_rows(week):
+    """[(team_id, rank, points, first_place_votes)] of a frozen week by rank; [] if not frozen"""
+    return db.session.query(
+        WeeklySnapshot.team_id, WeeklySnapshot.rank, WeeklySnapshot.points, WeeklySnapshot.first_place_votes
+    ).filter(WeeklySnapshot.week == week).order_by(WeeklySnapshot.rank).all()
+
+def movement(week):
+    """Each ranked team of a frozen week against the previous frozen week.
+
+    Returns (previous_week, [(team_id, rank, points, first_place_votes, previous_rank)],
+    [(team_id, previous_rank)] for teams that dropped out of the top 25), or None
+    if week is not frozen. previous_rank is None for teams new to the top 25.
+    """
+    current = snapshot_rows(week)
+    if not current:
+        return None
+    previous_week = db.session.query(func.max(FrozenWeek.week)).filter(FrozenWeek.week < week).scalar()
+    previous = {}
+    if previous_week is not None:
+        previous = dict(db.session.query(WeeklySnapshot.team_id, WeeklySnapshot.rank).filter(
+            WeeklySnapshot.week == previous_week, WeeklySnapshot.rank <= RANKED
+        ))
+    ranked = [(team_id, rank, points, firsts, previous.get(team_id))
+              for team_id, rank, points, firsts in current if rank <= RANKED]
+    still_ranked = {team_id for team_id, *_ in ranked}
+    dropped = sorted(((team_id, rank) for team_id, rank in previous.items() if team_id not in still_ranked),
+                     key=lambda r: r[1])
+    return previous_week, ranked, dropped
+
+@click.command('freeze-week')
+@click.argument('week', type=int)
+@with_appcontext
+def freeze_week_command(week):
+    """Close WEEK to new ballots and store its final consensus"""
+    try:
+        frozen = freeze_week(week)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    db.session.commit()
+    click.echo(f"🧊 Froze week {week}: {frozen.voters} ballots")
@@ -0,0 +1,168 @@
+"""Synthetic seasons for load tests and benchmarks.
+
+generate_season() creates `users` voters and a ballot from each of them for
+weeks 1..weeks. Every team has a latent strength that drifts from week to
+week; a voter's ballot is the top 25 of strength plus their own Gaussian
+noise, so ballots agree at the top and scatter further down like real polls.
+Each voter also picks a champion for every conference, favouring its
+strongest teams.
+
+Rows are generated with NumPy a chunk of voters at a time and appended with
+bulk_insert() - COPY on PostgreSQL, a single executemany elsewhere - without
+building ORM objects. The weekly tallies and pair counts are accumulated
+from the same arrays and upserted once per week, so the maintained tables
+match `rebuild-tallies --check` without re-reading the ballots.
+
+    flask --app app generate-season --users 66667 --weeks 15   # ~1M ballots
+"""
+
+import csv
+import io
+import time
+from itertools import combinations
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from werkzeug.security import generate_password_hash
+from .models import db, User, Team, Vote, Ballot, ConferenceChampionVote
+from .ballots import storage_mode, PACKED
+from .tally import apply_tally_delta, BALLOT_LENGTH
+from .pairwise import apply_pair_delta
+from .snapshots import is_frozen
+from .versions import bump_version
+
+# Every synthetic voter can log in with this password
+SYNTHETIC_PASSWORD = 'synthetic-password'
+
+def bulk_insert(table, columns, rows):
+    """Append row tuples to a table in the session's transaction: COPY on PostgreSQL, executemany elsewhere"""
+    connection = db.session.connection()
+    preparer = connection.dialect.identifier_preparer
+    target = f"{preparer.format_table(table)} ({', '.join(preparer.quote(column) for column in columns)})"
+    if connection.dialect.name == 'postgresql':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            # bytea takes hex input in CSV
+            writer.writerow(['\\x' + value.hex() if isinstance(value, bytes) else value for value in row])
+        buffer.seek(0)
+        with connection.connection.driver_connection.cursor() as cursor:
+            cursor.copy_expert(f'COPY {target} FROM STDIN WITH (FORMAT csv)', buffer)
+    else:
+        connection.exec_driver_sql(f"INSERT INTO {target} VALUES ({', '.join('?' for _ in columns)})", rows)
+
+def _insert_voters(users, prefix):
+    password_hash = generate_password_hash(SYNTHETIC_PASSWORD, current_app.config['PASSWORD_HASH_METHOD'])
+    usernames = [f'{prefix}{i}' for i in range(1, users + 1)]
+    bulk_insert(User.__table__, ('username', 'password_hash'), [(name, password_hash) for name in usernames])
+    ids_by_name = dict(db.session.query(User.username, User.id).filter(User.username.like(f'{prefix}%')))
+    return [ids_by_name[name] for name in usernames]
+
+def _write_ballots(week, user_ids, team_ids, top):
+    """Store one chunk of ballots (top: voters x 25 team indexes in rank order) in the configured layout"""
+    ballots = team_ids[top]
+    if storage_mode() == PACKED:
+        blobs = ballots.astype('<i4')
+        bulk_insert(Ballot.__table__, ('user_id', 'week', 'team_ids'),
+                    [(user_id, week, blob.tobytes()) for user_id, blob in zip(user_ids, blobs)])
+    else:
+        ranks = range(1, BALLOT_LENGTH + 1)
+        bulk_insert(Vote.__table__, ('user_id', 'week', 'team_id', 'rank'), [
+            (user_id, week, team_id, rank)
+            for user_id, ballot in zip(user_ids, ballots.tolist())
+            for team_id, rank in zip(ballot, ranks)
+        ])
+
+def generate_season(users, weeks, seed=None, noise=0.6, drift=0.15, prefix='sim', chunk_size=10000):
+    """Create users voters with a ballot for each of weeks 1..weeks plus conference champion picks.
+
+    noise is the spread of each voter's opinion around the latent strengths
+    (standard normal across teams) and drift how far strengths move per week.
+    Returns the number of ballots written. Commits once per week.
+    """
+    import numpy as np
+    if db.session.query(User.id).filter(User.username == f'{prefix}1').first():
+        raise ValueError(f"Users named '{prefix}N' already exist; pick another --prefix")
+    frozen = [week for week in range(1, weeks + 1) if is_frozen(week)]
+    if frozen:
+        raise ValueError(f"Week {frozen[0]} is frozen")
+    teams = db.session.query(Team.id, Team.name, Team.conference).order_by(Team.id).all()
+    if len(teams) < BALLOT_LENGTH:
+        from .teams import seed_teams
+        seed_teams()
+        teams = db.session.query(Team.id, Team.name, Team.conference).order_by(Team.id).all()
+    team_ids = np.array([team_id for team_id, _, _ in teams])
+    n = len(teams)
+
+    user_ids = _insert_voters(users, prefix)
+    db.session.commit()
+
+    rng = np.random.default_rng(seed)
+    strength = rng.standard_normal(n)
+    points_by_rank = np.arange(BALLOT_LENGTH, 0, -1)
+    above, below = (np.array(side) for side in zip(*combinations(range(BALLOT_LENGTH), 2)))
+    for week in range(1, weeks + 1):
+        strength = strength + rng.normal(0, drift, n)
+        points = np.zeros(n, dtype=np.int64)
+        ballots = np.zeros(n, dtype=np.int64)
+        pairs = np.zeros(n * n, dtype=np.int64)
+        for start in range(0, users, chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            opinion = strength + rng.normal(0, noise, (len(chunk), n))
+            # Top 25 of each voter's opinion, then sorted best first
+            top = np.argpartition(-opinion, BALLOT_LENGTH, axis=1)[:, :BALLOT_LENGTH]
+            top = np.take_along_axis(top, np.argsort(-np.take_along_axis(opinion, top, axis=1), axis=1), axis=1)
+            _write_ballots(week, chunk, team_ids, top)
+            points += np.bincount(top.ravel(), weights=np.tile(points_by_rank, len(chunk)), minlength=n).astype(np.int64)
+            ballots += np.bincount(top.ravel(), minlength=n)
+            pairs += np.bincount((top[:, above] * n + top[:, below]).ravel(), minlength=n * n)
+        apply_tally_delta(week, {
+            int(team_ids[i]): (int(points[i]), int(ballots[i])) for i in np.flatnonzero(ballots)
+        })
+        apply_pair_delta(week, {
+            (int(team_ids[i // n]), int(team_ids[i % n])): int(pairs[i]) for i in np.flatnonzero(pairs)
+        })
+        db.session.commit()
+
+    _pick_conference_champions(user_ids, teams, strength, noise, rng, chunk_size)
+    db.session.commit()
+    return users * weeks
+
+def _pick_conference_champions(user_ids, teams, strength, noise, rng, chunk_size):
+    """Each voter picks the team they rate highest in every conference with at least two teams"""
+    import numpy as np
+    from .vote import CONFERENCE_SCOPE
+    conferences = {}
+    for i, (_, name, conference) in enumerate(teams):
+        if conference:
+            conferences.setdefault(conference, []).append(i)
+    conferences = {conference: np.array(members) for conference, members in conferences.items() if len(members) > 1}
+    if not conferences:
+        return
+    names = [name for _, name, _ in teams]
+    for start in range(0, len(user_ids), chunk_size):
+        chunk = user_ids[start:start + chunk_size]
+        rows = []
+        for conference, members in conferences.items():
+            opinion = strength[members] + rng.normal(0, noise, (len(chunk), len(members)))
+            picks = members[opinion.argmax(axis=1)]
+            rows.extend((user_id, conference, names[i]) for user_id, i in zip(chunk, picks.tolist()))
+        bulk_insert(ConferenceChampionVote.__table__, ('user_id', 'conference', 'team'), rows)
+    bump_version(CONFERENCE_SCOPE)
+
+@click.command('generate-season')
+@click.option('--users', type=int, default=1000, show_default=True)
+@click.option('--weeks', type=int, default=15, show_default=True)
+@click.option('--seed', type=int, default=None, help='Random seed for a reproducible season.')
+@click.option('--noise', type=float, default=0.6, show_default=True, help='Spread of voter opinion.')
+@click.option('--prefix', default='sim', show_default=True, help='Username prefix for the synthetic voters.')
+@with_appcontext
+def generate_season_command(users, weeks, seed, noise, prefix):
+    """Bulk-load synthetic voters, a season of correlated ballots and conference picks"""
+    started = time.perf_counter()
+    try:
+        ballots = generate_season(users, weeks, seed=seed, noise=noise, prefix=prefix)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"🌱 Loaded {ballots} ballots from {users} voters over {weeks} weeks "
+               f"in {time.perf_counter() - started:.1f}s (password: {SYNTHETIC_PASSWORD})")
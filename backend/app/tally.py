@@ -0,0 +1,226 @@
+import threading
+from bisect import bisect_left, bisect_right
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func
+from .models import db, Vote, WeeklyTally, dialect_insert
+from .versions import bump_version, get_prefix_version
+from .ballots import storage_mode, iter_ballots, PACKED
+
+# Prefix of the per-week version scopes
+VOTES_SCOPE = 'votes'
+
+def week_scope(week):
+    """Version scope bumped whenever the given week's tally changes"""
+    return f'{VOTES_SCOPE}:{week}'
+
+def votes_version():
+    """Version of the tallies across all weeks, derived from the week versions.
+
+    Writers only bump their own week's row, so concurrent ballots for
+    different weeks never contend on a shared counter.
+    """
+    return get_prefix_version(f'{VOTES_SCOPE}:')
+
+# Teams ranked on one ballot; rank_points, the scoring matrix and the export all assume at most this many
+BALLOT_LENGTH = 25
+
+def rank_points(rank):
+    """Points a single ballot awards for a rank (25 for #1 down to 1 for #25)"""
+    return 26 - rank
+
+def ballot_delta(old_ranks, new_ranks):
+    """Per-team (points, ballots) change when a ballot goes from old_ranks to new_ranks.
+
+    Both arguments map team_id -> rank; teams whose contribution is unchanged
+    are left out.
+    """
+    delta = {}
+    for team_id in set(old_ranks) | set(new_ranks):
+        old_rank = old_ranks.get(team_id)
+        new_rank = new_ranks.get(team_id)
+        points = (rank_points(new_rank) if new_rank else 0) - (rank_points(old_rank) if old_rank else 0)
+        ballots = (1 if new_rank else 0) - (1 if old_rank else 0)
+        if points or ballots:
+            delta[team_id] = (points, ballots)
+    return delta
+
+def merge_delta(total, delta):
+    """Accumulate one ballot_delta into another in place, dropping entries that cancel out"""
+    for team_id, (points, ballots) in delta.items():
+        old_points, old_ballots = total.get(team_id, (0, 0))
+        merged = (old_points + points, old_ballots + ballots)
+        if merged == (0, 0):
+            total.pop(team_id, None)
+        else:
+            total[team_id] = merged
+    return total
+
+def apply_ballot_delta(week, old_ranks, new_ranks):
+    """Add the difference between two ballots to the week's tally in one statement"""
+    apply_tally_delta(week, ballot_delta(old_ranks, new_ranks))
+
+def apply_tally_delta(week, delta):
+    """Upsert a {team_id: (points, ballots)} change into the week's tally in one statement"""
+    if not delta:
+        return
+    stmt = dialect_insert(WeeklyTally)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[WeeklyTally.week, WeeklyTally.team_id],
+        set_={
+            'points': WeeklyTally.points + stmt.excluded.points,
+            'ballots': WeeklyTally.ballots + stmt.excluded.ballots
+        }
+    )
+    # Rows go in team_id order so concurrent upserts lock them in the same order
+    db.session.execute(stmt, [
+        {'week': week, 'team_id': team_id, 'points': points, 'ballots': ballots}
+        for team_id, (points, ballots) in sorted(delta.items())
+    ])
+    bump_version(week_scope(week))
+
+def compute_tallies(week=None):
+    """Recompute {(week, team_id): (points, ballots)} from the stored ballots"""
+    if storage_mode() == PACKED:
+        totals = {}
+        for _, w, team_ids in iter_ballots(week):
+            for rank, team_id in enumerate(team_ids, start=1):
+                points, ballots = totals.get((w, team_id), (0, 0))
+                totals[(w, team_id)] = (points + rank_points(rank), ballots + 1)
+        return totals
+
+    query = db.session.query(
+        Vote.week,
+        Vote.team_id,
+        func.sum(rank_points(Vote.rank)),
+        func.count(Vote.id)
+    ).group_by(Vote.week, Vote.team_id)
+    if week is not None:
+        query = query.filter(Vote.week == week)
+    return {(w, team_id): (int(points), ballots) for w, team_id, points, ballots in query.all()}
+
+def stored_tallies(week=None):
+    """Read the maintained tally as {(week, team_id): (points, ballots)}, ignoring empty rows"""
+    query = db.session.query(WeeklyTally).filter(WeeklyTally.ballots != 0)
+    if week is not None:
+        query = query.filter(WeeklyTally.week == week)
+    return {(t.week, t.team_id): (t.points, t.ballots) for t in query.all()}
+
+def latest_week():
+    """Highest week with at least one ballot, or None before the first vote"""
+    return db.session.query(func.max(WeeklyTally.week)).filter(WeeklyTally.ballots > 0).scalar()
+
+def diff_tallies(expected, actual):
+    """Keys whose value differs between two tally dicts, as {key: (expected, actual)}"""
+    return {
+        key: (expected.get(key), actual.get(key))
+        for key in set(expected) | set(actual)
+        if expected.get(key) != actual.get(key)
+    }
+
+def rebuild_tallies(week=None):
+    """Replace the stored tally with one recomputed from votes; returns the mismatches found"""
+    expected = compute_tallies(week)
+    stored = stored_tallies(week)
+    mismatches = diff_tallies(expected, stored)
+    delete = WeeklyTally.query
+    if week is not None:
+        delete = delete.filter(WeeklyTally.week == week)
+    delete.delete()
+    if expected:
+        db.session.execute(dialect_insert(WeeklyTally), [
+            {'week': w, 'team_id': team_id, 'points': points, 'ballots': ballots}
+            for (w, team_id), (points, ballots) in expected.items()
+        ])
+    for w in sorted({w for w, _ in expected} | {w for w, _ in stored}):
+        bump_version(week_scope(w))
+    return mismatches
+
+class CumulativeTally:
+    """Per-team prefix sums over the weekly tallies, rebuilt when votes_version() changes.
+
+    Totals for any week range are the difference of two prefix entries, so a
+    range query costs O(teams) regardless of how many ballots were cast.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = None
+
+    def totals(self, start_week=None, end_week=None):
+        """[(team_id, points)] for teams with at least one ballot in [start_week, end_week]"""
+        version, weeks, prefix = self._current()
+        lo = 0 if start_week is None else bisect_left(weeks, start_week)
+        hi = len(weeks) if end_week is None else bisect_right(weeks, end_week)
+        if lo >= hi:
+            return []
+        return [
+            (team_id, points[hi] - points[lo])
+            for team_id, (points, ballots) in prefix.items()
+            if ballots[hi] - ballots[lo] > 0
+        ]
+
+    def clear(self):
+        with self._lock:
+            self._state = None
+
+    def _current(self):
+        version = votes_version()
+        state = self._state
+        if state is not None and state[0] == version:
+            return state
+        with self._lock:
+            if self._state is None or self._state[0] != version:
+                self._state = self._load(version)
+            return self._state
+
+    def _load(self, version):
+        rows = db.session.query(
+            WeeklyTally.week, WeeklyTally.team_id, WeeklyTally.points, WeeklyTally.ballots
+        ).filter(WeeklyTally.ballots != 0).all()
+        weeks = sorted({week for week, _, _, _ in rows})
+        index = {week: i for i, week in enumerate(weeks)}
+        per_week = {}
+        for week, team_id, points, ballots in rows:
+            team_points, team_ballots = per_week.setdefault(team_id, ([0] * len(weeks), [0] * len(weeks)))
+            team_points[index[week]] = points
+            team_ballots[index[week]] = ballots
+        # prefix[i] holds the total of the first i weeks
+        prefix = {}
+        for team_id, (team_points, team_ballots) in per_week.items():
+            cum_points, cum_ballots = [0], [0]
+            for points, ballots in zip(team_points, team_ballots):
+                cum_points.append(cum_points[-1] + points)
+                cum_ballots.append(cum_ballots[-1] + ballots)
+            prefix[team_id] = (cum_points, cum_ballots)
+        return version, weeks, prefix
+
+cumulative_tally = CumulativeTally()
+
+@click.command('rebuild-tallies')
+@click.option('--week', type=int, default=None, help='Only rebuild this week.')
+@click.option('--check', is_flag=True, help='Only compare with raw votes; exit 1 on mismatch.')
+@with_appcontext
+def rebuild_tallies_command(week, check):
+    """Recompute weekly consensus tallies and pairwise counts from raw votes and report drift."""
+    from .pairwise import compute_pairs, stored_pairs, rebuild_pairs
+    if check:
+        mismatches = diff_tallies(compute_tallies(week), stored_tallies(week))
+        pair_mismatches = diff_tallies(compute_pairs(week), stored_pairs(week))
+    else:
+        mismatches = rebuild_tallies(week)
+        pair_mismatches = rebuild_pairs(week)
+        db.session.commit()
+    for (w, team_id), (expected, actual) in sorted(mismatches.items()):
+        click.echo(f"week {w} team {team_id}: votes say {expected}, tally had {actual}")
+    for (w, winner_id, loser_id), (expected, actual) in sorted(pair_mismatches.items()):
+        click.echo(f"week {w} team {winner_id} over {loser_id}: votes say {expected}, pair count had {actual}")
+    mismatches = {**mismatches, **pair_mismatches}
+    if mismatches and check:
+        click.echo(f"❌ {len(mismatches)} tally rows do not match raw votes")
+    elif mismatches:
+        click.echo(f"🔧 Rebuilt tallies, fixing {len(mismatches)} rows that had drifted")
+    else:
+        click.echo("✅ Tallies match raw votes")
+    if check and mismatches:
+        raise SystemExit(1)
@@ -0,0 +1,138 @@
+"""Canonical team dataset and the idempotent team seed.
+
+TEAMS is the one list of teams the app knows about, as (name, conference,
+division) with division 'FBS' or 'FCS'. `flask --app app seed-teams` upserts
+all of it in a single INSERT ... ON CONFLICT (name) statement that only
+touches rows whose conference or division changed, so re-seeding an
+up-to-date database writes nothing and leaves the catalog version alone.
+"""
+
+import click
+from flask.cli import with_appcontext
+from .models import db, Team, dialect_insert
+from .catalog import CATALOG_SCOPE
+from .versions import bump_version
+
+FBS_CONFERENCES = [
+    ('SEC', [
+        "Alabama", "Arkansas", "Auburn", "Florida", "Georgia", "Kentucky", "LSU", "Mississippi State",
+        "Missouri", "Ole Miss", "South Carolina", "Tennessee", "Texas", "Oklahoma", "Texas A&M", "Vanderbilt",
+    ]),
+    ('Big Ten', [
+        "Illinois", "Indiana", "Iowa", "Maryland", "Michigan", "Michigan State", "Minnesota",
+        "Nebraska", "Northwestern", "Ohio State", "Oregon", "Penn State", "Purdue",
+        "Rutgers", "UCLA", "USC", "Washington", "Wisconsin",
+    ]),
+    ('ACC', [
+        "Boston College", "California", "Clemson", "Duke", "Florida State", "Georgia Tech",
+        "Louisville", "Miami", "North Carolina", "North Carolina State", "Pittsburgh",
+        "SMU", "Stanford", "Syracuse", "Virginia", "Virginia Tech", "Wake Forest",
+    ]),
+    ('Big 12', [
+        "Arizona", "Arizona State", "Baylor", "BYU", "Cincinnati", "Colorado", "Houston",
+        "Iowa State", "Kansas", "Kansas State", "Oklahoma State",
+        "TCU", "Texas Tech", "UCF", "Utah", "West Virginia",
+    ]),
+    ('Pac-12', ["Oregon State", "Washington State"]),
+    ('American Athletic Conference', [
+        "Army", "Charlotte", "East Carolina", "Florida Atlantic", "Memphis", "Navy", "North Texas",
+        "Rice", "South Florida", "Temple", "Tulane", "Tulsa", "UAB",
+    ]),
+    ('Conference USA', [
+        "Delaware", "FIU", "Jacksonville State", "Kennesaw State", "Liberty", "Louisiana Tech",
+        "Middle Tennessee", "Missouri State", "New Mexico State", "Sam Houston",
+        "UTEP", "Western Kentucky",
+    ]),
+    ('MAC', [
+        "Akron", "Ball State", "Bowling Green", "Buffalo", "Central Michigan", "Eastern Michigan",
+        "Kent State", "Miami (OH)", "Northern Illinois", "Ohio", "Toledo",
+        "UMass", "Western Michigan",
+    ]),
+    ('Mountain West', [
+        "Air Force", "Boise State", "Colorado State", "Fresno State", "Hawai'i", "Nevada",
+        "New Mexico", "San Diego State", "San Jose State", "UNLV", "Utah State", "Wyoming",
+    ]),
+    ('Sun Belt', [
+        "Appalachian State", "Arkansas State", "Coastal Carolina", "Georgia Southern",
+        "Georgia State", "James Madison", "Louisiana", "Louisiana-Monroe", "Marshall",
+        "Old Dominion", "South Alabama", "Southern Miss", "Texas State", "Troy",
+    ]),
+    ('FBS Independent', ["Notre Dame"]),
+]
+
+FCS_CONFERENCES = [
+    ('Big Sky', [
+        "Cal Poly", "Eastern Washington", "Idaho", "Idaho State", "Montana", "Montana State",
+        "Northern Arizona", "Northern Colorado", "Portland State", "Sacramento State",
+        "UC Davis", "Weber State",
+    ]),
+    ('Big South-OVC', [
+        "Bryant", "Charleston Southern", "Gardner-Webb", "Robert Morris", "Tennessee State",
+        "Tennessee Tech", "Eastern Illinois", "Lindenwood", "Southeast Missouri State",
+        "Tennessee-Martin", "Western Illinois",
+    ]),
+    ('CAA', [
+        "Albany", "Elon", "Hampton", "Maine", "Monmouth", "New Hampshire",
+        "Rhode Island", "Stony Brook", "Towson", "Villanova", "William & Mary",
+    ]),
+    ('Missouri Valley', [
+        "Illinois State", "Indiana State", "North Dakota", "North Dakota State",
+        "Northern Iowa", "South Dakota", "South Dakota State",
+        "Southern Illinois", "Youngstown State",
+    ]),
+    ('Northeast', ["Central Connecticut", "Duquesne", "LIU", "Merrimack", "Sacred Heart", "Stonehill", "Wagner"]),
+    ('Patriot League', ["Bucknell", "Colgate", "Fordham", "Georgetown", "Holy Cross", "Lafayette", "Lehigh", "Richmond"]),
+    ('Pioneer', [
+        "Butler", "Davidson", "Dayton", "Drake", "Marist", "Morehead State",
+        "Presbyterian", "San Diego", "St. Thomas", "Valparaiso",
+    ]),
+    ('Southern', [
+        "Chattanooga", "Citadel", "East Tennessee State", "Furman", "Mercer",
+        "Samford", "VMI", "Western Carolina", "Wofford",
+    ]),
+    ('Southland', [
+        "Houston Christian", "Incarnate Word", "Lamar", "McNeese", "Nicholls",
+        "Northwestern State", "Southeastern Louisiana", "Texas A&M-Commerce",
+    ]),
+    ('United Athletic', [
+        "Abilene Christian", "Austin Peay", "Central Arkansas", "Eastern Kentucky",
+        "North Alabama", "Stephen F. Austin", "Tarleton State", "Utah Tech", "UT Rio Grande Valley",
+    ]),
+    ('FCS Independent', ["New Haven"]),
+]
+
+TEAMS = [
+    (name, conference, division)
+    for division, conferences in (('FBS', FBS_CONFERENCES), ('FCS', FCS_CONFERENCES))
+    for conference, names in conferences
+    for name in names
+]
+
+def seed_teams(teams=TEAMS):
+    """Upsert [(name, conference, division)] in one statement; returns how many rows were added or changed"""
+    stmt = dialect_insert(Team).values([
+        {'name': name, 'conference': conference, 'division': division} for name, conference, division in teams
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Team.name],
+        set_={'conference': stmt.excluded.conference, 'division': stmt.excluded.division},
+        # Leave up-to-date rows alone so a repeat seed writes nothing
+        where=Team.conference.is_distinct_from(stmt.excluded.conference)
+        | Team.division.is_distinct_from(stmt.excluded.division)
+    )
+    changed = db.session.execute(stmt).rowcount
+    if changed:
+        # Tell every worker's team catalog to reload
+        bump_version(CATALOG_SCOPE)
+    return changed
+
+@click.command('seed-teams')
+@with_appcontext
+def seed_teams_command():
+    """Add or update every team in the canonical dataset"""
+    changed = seed_teams()
+    db.session.commit()
+    if changed:
+        click.echo(f"🏈 Seeded teams: {changed} added or updated, {len(TEAMS)} in the dataset")
+    else:
+        click.echo(f"✅ All {len(TEAMS)} teams already up to date")
@@ -0,0 +1,21 @@
+from sqlalchemy import func
+from .models import db, DataVersion, dialect_insert
+
+def bump_version(scope):
+    """Increment a scope's version as part of the current transaction"""
+    stmt = dialect_insert(DataVersion).values(scope=scope, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DataVersion.scope],
+        set_={'version': DataVersion.version + 1}
+    )
+    db.session.execute(stmt)
+
+def get_version(scope):
+    """Current version of a scope, 0 if it has never been bumped"""
+    version = db.session.query(DataVersion.version).filter_by(scope=scope).scalar()
+    return version or 0
+
+def get_prefix_version(prefix):
+    """Sum of the versions of every scope starting with prefix; grows whenever any of them is bumped"""
+    version = db.session.query(func.sum(DataVersion.version)).filter(DataVersion.scope.startswith(prefix)).scalar()
+    return version or 0
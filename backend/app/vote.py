@@ -1,123 +1,294 @@
-from flask import Blueprint, request, jsonify, session
-from .models import db, Vote, Team, User
-from sqlalchemy import func, and_
+from flask import Blueprint, request, jsonify, current_app, stream_with_context
+from .models import db, User, WeeklyTally, ConferenceChampionVote
+from .catalog import team_catalog
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
+from .tally import cumulative_tally, week_scope, latest_week, votes_version, BALLOT_LENGTH
+from .cache import response_cache
+from .conditional import versioned_response
+from .versions import bump_version, get_version
+from .ballots import user_ballots, iter_week_ballots_by_username, ballot_week_stats
+from .ingest import write_ballots, invalidate_ballot_caches, ballot_writer
+from .identity import current_identity, user_gone
+from .scoring import scoring_engine, SCORING_RULES
+from .pairwise import schulze_ranking
+from .snapshots import is_frozen, snapshot_rows, movement, SNAPSHOTS_SCOPE
 
 vote_bp = Blueprint('vote', __name__)
 
+# Version scope bumped whenever conference champion votes change
+CONFERENCE_SCOPE = 'conference'
+
+def _cached_json(key, version, compute):
+    """Serve compute()'s payload from the response cache, keyed by a data version"""
+    return versioned_response(
+        key, version, lambda: current_app.json.dumps(compute(), separators=(',', ':')) + '\n'
+    )
+
+def _with_catalog(version):
+    """Version of a payload that embeds team names: it also moves when teams are renamed or added"""
+    return (version, team_catalog.snapshot().version)
+
+def _resolve_team_ids(team_names):
+    """Map team names to ids using the in-process team catalog"""
+    ids_by_name = team_catalog.snapshot().ids_by_name
+    if any(name not in ids_by_name for name in team_names):
+        # A seed run may have added teams since our last version check
+        team_catalog.invalidate()
+        ids_by_name = team_catalog.snapshot().ids_by_name
+    return {name: ids_by_name[name] for name in team_names if name in ids_by_name}
+
+def _team_names_by_id(team_ids):
+    """Id -> name map from the catalog, re-checking its version if an id is missing"""
+    names_by_id = team_catalog.snapshot().names_by_id
+    if any(team_id not in names_by_id for team_id in team_ids):
+        team_catalog.invalidate()
+        names_by_id = team_catalog.snapshot().names_by_id
+    return names_by_id
+
 @vote_bp.route('/teams', methods=['GET'])
 def get_teams():
     """Get all available teams"""
-    teams = Team.query.order_by(Team.name).all()
-    return jsonify([{'id': team.id, 'name': team.name} for team in teams])
+    catalog = team_catalog.snapshot()
+    return versioned_response(('teams',), catalog.version, lambda: catalog.teams_json)
 
 @vote_bp.route('/submit_vote', methods=['POST'])
 def submit_vote():
-    if 'user_id' not in session:
+    identity = current_identity()
+    if identity is None:
         return jsonify({'error': 'Unauthorized'}), 401
     data = request.json
     week = data['week']
     team_names = data['rankings']
+    if len(team_names) > BALLOT_LENGTH:
+        return jsonify({'error': f'A ballot ranks at most {BALLOT_LENGTH} teams'}), 400
 
-    Vote.query.filter_by(user_id=session['user_id'], week=week).delete()
+    team_ids = _resolve_team_ids(team_names)
+    unknown = [name for name in team_names if name not in team_ids]
+    if unknown:
+        return jsonify({'error': 'Unknown teams', 'unknown_teams': unknown}), 400
+    duplicates = sorted({name for name in team_names if team_names.count(name) > 1})
+    if duplicates:
+        return jsonify({'error': 'Duplicate teams', 'duplicate_teams': duplicates}), 400
+    if is_frozen(week):
+        return jsonify({'error': f'Voting for week {week} is closed'}), 409
 
-    for rank, team_name in enumerate(team_names, start=1):
-        team = Team.query.filter_by(name=team_name).first()
-        if team:
-            db.session.add(Vote(user_id=session['user_id'], week=week, team_id=team.id, rank=rank))
+    ballot = (identity.id, week, [team_ids[name] for name in team_names])
+    if current_app.config['BALLOT_INGEST_MODE'] == 'async':
+        if not ballot_writer.submit(*ballot):
+            return jsonify({'error': 'Too many ballots in flight, please retry'}), 503, {'Retry-After': '1'}
+        return jsonify({'message': 'Vote queued'}), 202
 
-    db.session.commit()
+    # Replace the ballot and move the week's tally by the difference between
+    # the old and new ballot, all in a single transaction
+    try:
+        weeks = write_ballots([ballot])
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        if user_gone(identity):
+            return jsonify({'error': 'Unauthorized'}), 401
+        raise
+    invalidate_ballot_caches(weeks)
     return jsonify({'message': 'Vote submitted'})
 
 @vote_bp.route('/submit_conference_champions', methods=['POST'])
 def submit_conference_champions():
-    if 'user_id' not in session:
+    identity = current_identity()
+    if identity is None:
         return jsonify({'error': 'Unauthorized'}), 401
     data = request.json
     selections = data.get('champions', {})
     # Remove previous votes for this user
-    from .models import ConferenceChampionVote
-    ConferenceChampionVote.query.filter_by(user_id=session['user_id']).delete()
-    for conference, team in selections.items():
-        db.session.add(ConferenceChampionVote(user_id=session['user_id'], conference=conference, team=team))
-    db.session.commit()
+    ConferenceChampionVote.query.filter_by(user_id=identity.id).delete()
+    try:
+        if selections:
+            # One executemany instead of a flushed INSERT per conference
+            db.session.execute(insert(ConferenceChampionVote), [
+                {'user_id': identity.id, 'conference': conference, 'team': team}
+                for conference, team in selections.items()
+            ])
+        bump_version(CONFERENCE_SCOPE)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        if user_gone(identity):
+            return jsonify({'error': 'Unauthorized'}), 401
+        raise
+    response_cache.invalidate(lambda key: key[0] == 'conference_champions')
     return jsonify({'message': 'Conference champion votes submitted'})
 
 @vote_bp.route('/consensus_conference_champions', methods=['GET'])
 def consensus_conference_champions():
-    from .models import ConferenceChampionVote
-    from sqlalchemy import func
+    return _cached_json(('conference_champions',), get_version(CONFERENCE_SCOPE), _conference_champions_payload)
+
+def _conference_champions_payload():
+    """Winner, vote share and runner-up per conference from one ordered pass over the counts.
+
+    Teams are ordered by votes, then name, so ties always resolve to the
+    alphabetically first team and are flagged with 'tied'.
+    """
+    votes = func.count(ConferenceChampionVote.id)
     results = db.session.query(
         ConferenceChampionVote.conference,
         ConferenceChampionVote.team,
-        func.count(ConferenceChampionVote.team).label('votes')
-    ).group_by(ConferenceChampionVote.conference, ConferenceChampionVote.team).all()
-    # Find consensus (most voted team per conference)
+        votes.label('votes')
+    ).group_by(
+        ConferenceChampionVote.conference, ConferenceChampionVote.team
+    ).order_by(ConferenceChampionVote.conference, votes.desc(), ConferenceChampionVote.team).all()
+
     consensus = {}
-    for conf in set(r[0] for r in results):
-        conf_teams = [r for r in results if r[0] == conf]
-        winner = max(conf_teams, key=lambda x: x[2]) if conf_teams else None
-        if winner:
-            consensus[conf] = {'team': winner[1], 'votes': winner[2]}
-    return jsonify({'consensus': consensus, 'raw': [{'conference': r[0], 'team': r[1], 'votes': r[2]} for r in results]})
-@vote_bp.route('/consensus/<int:week>', methods=['GET'])
-def consensus(week):
-    results = db.session.query(
-        Team.name,
-        func.sum(26 - Vote.rank).label('points')
-    ).join(Team).filter(Vote.week == week).group_by(Team.name).order_by(func.sum(26 - Vote.rank).desc()).all()
+    totals = {}
+    for conf, team, count in results:
+        totals[conf] = totals.get(conf, 0) + count
+        winner = consensus.get(conf)
+        if winner is None:
+            consensus[conf] = {'team': team, 'votes': count, 'runner_up': None, 'tied': False}
+        elif winner['runner_up'] is None:
+            winner['runner_up'] = {'team': team, 'votes': count}
+            winner['tied'] = count == winner['votes']
+    for conf, winner in consensus.items():
+        winner['share'] = round(winner['votes'] / totals[conf], 4)
+    return {'consensus': consensus, 'raw': [{'conference': r[0], 'team': r[1], 'votes': r[2]} for r in results]}
+
+def _ranking_response(tallies):
+    """Build the ranked/unranked payload from (team_id, points) pairs"""
+    names_by_id = _team_names_by_id(team_id for team_id, _ in tallies)
+    results = sorted(((names_by_id[team_id], points) for team_id, points in tallies), key=lambda r: (-r[1], r[0]))
 
     # Top 25 teams
     top_25 = results[:25]
     # Teams that got votes but not enough to be ranked
     unranked = results[25:]
 
-    response = {
+    return {
         'ranked': [{ 'team': r[0], 'points': r[1] } for r in top_25],
         'unranked': [{ 'team': r[0], 'points': r[1] } for r in unranked]
     }
-    return jsonify(response)
+
+@vote_bp.route('/consensus/<int:week>', methods=['GET'])
+def consensus(week):
+    def compute():
+        # Frozen weeks are served from their snapshot
+        snapshot = snapshot_rows(week)
+        if snapshot:
+            return _ranking_response([(team_id, points) for team_id, _, points, _ in snapshot])
+        return _ranking_response(db.session.query(WeeklyTally.team_id, WeeklyTally.points).filter(
+            WeeklyTally.week == week, WeeklyTally.ballots > 0
+        ).all())
+    return _cached_json(('consensus', week), _with_catalog(get_version(week_scope(week))), compute)
+
+@vote_bp.route('/movement/<int:week>', methods=['GET'])
+def week_movement(week):
+    """Top 25 of a frozen week with each team's move since the previous frozen week"""
+    def compute():
+        previous_week, ranked, dropped = movement(week)
+        names_by_id = _team_names_by_id([team_id for team_id, *_ in ranked] + [team_id for team_id, _ in dropped])
+        def status(rank, previous_rank):
+            if previous_rank is None:
+                return 'new'
+            return 'up' if previous_rank > rank else 'down' if previous_rank < rank else 'same'
+        return {
+            'week': week,
+            'previous_week': previous_week,
+            'ranked': [{
+                'team': names_by_id[team_id], 'rank': rank, 'points': points, 'first_place_votes': firsts,
+                'previous_rank': previous_rank, 'status': status(rank, previous_rank),
+                'change': previous_rank - rank if previous_rank is not None else None,
+            } for team_id, rank, points, firsts, previous_rank in ranked],
+            'dropped': [{'team': names_by_id[team_id], 'previous_rank': rank} for team_id, rank in dropped],
+        }
+    # Checked on every request: a week can be frozen after its 404 was served
+    if not is_frozen(week):
+        return jsonify({'error': f'Week {week} is not frozen'}), 404
+    return _cached_json(('movement', week), _with_catalog(get_version(SNAPSHOTS_SCOPE)), compute)
+
+@vote_bp.route('/consensus/rules', methods=['GET'])
+def scoring_rules():
+    """Scoring rules available to /consensus/<week>/<rule>"""
+    return jsonify({name: description for name, (description, _) in SCORING_RULES.items()})
+
+@vote_bp.route('/consensus/<int:week>/<rule>', methods=['GET'])
+def consensus_by_rule(week, rule):
+    """Consensus for a week under another scoring rule, in the same shape as /consensus/<week>"""
+    if rule not in SCORING_RULES:
+        return jsonify({'error': 'Unknown scoring rule', 'rules': list(SCORING_RULES)}), 404
+    return _cached_json(('consensus', week, rule), _with_catalog(get_version(week_scope(week))),
+                        lambda: _ranking_response(scoring_engine.score(week, rule)))
+
+@vote_bp.route('/schulze/<int:week>', methods=['GET'])
+def schulze(week):
+    """Pairwise-majority (Schulze) ordering for a week, from the maintained pair counts"""
+    def compute():
+        ranking = schulze_ranking(week)
+        names_by_id = _team_names_by_id(team_id for team_id, _, _ in ranking)
+        return {
+            'week': week,
+            'ranking': [
+                {'team': names_by_id[team_id], 'place': place, 'beats': beats}
+                for team_id, place, beats in sorted(ranking, key=lambda r: (r[1], names_by_id[r[0]]))
+            ]
+        }
+    return _cached_json(('consensus', week, 'schulze'), _with_catalog(get_version(week_scope(week))), compute)
+
+def warm_caches():
+    """Load the team catalog and the current week's consensus before a worker serves traffic.
+
+    The current week is CURRENT_WEEK if set, else the latest week with ballots.
+    Returns the week that was warmed (None if there are no ballots yet).
+    """
+    team_catalog.snapshot()
+    week = current_app.config.get('CURRENT_WEEK') or latest_week()
+    if week is not None:
+        consensus(week)
+    return week
 
 @vote_bp.route('/leaderboard/overall', methods=['GET'])
 def overall_leaderboard():
     """Get overall rankings across all weeks and users"""
-    results = db.session.query(
-        Team.name,
-        func.sum(26 - Vote.rank).label('points')
-    ).join(Team).group_by(Team.name).order_by(func.sum(26 - Vote.rank).desc()).all()
+    return _cached_json(('leaderboard', None, None), _with_catalog(votes_version()), lambda: _ranking_response(
+        cumulative_tally.totals()
+    ))
 
-    top_25 = results[:25]
-    unranked = results[25:]
+@vote_bp.route('/leaderboard/weeks/<int:start_week>/<int:end_week>', methods=['GET'])
+def range_leaderboard(start_week, end_week):
+    """Get rankings summed over weeks start_week..end_week (inclusive)"""
+    if start_week > end_week:
+        return jsonify({'error': 'start_week must not be after end_week'}), 400
+    return _cached_json(('leaderboard', start_week, end_week), _with_catalog(votes_version()), lambda: _ranking_response(
+        cumulative_tally.totals(start_week, end_week)
+    ))
 
-    response = {
-        'ranked': [{ 'team': r[0], 'points': r[1] } for r in top_25],
-        'unranked': [{ 'team': r[0], 'points': r[1] } for r in unranked]
-    }
-    return jsonify(response)
+@vote_bp.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Hit/miss/recompute counters for the consensus response cache"""
+    return jsonify(response_cache.stats())
+
+@vote_bp.route('/ingest/stats', methods=['GET'])
+def ingest_stats():
+    """Queue depth and write counters for async ballot ingestion"""
+    return jsonify(ballot_writer.stats())
 
 @vote_bp.route('/my_votes', methods=['GET'])
 def my_votes():
-    if 'user_id' not in session:
+    identity = current_identity()
+    if identity is None:
         return jsonify({'error': 'Unauthorized'}), 401
-    votes = db.session.query(Vote.week, Team.name, Vote.rank).join(Team).filter(Vote.user_id == session['user_id']).all()
-    vote_history = {}
-    for week, team, rank in votes:
-        vote_history.setdefault(week, []).append((rank, team))
-    return jsonify({week: [t for _, t in sorted(rankings)] for week, rankings in vote_history.items()})
+    history = user_ballots(identity.id)
+    names_by_id = _team_names_by_id(team_id for team_ids in history.values() for team_id in team_ids)
+    return jsonify({week: [names_by_id[team_id] for team_id in team_ids] for week, team_ids in history.items()})
 
 @vote_bp.route('/test/votes/<int:week>', methods=['GET'])
 def test_votes(week):
     """Get all votes for a specific week with user information (for testing)"""
-    votes = db.session.query(
-        User.username,
-        Team.name,
-        Vote.rank
-    ).join(User).join(Team).filter(Vote.week == week).order_by(User.username, Vote.rank).all()
-    
+    names_by_id = _team_names_by_id(())
     vote_data = {}
-    for username, team, rank in votes:
-        if username not in vote_data:
-            vote_data[username] = []
-        vote_data[username].append({'team': team, 'rank': rank})
+    for username, team_ids in iter_week_ballots_by_username(week):
+        if any(team_id not in names_by_id for team_id in team_ids):
+            names_by_id = _team_names_by_id(team_ids)
+        vote_data[username] = [
+            {'team': names_by_id[team_id], 'rank': rank} for rank, team_id in enumerate(team_ids, start=1)
+        ]
     
     return jsonify({
         'week': week,
@@ -125,6 +296,47 @@ def test_votes(week):
         'votes': vote_data
     })
 
+@vote_bp.route('/test/votes/<int:week>/stream', methods=['GET'])
+def test_votes_stream(week):
+    """Stream a week's ballots as NDJSON, one {"username", "votes"} object per line.
+
+    ?after=<username> resumes after that voter and ?limit=N caps the page; a
+    truncated page ends with a {"next_after": <username>} line.
+    """
+    after = request.args.get('after')
+    limit = request.args.get('limit', type=int)
+    if limit is not None and limit < 1:
+        return jsonify({'error': 'limit must be positive'}), 400
+
+    def generate():
+        names_by_id = _team_names_by_id(())
+        dumps = current_app.json.dumps
+        chunk, size, count = [], 0, 0
+        ballots = iter_week_ballots_by_username(week, after=after)
+        for username, team_ids in ballots:
+            if limit is not None and count == limit:
+                line = dumps({'next_after': last_username}, separators=(',', ':'))
+                chunk.append(line + '\n')
+                break
+            if any(team_id not in names_by_id for team_id in team_ids):
+                names_by_id = _team_names_by_id(team_ids)
+            line = dumps({'username': username, 'votes': [
+                {'team': names_by_id[team_id], 'rank': rank} for rank, team_id in enumerate(team_ids, start=1)
+            ]}, separators=(',', ':')) + '\n'
+            chunk.append(line)
+            size += len(line)
+            count += 1
+            last_username = username
+            # Write in ~64 KB pieces rather than one tiny write per voter
+            if size >= 65536:
+                yield ''.join(chunk)
+                chunk, size = [], 0
+        ballots.close()  # release the cursor now when a page stops early
+        if chunk:
+            yield ''.join(chunk)
+
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @vote_bp.route('/test/stats', methods=['GET'])
 def test_stats():
     """Get overall voting statistics (for testing)"""
@@ -132,15 +344,11 @@ def test_stats():
     total_users = User.query.count()
     
     # Get votes by week
-    week_stats = db.session.query(
-        Vote.week,
-        func.count(Vote.user_id.distinct()).label('voters'),
-        func.count(Vote.id).label('total_votes')
-    ).group_by(Vote.week).order_by(Vote.week).all()
+    week_stats = ballot_week_stats()
     
     stats = {
         'total_users': total_users,
-        'weeks': [{'week': w, 'voters': v, 'total_votes': t} for w, v, t in week_stats]
+        'weeks': [{'week': w, 'voters': v, 'total_votes': int(t)} for w, v, t in week_stats]
     }
     
     return jsonify(stats)
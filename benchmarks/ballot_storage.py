@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Compare the 'rows' and 'packed' ballot layouts.
+
+Every synthetic voter submits a 25-team ballot and then resubmits it with
+two teams swapped. For each layout this reports the rows written/deleted
+(inserted plus deleted, i.e. write amplification), the wall time and the on-disk size of the ballot
+table and its indexes.
+
+    python benchmarks/ballot_storage.py --voters 5000
+    DATABASE_URL=postgresql://... python benchmarks/ballot_storage.py
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, insert, delete, text
+
+def table_size(connection, mode):
+    """Bytes used by the layout's table plus its indexes"""
+    table = 'ballots' if mode == 'packed' else 'vote'
+    if connection.dialect.name == 'postgresql':
+        return connection.execute(text(f"SELECT pg_total_relation_size('{table}')")).scalar()
+    connection.execute(text('VACUUM'))
+    try:
+        return connection.execute(text(
+            "SELECT SUM(pgsize) FROM dbstat WHERE name = :table "
+            "OR name IN (SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table)"
+        ), {'table': table}).scalar()
+    except Exception:
+        # SQLite built without the dbstat table: fall back to the whole file
+        return connection.execute(text('PRAGMA page_count')).scalar() * connection.execute(text('PRAGMA page_size')).scalar()
+
+def run(mode, voters, teams, database_url):
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['BALLOT_STORAGE'] = mode
+    from backend.app import create_app
+    from backend.app.models import db, User, Team, Vote, Ballot
+    from backend.app.ballots import replace_ballot
+
+    app = create_app()
+    rng = random.Random(42)
+    written = {'rows': 0}
+    with app.app_context():
+        for model in (Vote, Ballot, User, Team):
+            db.session.execute(delete(model))
+        db.session.execute(insert(Team), [{'name': f'Team {i}'} for i in range(1, teams + 1)])
+        db.session.execute(insert(User), [{'username': f'voter{i}', 'password_hash': 'x'} for i in range(voters)])
+        db.session.commit()
+        user_ids = [user.id for user in User.query.all()]
+        team_ids = [team.id for team in Team.query.all()]
+
+        def count_rows(conn, cursor, statement, parameters, context, executemany):
+            verb = statement.lstrip().split(' ', 1)[0].upper()
+            if verb == 'INSERT' and ('vote' in statement or 'ballots' in statement) and cursor.rowcount > 0:
+                written['rows'] += cursor.rowcount
+        event.listen(db.engine, 'after_cursor_execute', count_rows)
+
+        started = time.perf_counter()
+        for user_id in user_ids:
+            ballot = rng.sample(team_ids, 25)
+            replace_ballot(user_id, 1, ballot)
+            db.session.commit()
+            i, j = rng.sample(range(25), 2)
+            ballot[i], ballot[j] = ballot[j], ballot[i]
+            old_ranks = replace_ballot(user_id, 1, ballot)
+            db.session.commit()
+            # DELETE ... RETURNING has no reliable rowcount; count what it returned instead
+            written['rows'] += (1 if old_ranks else 0) if mode == 'packed' else len(old_ranks)
+        elapsed = time.perf_counter() - started
+        event.remove(db.engine, 'after_cursor_execute', count_rows)
+
+        with db.engine.connect() as connection:
+            size = table_size(connection, mode)
+    return {'mode': mode, 'rows_written': written['rows'], 'seconds': elapsed, 'bytes': size}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--voters', type=int, default=2000)
+    parser.add_argument('--teams', type=int, default=260)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    results = []
+    for mode in ('rows', 'packed'):
+        database_url = os.environ.get('DATABASE_URL') or 'sqlite:///' + os.path.join(tmp, f'{mode}.db')
+        results.append(run(mode, args.voters, args.teams, database_url))
+
+    print(f"{'layout':<8} {'rows written':>13} {'per ballot':>11} {'seconds':>8} {'table+index bytes':>18}")
+    for r in results:
+        per_ballot = r['rows_written'] / (2 * args.voters)
+        print(f"{r['mode']:<8} {r['rows_written']:>13} {per_ballot:>11.1f} {r['seconds']:>8.2f} {r['bytes']:>18}")
+    rows, packed = results
+    print(f"\npacked writes {rows['rows_written'] / max(packed['rows_written'], 1):.0f}x fewer rows "
+          f"and uses {rows['bytes'] / max(packed['bytes'], 1):.1f}x less space")
+
+if __name__ == '__main__':
+    main()
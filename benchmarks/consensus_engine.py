@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+NumPy consensus engine vs the SQL tally at scale.
+
+Seeds one week with --ballots ballots (100k by default), computes the
+consensus three ways and checks they agree:
+
+  * stored tally   - what /api/vote/consensus/<week> serves (weekly_tallies)
+  * SQL recompute  - SUM(26 - rank) over the vote rows
+  * engine 'borda' - the ballot matrix scored with bincount
+
+then times loading the matrix once and scoring every registered rule on it.
+With --storage packed the app reads the packed ballots, and the same ballots
+are also written to the vote table so the SQL recompute stays an independent
+reference (the packed tally itself is built by a Python loop).
+
+    python benchmarks/consensus_engine.py
+    python benchmarks/consensus_engine.py --ballots 20000 --storage packed
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ballots', type=int, default=100000)
+    parser.add_argument('--teams', type=int, default=133)
+    parser.add_argument('--storage', choices=('rows', 'packed'), default='rows')
+    args = parser.parse_args()
+
+    from backend.app import create_app
+    from backend.app.models import db, User, Team, Vote, Ballot
+    from backend.app.ballots import pack_team_ids
+    from backend.app.tally import rebuild_tallies, stored_tallies
+    from backend.app.scoring import scoring_engine, SCORING_RULES
+
+    tmp = tempfile.mkdtemp()
+    database_url = os.environ.get('DATABASE_URL') or 'sqlite:///' + os.path.join(tmp, 'consensus.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': database_url, 'BALLOT_STORAGE': args.storage})
+    with app.app_context():
+        print(f"🌱 Seeding {args.ballots} ballots over {args.teams} teams ({args.storage} layout)...")
+        db.session.execute(insert(Team), [{'name': f'Team {i}'} for i in range(1, args.teams + 1)])
+        db.session.execute(insert(User), [{'username': f'voter{i}', 'password_hash': 'x'} for i in range(args.ballots)])
+        team_ids = [team_id for team_id, in db.session.query(Team.id)]
+        user_ids = [user_id for user_id, in db.session.query(User.id)]
+        # Voters agree roughly on strength, like real polls do
+        rng = random.Random(19)
+        strength = {team_id: rng.random() for team_id in team_ids}
+        for start in range(0, len(user_ids), 10000):
+            ballots = []
+            for user_id in user_ids[start:start + 10000]:
+                noisy = sorted(team_ids, key=lambda t: -(strength[t] + rng.gauss(0, 0.15)))
+                ballots.append((user_id, noisy[:25]))
+            if args.storage == 'packed':
+                db.session.execute(insert(Ballot), [{'user_id': u, 'week': 1, 'team_ids': pack_team_ids(b)} for u, b in ballots])
+            # The SQL reference always reads vote rows
+            db.session.execute(insert(Vote), [
+                {'user_id': u, 'week': 1, 'team_id': t, 'rank': r} for u, b in ballots for r, t in enumerate(b, start=1)
+            ])
+        rebuild_tallies(1)
+        db.session.commit()
+
+        started = time.perf_counter()
+        recomputed = {team_id: int(points) for team_id, points in db.session.query(
+            Vote.team_id, func.sum(26 - Vote.rank)).filter(Vote.week == 1).group_by(Vote.team_id)}
+        sql_seconds = time.perf_counter() - started
+        stored = {team_id: points for (_, team_id), (points, _) in stored_tallies(1).items()}
+
+        started = time.perf_counter()
+        matrix = scoring_engine.matrix(1)
+        load_seconds = time.perf_counter() - started
+        timings = {}
+        for rule in SCORING_RULES:
+            started = time.perf_counter()
+            scores = dict(scoring_engine.score(1, rule))
+            timings[rule] = time.perf_counter() - started
+            if rule == 'borda':
+                borda = scores
+
+        client = app.test_client()
+        same_payload = client.get('/api/vote/consensus/1/borda').get_json() == client.get('/api/vote/consensus/1').get_json()
+
+    print(f"\n📥 Loaded a {matrix.voters} x 25 matrix ({matrix.team_count} teams) in {load_seconds:.2f}s")
+    print(f"🗄️  SQL recompute of SUM(26 - rank): {sql_seconds:.2f}s")
+    print(f"\n{'rule':<14} {'score (ms)':>11}")
+    for rule, seconds in timings.items():
+        print(f"{rule:<14} {seconds * 1000:>11.1f}")
+
+    ok = borda == recomputed == stored and same_payload
+    print(f"\n{'✅' if ok else '❌'} borda matches the SQL recompute: {borda == recomputed}, "
+          f"the stored tally: {borda == stored}, the /consensus payload: {same_payload}")
+    sys.exit(0 if ok else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Check that every endpoint's hot query is served by an index.
+
+Seeds a database with realistic row counts (if it has no votes yet), runs
+EXPLAIN on the query behind each endpoint and exits non-zero if any of them
+falls back to a sequential scan of a large table.
+
+    python benchmarks/explain_plans.py                      # temporary SQLite file
+    DATABASE_URL=postgresql://... python benchmarks/explain_plans.py
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, delete, func, insert, text
+
+# Tables big enough that a full scan on a hot path is a bug
+LARGE_TABLES = {'vote', 'ballots', 'user', 'conference_champion_votes'}
+
+def endpoint_queries(models):
+    """(endpoint, statement, tables allowed to be fully scanned) for every hot query"""
+    User, Vote = models.User, models.Vote
+    WeeklyTally, ConferenceChampionVote = models.WeeklyTally, models.ConferenceChampionVote
+    Ballot = models.Ballot
+    return [
+        ('auth.register / auth.login', select(User).where(User.username == 'voter42'), set()),
+        ('auth.me', select(User).where(User.id == 42), set()),
+        ('vote.submit_vote (replace ballot)',
+         delete(Vote).where(Vote.user_id == 42, Vote.week == 3), set()),
+        ('vote.consensus',
+         select(WeeklyTally.team_id, WeeklyTally.points).where(WeeklyTally.week == 3, WeeklyTally.ballots > 0), set()),
+        ('vote.my_votes',
+         select(Vote.week, Vote.team_id).where(Vote.user_id == 42).order_by(Vote.week, Vote.rank), set()),
+        ('vote.test_votes',
+         select(User.username, Vote.team_id).join(User).where(Vote.week == 3).order_by(User.username, Vote.rank), set()),
+        ('rebuild-tallies --week',
+         select(Vote.week, Vote.team_id, func.sum(26 - Vote.rank), func.count(Vote.id))
+         .where(Vote.week == 3).group_by(Vote.week, Vote.team_id), set()),
+        ('vote.submit_vote (replace packed ballot)',
+         delete(Ballot).where(Ballot.user_id == 42, Ballot.week == 3), set()),
+        ('vote.my_votes (packed)',
+         select(Ballot.week, Ballot.team_ids).where(Ballot.user_id == 42), set()),
+        ('vote.test_votes (packed)',
+         select(User.username, Ballot.team_ids).join(User).where(Ballot.week == 3).order_by(User.username), set()),
+        ('vote.submit_conference_champions (replace picks)',
+         delete(ConferenceChampionVote).where(ConferenceChampionVote.user_id == 42), set()),
+        # Whole-table aggregates: a full pass is inherent, an index-only pass is preferred
+        ('vote.test_stats',
+         select(Vote.week, func.count(Vote.user_id.distinct()), func.count(Vote.id)).group_by(Vote.week),
+         {'vote'}),
+        ('vote.consensus_conference_champions',
+         select(ConferenceChampionVote.conference, ConferenceChampionVote.team, func.count(ConferenceChampionVote.team))
+         .group_by(ConferenceChampionVote.conference, ConferenceChampionVote.team),
+         {'conference_champion_votes'}),
+    ]
+
+def seed(db, models, users, weeks, teams):
+    """Bulk-load synthetic users, ballots and conference picks"""
+    from backend.app.ballots import pack_team_ids
+    rng = random.Random(7)
+    db.session.execute(insert(models.Team), [{'name': f'Team {i}'} for i in range(1, teams + 1)])
+    db.session.execute(insert(models.User), [
+        {'username': f'voter{i}', 'password_hash': 'x'} for i in range(1, users + 1)
+    ])
+    team_ids = list(range(1, teams + 1))
+    for week in range(1, weeks + 1):
+        rows, packed = [], []
+        for user_id in range(1, users + 1):
+            ballot = rng.sample(team_ids, 25)
+            rows.extend({'user_id': user_id, 'week': week, 'team_id': t, 'rank': r} for r, t in enumerate(ballot, 1))
+            packed.append({'user_id': user_id, 'week': week, 'team_ids': pack_team_ids(ballot)})
+        # Fill both ballot layouts so each one's queries are planned against real data
+        db.session.execute(insert(models.Vote), rows)
+        db.session.execute(insert(models.Ballot), packed)
+    conferences = [f'Conference {i}' for i in range(10)]
+    db.session.execute(insert(models.ConferenceChampionVote), [
+        {'user_id': user_id, 'conference': conf, 'team': f'Team {rng.randint(1, 12)}'}
+        for user_id in range(1, users + 1) for conf in conferences
+    ])
+    db.session.commit()
+
+def full_scans(connection, statement):
+    """Names of tables the plan reads with a sequential scan"""
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+    if connection.dialect.name == 'postgresql':
+        plan = connection.execute(text(f'EXPLAIN (FORMAT JSON) {sql}')).scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        scans, nodes = set(), [plan[0]['Plan']]
+        while nodes:
+            node = nodes.pop()
+            if node['Node Type'] == 'Seq Scan':
+                scans.add(node['Relation Name'])
+            nodes.extend(node.get('Plans', []))
+        return scans
+    scans = set()
+    for row in connection.execute(text(f'EXPLAIN QUERY PLAN {sql}')):
+        match = re.match(r'SCAN (?:TABLE )?"?(\w+)"?(?: AS \w+)?$', row[-1])
+        if match:
+            scans.add(match.group(1))
+    return scans
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--weeks', type=int, default=15)
+    parser.add_argument('--teams', type=int, default=260)
+    args = parser.parse_args()
+
+    if 'DATABASE_URL' not in os.environ:
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'explain.db')
+    from backend.app import create_app
+    from backend.app import models
+
+    app = create_app()
+    failures = 0
+    with app.app_context():
+        db = models.db
+        if not db.session.query(models.Vote.id).first():
+            print(f"🌱 Seeding {args.users} voters x {args.weeks} weeks ...")
+            seed(db, models, args.users, args.weeks, args.teams)
+        with db.engine.connect() as connection:
+            connection.execute(text('ANALYZE'))
+            for endpoint, statement, allowed in endpoint_queries(models):
+                scans = (full_scans(connection, statement) & LARGE_TABLES) - allowed
+                if scans:
+                    failures += 1
+                    print(f"❌ {endpoint}: sequential scan on {', '.join(sorted(scans))}")
+                else:
+                    print(f"✅ {endpoint}")
+    if failures:
+        print(f"\n{failures} queries fell back to sequential scans")
+        sys.exit(1)
+    print("\nAll endpoint queries use indexes")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Season export: columnar archive vs the JSON the test endpoints return.
+
+Seeds a season of ballots, exports it with iter_archive (what
+`flask --app app export-ballots` runs), reads it back
+through the memory-mapped reader, and compares size and time with dumping
+the same ballots as /api/vote/test/votes/<week> JSON.
+
+    python benchmarks/export_archive.py --voters 5000 --weeks 15
+    python benchmarks/export_archive.py --storage packed
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--voters', type=int, default=3000)
+    parser.add_argument('--weeks', type=int, default=15)
+    parser.add_argument('--storage', choices=('rows', 'packed'), default='rows')
+    args = parser.parse_args()
+
+    from backend.app import create_app
+    from backend.app.models import db, User, Team, Vote, Ballot
+    from backend.app.ballots import pack_team_ids
+    from backend.app.export import iter_archive, BallotArchive
+
+    tmp = tempfile.mkdtemp()
+    database_url = os.environ.get('DATABASE_URL') or 'sqlite:///' + os.path.join(tmp, 'season.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': database_url, 'BALLOT_STORAGE': args.storage})
+    with app.app_context():
+        print(f"🌱 Seeding {args.voters} voters x {args.weeks} weeks ({args.storage} layout)...")
+        db.session.execute(insert(Team), [{'name': f'Team {i}'} for i in range(1, 134)])
+        db.session.execute(insert(User), [{'username': f'voter{i}', 'password_hash': 'x'} for i in range(args.voters)])
+        team_ids = [team_id for team_id, in db.session.query(Team.id)]
+        user_ids = [user_id for user_id, in db.session.query(User.id)]
+        rng = random.Random(7)
+        for week in range(1, args.weeks + 1):
+            ballots = [(user_id, rng.sample(team_ids, 25)) for user_id in user_ids]
+            if args.storage == 'packed':
+                db.session.execute(insert(Ballot), [
+                    {'user_id': u, 'week': week, 'team_ids': pack_team_ids(b)} for u, b in ballots
+                ])
+            else:
+                db.session.execute(insert(Vote), [
+                    {'user_id': u, 'week': week, 'team_id': t, 'rank': r}
+                    for u, b in ballots for r, t in enumerate(b, start=1)
+                ])
+        db.session.commit()
+
+        path = os.path.join(tmp, 'season.cfb')
+        started = time.perf_counter()
+        with open(path, 'wb') as f:
+            for chunk in iter_archive():
+                f.write(chunk)
+        export_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with BallotArchive(path) as archive:
+            rows = len(archive)
+            points = sum(26 - rank for group in archive.row_groups() for rank in group['rank'])
+        read_seconds = time.perf_counter() - started
+
+        client = app.test_client()
+        started = time.perf_counter()
+        json_bytes = sum(len(json.dumps(client.get(f'/api/vote/test/votes/{week}').get_json()))
+                         for week in range(1, args.weeks + 1))
+        json_seconds = time.perf_counter() - started
+
+    archive_bytes = os.path.getsize(path)
+    print(f"\n{'format':<10} {'size (MB)':>10} {'write (s)':>10}")
+    print(f"{'archive':<10} {archive_bytes / 1e6:>10.1f} {export_seconds:>10.2f}")
+    print(f"{'json':<10} {json_bytes / 1e6:>10.1f} {json_seconds:>10.2f}")
+    print(f"\n📦 {rows} ranked rows; archive is {archive_bytes / json_bytes:.0%} of the JSON size")
+    print(f"📖 mmap read of every rank ({points} points) took {read_seconds:.2f}s")
+
+if __name__ == '__main__':
+    main()
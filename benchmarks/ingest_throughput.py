@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Ballot ingestion throughput: synchronous commits vs the write-behind queue.
+
+Concurrent clients post full 25-team ballots to /api/vote/submit_vote (each
+voter submits a few times, as happens before a deadline). For each mode this
+reports how fast requests are acknowledged and how long until every ballot
+is durably written, then checks the stored tallies against the raw ballots.
+
+    python benchmarks/ingest_throughput.py --voters 500 --threads 16
+    DATABASE_URL=postgresql://... python benchmarks/ingest_throughput.py
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, insert
+
+def run(mode, args, database_url):
+    from backend.app import create_app
+    from backend.app.models import db, User, Team, Vote, Ballot, WeeklyTally
+    from backend.app.ingest import ballot_writer
+    from backend.app.tally import compute_tallies, stored_tallies, diff_tallies
+
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        'SESSION_COOKIE_SECURE': False,
+        'BALLOT_INGEST_MODE': mode,
+    })
+    with app.app_context():
+        for model in (WeeklyTally, Vote, Ballot, User, Team):
+            db.session.execute(delete(model))
+        db.session.execute(insert(Team), [{'name': f'Team {i}'} for i in range(1, 261)])
+        db.session.execute(insert(User), [{'username': f'voter{i}', 'password_hash': 'x'} for i in range(args.voters)])
+        db.session.commit()
+        user_ids = [user_id for user_id, in db.session.query(User.id)]
+        team_names = [f'Team {i}' for i in range(1, 261)]
+
+    work = [(user_id, random.Random(user_id * 31 + n).sample(team_names, 25))
+            for n in range(args.submissions) for user_id in user_ids]
+    random.Random(1).shuffle(work)
+    chunks = [work[i::args.threads] for i in range(args.threads)]
+    statuses = []
+
+    def client_loop(chunk):
+        client = app.test_client()
+        for user_id, ranking in chunk:
+            with client.session_transaction() as sess:
+                sess['user_id'] = user_id
+            response = client.post('/api/vote/submit_vote', json={'week': 1, 'rankings': ranking})
+            statuses.append(response.status_code)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client_loop, args=(chunk,)) for chunk in chunks]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    acked = time.perf_counter() - started
+    ballot_writer.flush()
+    durable = time.perf_counter() - started
+    stats = ballot_writer.stats()
+    ballot_writer.stop()
+
+    with app.app_context():
+        consistent = not diff_tallies(compute_tallies(1), stored_tallies(1))
+    return {
+        'mode': mode,
+        'requests': len(work),
+        'ack_per_sec': len(work) / acked,
+        'durable_seconds': durable,
+        'errors': sum(1 for s in statuses if s >= 400),
+        'coalesced': stats['coalesced'],
+        'batches': stats['batches'],
+        'consistent': consistent,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--voters', type=int, default=500)
+    parser.add_argument('--submissions', type=int, default=2, help='Ballots per voter')
+    parser.add_argument('--threads', type=int, default=16)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    results = []
+    for mode in ('sync', 'async'):
+        database_url = os.environ.get('DATABASE_URL') or 'sqlite:///' + os.path.join(tmp, f'{mode}.db')
+        results.append(run(mode, args, database_url))
+
+    print(f"{'mode':<6} {'requests':>9} {'acks/s':>9} {'all durable (s)':>16} {'errors':>7} {'coalesced':>10} {'batches':>8} {'tallies ok':>11}")
+    for r in results:
+        print(f"{r['mode']:<6} {r['requests']:>9} {r['ack_per_sec']:>9.0f} {r['durable_seconds']:>16.2f} "
+              f"{r['errors']:>7} {r['coalesced']:>10} {r['batches']:>8} {str(r['consistent']):>11}")
+    sync, async_ = results
+    print(f"\nwrite-behind finished {sync['durable_seconds'] / async_['durable_seconds']:.1f}x faster end to end")
+
+if __name__ == '__main__':
+    main()
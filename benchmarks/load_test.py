@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Concurrent load test for the voting API.
+
+Loads teams and synthetic voters into a database (SQLite stand-in by default,
+or the Postgres at DATABASE_URL), starts the app under gunicorn with the
+production profile (gunicorn.conf.py) in separate processes, and drives a
+concurrent mix of register / login / submit_vote / consensus / leaderboard /
+my_votes traffic over keep-alive HTTP connections from this one. Client
+threads and server workers never share an interpreter, so neither is
+measured with the other's GIL contention. Reports per-endpoint throughput and
+p50/p95/p99 latency, and saves the results as JSON so runs can be compared
+between commits.
+
+    python benchmarks/load_test.py                         # 2000 voters, 32 clients
+    python benchmarks/load_test.py --voters 5000 --requests 50000
+    python benchmarks/load_test.py --workers 4             # default: gunicorn.conf.py's
+    python benchmarks/load_test.py --base-url http://localhost:5000   # existing server
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from urllib.request import urlopen
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEAM_NAMES = [f'Team {i}' for i in range(1, 261)]
+PASSWORD = 'load-test-password'
+
+# Relative weight of each request type in the mixed phase
+DEFAULT_MIX = {
+    'submit_vote': 30,
+    'consensus': 35,
+    'leaderboard': 10,
+    'my_votes': 10,
+    'teams': 10,
+    'login': 5,
+}
+
+class Client:
+    """One keep-alive HTTP connection with a session cookie"""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.connection = connection_class(parts.hostname, parts.port, timeout=60)
+        self.cookie = None
+
+    def request(self, method, path, payload=None, cookie=None):
+        headers = {'Content-Type': 'application/json'}
+        if cookie:
+            headers['Cookie'] = cookie
+        body = json.dumps(payload) if payload is not None else None
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+        except (http.client.HTTPException, OSError):
+            # Server closed the keep-alive connection; reconnect once
+            self.connection.close()
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+        data = response.read()
+        set_cookie = response.getheader('Set-Cookie')
+        return response.status, data, set_cookie.split(';', 1)[0] if set_cookie else None
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint, seconds, status):
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            if status >= 400:
+                self.errors[endpoint] += 1
+
+    def summary(self, wall_seconds):
+        report = {}
+        for endpoint, samples in sorted(self.latencies.items()):
+            samples = sorted(samples)
+            pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+            report[endpoint] = {
+                'requests': len(samples),
+                'errors': self.errors[endpoint],
+                'throughput_rps': round(len(samples) / wall_seconds, 1),
+                'p50_ms': round(pick(0.50), 2),
+                'p95_ms': round(pick(0.95), 2),
+                'p99_ms': round(pick(0.99), 2),
+            }
+        return report
+
+def prepare_database(database_url, voters):
+    """Create the tables, teams and pre-hashed voters the load test expects"""
+    from werkzeug.security import generate_password_hash
+    from sqlalchemy import insert
+    from backend.app import create_app
+    from backend.app.models import db, Team, User
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': database_url})
+    with app.app_context():
+        if not Team.query.first():
+            db.session.execute(insert(Team), [{'name': name} for name in TEAM_NAMES])
+        # One real hash shared by every pre-created voter keeps setup fast while login still verifies it
+        password_hash = generate_password_hash(PASSWORD)
+        existing = {username for username, in db.session.query(User.username)}
+        db.session.execute(insert(User), [
+            {'username': f'load{i}', 'password_hash': password_hash}
+            for i in range(voters) if f'load{i}' not in existing
+        ])
+        db.session.commit()
+        db.session.remove()
+        db.engine.dispose()
+
+def start_server(database_url, workers=None, timeout=60):
+    """Start gunicorn with the production profile on a free local port; returns (process, base_url)"""
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    env = {**os.environ, 'DATABASE_URL': database_url, 'LOG_LEVEL': os.environ.get('LOG_LEVEL', 'WARNING')}
+    if workers:
+        env['WEB_CONCURRENCY'] = str(workers)
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}', 'app:app'],
+        cwd=ROOT, env=env
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"❌ gunicorn exited with status {process.returncode}")
+        try:
+            with urlopen(f'{base_url}/health', timeout=1):
+                return process, base_url
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    sys.exit(f"❌ gunicorn did not answer on {base_url} within {timeout}s")
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+def run_phase(base_url, concurrency, jobs, recorder, cookies):
+    """Run (endpoint, method, path, payload, voter) jobs across concurrency keep-alive clients.
+
+    cookies maps voter -> session cookie and is updated from login responses.
+    """
+    local = threading.local()
+
+    def execute(job):
+        endpoint, method, path, payload, voter = job
+        if not hasattr(local, 'client'):
+            local.client = Client(base_url)
+        started = time.perf_counter()
+        status, _, cookie = local.client.request(method, path, payload, cookies.get(voter))
+        recorder.record(endpoint, time.perf_counter() - started, status)
+        if cookie and voter is not None:
+            cookies[voter] = cookie
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(execute, jobs))
+    return time.perf_counter() - started
+
+def mixed_jobs(voters, count, mix, rng):
+    endpoints = list(mix)
+    weights = [mix[e] for e in endpoints]
+    for _ in range(count):
+        endpoint = rng.choices(endpoints, weights)[0]
+        voter = rng.randrange(voters)
+        if endpoint == 'submit_vote':
+            yield endpoint, 'POST', '/api/vote/submit_vote', {'week': rng.randint(1, 3), 'rankings': rng.sample(TEAM_NAMES, 25)}, voter
+        elif endpoint == 'consensus':
+            yield endpoint, 'GET', f'/api/vote/consensus/{rng.randint(1, 3)}', None, None
+        elif endpoint == 'leaderboard':
+            yield endpoint, 'GET', '/api/vote/leaderboard/overall', None, None
+        elif endpoint == 'my_votes':
+            yield endpoint, 'GET', '/api/vote/my_votes', None, voter
+        elif endpoint == 'teams':
+            yield endpoint, 'GET', '/api/vote/teams', None, None
+        else:
+            yield endpoint, 'POST', '/api/auth/login', {'username': f'load{voter}', 'password': PASSWORD}, voter
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--voters', type=int, default=2000)
+    parser.add_argument('--registrations', type=int, default=200, help='New accounts created through /register')
+    parser.add_argument('--requests', type=int, default=20000, help='Requests in the mixed phase')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--base-url', help='Target an already running server instead of starting one')
+    parser.add_argument('--workers', type=int, help='gunicorn workers (default: WEB_CONCURRENCY or 2 x CPUs + 1)')
+    parser.add_argument('--output', help='Where to write the JSON results (default: benchmarks/results/)')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    server = None
+    database_url = os.environ.get('DATABASE_URL') or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'load.db')
+    if args.base_url:
+        base_url = args.base_url
+        print("ℹ️  Using an existing server; voters load0..loadN must already exist with the load-test password")
+    else:
+        print(f"🚀 Starting gunicorn against {database_url.split('@')[-1]} with {args.voters} voters")
+        prepare_database(database_url, args.voters)
+        server, base_url = start_server(database_url, args.workers)
+
+    recorder = Recorder()
+    phases = {}
+    run_id = f'{int(time.time())}-{rng.randrange(1 << 30)}'
+    register_jobs = [
+        ('register', 'POST', '/api/auth/register', {'username': f'new{run_id}-{i}', 'password': PASSWORD}, None)
+        for i in range(args.registrations)
+    ]
+    login_jobs = [
+        ('login', 'POST', '/api/auth/login', {'username': f'load{i}', 'password': PASSWORD}, i)
+        for i in range(args.voters)
+    ]
+    print("📝 Registering and logging in voters ...")
+    cookies = {}
+    phases['register'] = run_phase(base_url, args.concurrency, register_jobs, recorder, cookies)
+    phases['login'] = run_phase(base_url, args.concurrency, login_jobs, recorder, cookies)
+
+    print(f"🏈 Running {args.requests} mixed requests with {args.concurrency} concurrent clients ...")
+    mixed = Recorder()
+    jobs = list(mixed_jobs(args.voters, args.requests, DEFAULT_MIX, rng))
+    phases['mixed'] = run_phase(base_url, args.concurrency, jobs, mixed, cookies)
+    if server:
+        stop_server(server)
+
+    results = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'config': {
+            'voters': args.voters, 'registrations': args.registrations, 'requests': args.requests,
+            'concurrency': args.concurrency, 'mix': DEFAULT_MIX, 'workers': args.workers,
+            'database': 'postgresql' if database_url.startswith('postgres') else 'sqlite',
+        },
+        'phases': {
+            'setup': {'seconds': round(phases['register'] + phases['login'], 2),
+                      'endpoints': recorder.summary(phases['register'] + phases['login'])},
+            'mixed': {'seconds': round(phases['mixed'], 2),
+                      'throughput_rps': round(args.requests / phases['mixed'], 1),
+                      'endpoints': mixed.summary(phases['mixed'])},
+        },
+    }
+
+    print(f"\n{'endpoint':<14} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for phase in ('setup', 'mixed'):
+        for endpoint, r in results['phases'][phase]['endpoints'].items():
+            print(f"{endpoint:<14} {r['requests']:>9} {r['errors']:>7} {r['throughput_rps']:>8} "
+                  f"{r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8}")
+    print(f"\nMixed phase: {results['phases']['mixed']['throughput_rps']} req/s overall")
+
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results', f"load-{results['commit'] or 'local'}-{int(time.time())}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Saved results to {output}")
+
+if __name__ == '__main__':
+    main()
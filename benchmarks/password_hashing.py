@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Login throughput at different password work factors, inline vs the hashing pool.
+
+For each PASSWORD_HASH_METHOD, concurrent clients log in repeatedly while one
+more client polls /api/auth/me (a cheap request that needs no hashing). This
+reports logins per second, how many logins were shed with 503, and the p95
+latency of the cheap request, for hashes computed on the request thread
+(PASSWORD_HASH_WORKERS=0) and on the process pool.
+
+    python benchmarks/password_hashing.py --threads 16 --seconds 5
+    python benchmarks/password_hashing.py --methods scrypt:16384:8:1 scrypt:32768:8:1 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, insert
+from werkzeug.security import generate_password_hash
+
+PASSWORD = 'benchmark-password'
+METHODS = ['pbkdf2:sha256:100000', 'pbkdf2:sha256:600000', 'scrypt:16384:8:1', 'scrypt:32768:8:1']
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+def run(method, workers, args, database_url):
+    from backend.app import create_app
+    from backend.app.models import db, User
+    from backend.app.passwords import password_hasher
+
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        'SESSION_COOKIE_SECURE': False,
+        'PASSWORD_HASH_METHOD': method,
+        'PASSWORD_HASH_WORKERS': workers,
+        'PASSWORD_HASH_MAX_PENDING': args.max_pending,
+    })
+    with app.app_context():
+        db.session.execute(delete(User))
+        # Every user shares one hash: the benchmark measures verification, not seeding
+        password_hash = generate_password_hash(PASSWORD, method)
+        db.session.execute(insert(User), [{'username': f'voter{i}', 'password_hash': password_hash} for i in range(args.threads)])
+        db.session.commit()
+        probe_id = db.session.query(User.id).filter_by(username='voter0').scalar()
+
+    statuses = []
+    probe_latencies = []
+    deadline = time.monotonic() + args.seconds
+
+    def login_loop(n):
+        client = app.test_client()
+        while time.monotonic() < deadline:
+            response = client.post('/api/auth/login', json={'username': f'voter{n}', 'password': PASSWORD})
+            statuses.append(response.status_code)
+
+    def probe_loop():
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = probe_id
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            client.get('/api/auth/me')
+            probe_latencies.append(time.perf_counter() - started)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=login_loop, args=(n,)) for n in range(args.threads)]
+    threads.append(threading.Thread(target=probe_loop))
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    password_hasher.stop()
+
+    return {
+        'method': method,
+        'hashing': f'pool x{workers}' if workers else 'inline',
+        'logins_per_sec': statuses.count(200) / elapsed,
+        'shed': statuses.count(503),
+        'errors': sum(1 for s in statuses if s not in (200, 503)),
+        'probe_p95_ms': percentile(probe_latencies, 95) * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--methods', nargs='+', default=METHODS)
+    parser.add_argument('--threads', type=int, default=16, help='Concurrent login clients')
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='Hashing pool processes')
+    parser.add_argument('--max-pending', type=int, default=8)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    results = []
+    for method in args.methods:
+        for workers in (0, args.workers):
+            database_url = os.environ.get('DATABASE_URL') or 'sqlite:///' + os.path.join(tmp, 'logins.db')
+            print(f"⏱️  {method} ({'inline' if not workers else f'pool x{workers}'})...")
+            results.append(run(method, workers, args, database_url))
+
+    print(f"\n{'method':<22} {'hashing':<9} {'logins/s':>9} {'shed (503)':>11} {'errors':>7} {'/me p95 (ms)':>13}")
+    for r in results:
+        print(f"{r['method']:<22} {r['hashing']:<9} {r['logins_per_sec']:>9.1f} {r['shed']:>11} "
+              f"{r['errors']:>7} {r['probe_p95_ms']:>13.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,4 @@
-// Utility to extract conference names and teams from seed_teams.py
+// Conference names and teams from the canonical dataset in backend/app/teams.py
 // Used for frontend tab to pick conference champions
 
 export const conferences = [
@@ -24,7 +24,7 @@ export const conferences = [
   },
   {
     name: "American Athletic Conference",
-    teams: ["Charlotte", "East Carolina", "Florida Atlantic", "Memphis", "Navy", "North Texas", "Rice", "South Florida", "Temple", "Tulane", "Tulsa", "UAB"]
+    teams: ["Army", "Charlotte", "East Carolina", "Florida Atlantic", "Memphis", "Navy", "North Texas", "Rice", "South Florida", "Temple", "Tulane", "Tulsa", "UAB"]
   },
   {
     name: "Conference USA",
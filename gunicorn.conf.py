@@ -0,0 +1,101 @@
+"""Gunicorn serving profile shared by the Dockerfile and render.yaml.
+
+    gunicorn -c gunicorn.conf.py app:app
+
+The app is imported once in the master (preload_app) and forked. Each worker
+then drops the engine connections it inherited, warms the team catalog and
+the current week's consensus, and only then starts accepting requests.
+Worker/thread counts follow the CPUs available to the container and can be
+overridden with WEB_CONCURRENCY / GUNICORN_THREADS.
+
+Each worker also owns a password hashing pool (see backend/app/passwords.py).
+PASSWORD_HASH_WORKERS is capped so that all workers' pools together fit in
+PASSWORD_HASH_MEMORY_MB, but every worker keeps at least one hashing process.
+"""
+
+import os
+import time
+
+def available_cpus():
+    """CPUs this process may use, honouring a cgroup v2 quota (containers) and CPU affinity"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+preload_app = True
+
+# Requests mostly wait on the database, so a few threads per worker overlap that wait
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY') or available_cpus() * 2 + 1)
+threads = int(os.environ.get('GUNICORN_THREADS') or 4)
+
+def password_hash_workers(workers):
+    """Hashing processes per worker: PASSWORD_HASH_WORKERS, capped by PASSWORD_HASH_MEMORY_MB across all workers"""
+    from backend.app.passwords import process_memory_mb
+    requested = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    if requested <= 0:
+        return requested
+    budget = int(os.environ.get('PASSWORD_HASH_MEMORY_MB', 512))
+    per_process = process_memory_mb(os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1'))
+    return max(1, min(requested, int(budget // (workers * per_process))))
+
+# Read by create_app when the app is preloaded below
+os.environ['PASSWORD_HASH_WORKERS'] = str(password_hash_workers(workers))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+# Heartbeat files on tmpfs, so a slow container disk cannot get workers killed
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+loglevel = os.environ.get('LOG_LEVEL', 'info').lower()
+errorlog = '-'
+
+def on_starting(server):
+    from backend.app.passwords import process_memory_mb
+    hash_workers = int(os.environ['PASSWORD_HASH_WORKERS'])
+    peak = workers * hash_workers * process_memory_mb(os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1'))
+    server.log.info('%d workers x %d hashing processes, up to %.0f MB for password hashing', workers, hash_workers, peak)
+    if peak > int(os.environ.get('PASSWORD_HASH_MEMORY_MB', 512)):
+        server.log.warning('Password hashing may use %.0f MB, over PASSWORD_HASH_MEMORY_MB; '
+                           'lower WEB_CONCURRENCY or raise the budget', peak)
+
+def post_fork(server, worker):
+    # Pooled connections opened in the master (e.g. by create_all) must not be shared
+    # across processes; close=False leaves the parent's sockets alone
+    from backend.app.models import db
+    with server.app.wsgi().app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+def post_worker_init(worker):
+    from backend.app.models import db
+    from backend.app.vote import warm_caches
+    started = time.perf_counter()
+    with worker.wsgi.app_context():
+        try:
+            week = warm_caches()
+            worker.log.info('Worker %s warmed the team catalog%s in %.1f ms', worker.pid,
+                            f' and week {week} consensus' if week is not None else '', (time.perf_counter() - started) * 1000)
+        except Exception:
+            # A cold cache is slower, not broken; serve anyway
+            worker.log.exception('Cache warm-up failed')
+        finally:
+            db.session.remove()
+
+def worker_exit(server, worker):
+    # Flush queued ballots (BALLOT_INGEST_MODE=async) and stop the hashing pool before the process goes
+    from backend.app.ingest import ballot_writer
+    from backend.app.passwords import password_hasher
+    ballot_writer.stop()
+    password_hasher.stop()
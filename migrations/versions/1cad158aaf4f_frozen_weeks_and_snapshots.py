@@ -0,0 +1,45 @@
+"""frozen weeks and consensus snapshots
+
+frozen_weeks marks weeks closed with `flask --app app freeze-week N`;
+weekly_snapshots holds each frozen week's final consensus, which the
+consensus and movement endpoints serve instead of the live tally.
+
+Revision ID: 1cad158aaf4f
+Revises: c4524a6349aa
+Create Date: 2026-10-18 12:44:04.253002
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1cad158aaf4f'
+down_revision = 'c4524a6349aa'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('frozen_weeks',
+        sa.Column('week', sa.Integer(), nullable=False),
+        sa.Column('frozen_at', sa.DateTime(), nullable=False),
+        sa.Column('voters', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('week')
+    )
+    op.create_table('weekly_snapshots',
+        sa.Column('week', sa.Integer(), nullable=False),
+        sa.Column('team_id', sa.Integer(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.Column('points', sa.Integer(), nullable=False),
+        sa.Column('first_place_votes', sa.Integer(), nullable=False),
+        sa.Column('ballots', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['team_id'], ['team.id'], ),
+        sa.ForeignKeyConstraint(['week'], ['frozen_weeks.week'], ),
+        sa.PrimaryKeyConstraint('week', 'team_id')
+    )
+
+
+def downgrade():
+    op.drop_table('weekly_snapshots')
+    op.drop_table('frozen_weeks')
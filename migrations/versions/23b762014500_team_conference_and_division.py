@@ -0,0 +1,31 @@
+"""team conference and division
+
+Nullable conference and division ('FBS'/'FCS') columns on team. Fill them
+for existing rows with `flask --app app seed-teams`.
+
+Revision ID: 23b762014500
+Revises: 1cad158aaf4f
+Create Date: 2026-10-18 12:45:57.889796
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '23b762014500'
+down_revision = '1cad158aaf4f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('team', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('conference', sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column('division', sa.String(length=10), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('team', schema=None) as batch_op:
+        batch_op.drop_column('division')
+        batch_op.drop_column('conference')
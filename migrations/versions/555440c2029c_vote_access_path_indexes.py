@@ -0,0 +1,55 @@
+"""indexes and uniqueness constraints for vote access paths
+
+- vote (user_id, week, rank) unique: one team per ballot slot; also serves
+  my_votes and the per-user ballot replace in submit_vote
+- vote (user_id, week, team_id) unique: a team appears once per ballot
+- vote (week, user_id): per-week scans (test votes, stats, tally rebuild)
+- vote (team_id): foreign-key joins and team deletes
+- conference_champion_votes (conference, team): consensus GROUP BY
+
+Duplicate rows that would violate the new constraints are removed first,
+keeping the most recently inserted one. Run `flask rebuild-tallies`
+afterwards if any were removed.
+
+Revision ID: 555440c2029c
+Revises: 7d2f4a9c1e05
+Create Date: 2026-10-18 10:31:07.118520
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '555440c2029c'
+down_revision = '7d2f4a9c1e05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for columns in ('user_id, week, rank', 'user_id, week, team_id'):
+        op.execute(
+            f'DELETE FROM vote WHERE id NOT IN '
+            f'(SELECT keep_id FROM (SELECT MAX(id) AS keep_id FROM vote GROUP BY {columns}) AS keep)'
+        )
+
+    with op.batch_alter_table('vote', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_vote_user_week_rank', ['user_id', 'week', 'rank'])
+        batch_op.create_unique_constraint('uq_vote_user_week_team', ['user_id', 'week', 'team_id'])
+        batch_op.create_index('ix_vote_week_user', ['week', 'user_id'], unique=False)
+        batch_op.create_index('ix_vote_team_id', ['team_id'], unique=False)
+
+    with op.batch_alter_table('conference_champion_votes', schema=None) as batch_op:
+        batch_op.create_index('ix_conference_champion_votes_conference_team', ['conference', 'team'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('conference_champion_votes', schema=None) as batch_op:
+        batch_op.drop_index('ix_conference_champion_votes_conference_team')
+
+    with op.batch_alter_table('vote', schema=None) as batch_op:
+        batch_op.drop_index('ix_vote_team_id')
+        batch_op.drop_index('ix_vote_week_user')
+        batch_op.drop_constraint('uq_vote_user_week_team', type_='unique')
+        batch_op.drop_constraint('uq_vote_user_week_rank', type_='unique')
@@ -0,0 +1,47 @@
+"""data versions and weekly tallies
+
+data_versions (per-scope change counters behind the caches) and
+weekly_tallies (the maintained consensus) were added to the models after
+the original create_all schema. A database stamped at the baseline gets
+them here; one bootstrapped by create_all after they existed already has
+them, so existing tables are left alone. Populate weekly_tallies with
+`flask --app app rebuild-tallies` after upgrading.
+
+Revision ID: 7d2f4a9c1e05
+Revises: fb06de3bbf28
+Create Date: 2026-10-18 10:20:15.331406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2f4a9c1e05'
+down_revision = 'fb06de3bbf28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'data_versions' not in existing:
+        op.create_table('data_versions',
+            sa.Column('scope', sa.String(length=50), nullable=False),
+            sa.Column('version', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('scope')
+        )
+    if 'weekly_tallies' not in existing:
+        op.create_table('weekly_tallies',
+            sa.Column('week', sa.Integer(), nullable=False),
+            sa.Column('team_id', sa.Integer(), nullable=False),
+            sa.Column('points', sa.Integer(), nullable=False),
+            sa.Column('ballots', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['team_id'], ['team.id'], ),
+            sa.PrimaryKeyConstraint('week', 'team_id')
+        )
+
+
+def downgrade():
+    op.drop_table('weekly_tallies')
+    op.drop_table('data_versions')
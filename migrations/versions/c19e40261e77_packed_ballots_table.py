@@ -0,0 +1,39 @@
+"""packed ballots table
+
+One row per (user, week) with the ranked team ids packed into a binary
+column, used when BALLOT_STORAGE=packed. Existing Vote rows are moved with
+`flask --app app convert-ballots packed`.
+
+Revision ID: c19e40261e77
+Revises: 555440c2029c
+Create Date: 2026-10-18 11:04:52.730215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c19e40261e77'
+down_revision = '555440c2029c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ballots',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('week', sa.Integer(), nullable=False),
+        sa.Column('team_ids', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'week')
+    )
+    with op.batch_alter_table('ballots', schema=None) as batch_op:
+        batch_op.create_index('ix_ballots_week_user', ['week', 'user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('ballots', schema=None) as batch_op:
+        batch_op.drop_index('ix_ballots_week_user')
+
+    op.drop_table('ballots')
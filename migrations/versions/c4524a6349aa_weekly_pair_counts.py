@@ -0,0 +1,36 @@
+"""weekly pair counts
+
+Per-week counts of ballots ranking one team above another, maintained by
+submit_vote and read by the Schulze endpoint. Populate an existing database
+with `flask --app app rebuild-tallies`.
+
+Revision ID: c4524a6349aa
+Revises: c19e40261e77
+Create Date: 2026-10-18 12:41:30.042834
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4524a6349aa'
+down_revision = 'c19e40261e77'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('weekly_pairs',
+        sa.Column('week', sa.Integer(), nullable=False),
+        sa.Column('winner_id', sa.Integer(), nullable=False),
+        sa.Column('loser_id', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['loser_id'], ['team.id'], ),
+        sa.ForeignKeyConstraint(['winner_id'], ['team.id'], ),
+        sa.PrimaryKeyConstraint('week', 'winner_id', 'loser_id')
+    )
+
+
+def downgrade():
+    op.drop_table('weekly_pairs')
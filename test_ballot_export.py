@@ -0,0 +1,55 @@
+import json
+import pytest
+from backend.app.models import db, Team
+from backend.app.ballots import iter_ballots
+from backend.app.export import iter_archive, BallotArchive, export_ballots_command
+
+# Non-ASCII names check the archive's string table
+TEAM_NAME = 'Team {} ü'
+
+def expected_rows(week=None):
+    return [(user_id, team_id, w, rank) for user_id, w, ballot in iter_ballots(week)
+            for rank, team_id in enumerate(ballot, start=1)]
+
+def archive_rows(path):
+    with BallotArchive(path) as archive:
+        rows = []
+        for group in archive.row_groups():
+            rows += zip(group['user_id'], group['team_id'], group['week'], group['rank'])
+        return rows, dict(archive.teams), len(archive)
+
+@pytest.mark.storage_modes
+def test_archive_round_trips_in_small_row_groups(app, seed, tmp_path):
+    seed(teams=30, voters=40, weeks=(1, 2, 3), rng_seed=5, team_name=TEAM_NAME)
+    path = tmp_path / 'season.cfb'
+    chunks = list(iter_archive(chunk_rows=100))
+    path.write_bytes(b''.join(chunks))
+    assert len(chunks) > 10  # header, many row groups, trailer
+
+    rows, teams, total = archive_rows(path)
+    assert rows == expected_rows()
+    assert total == 40 * 3 * 25
+    assert teams == dict(db.session.query(Team.id, Team.name).all())
+
+def test_cli_writes_one_week(app, client, seed, tmp_path):
+    seed(teams=30, voters=40, weeks=(1, 2, 3), rng_seed=5, team_name=TEAM_NAME)
+    result = app.test_cli_runner().invoke(export_ballots_command, [str(tmp_path / 'cli.cfb'), '--week', '2'])
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / 'cli.cfb').read_bytes() == b''.join(iter_archive(2))
+    assert archive_rows(tmp_path / 'cli.cfb')[0] == expected_rows(2)
+    # The archive holds every ballot, so it is only available from the CLI
+    assert client.get('/api/vote/export').status_code == 404
+
+def test_archive_is_a_fraction_of_the_json_size(app, client, seed):
+    seed(teams=30, voters=100, weeks=(1,), rng_seed=5, team_name=TEAM_NAME)
+    archive = b''.join(iter_archive())
+    as_json = json.dumps(client.get('/api/vote/test/votes/1').get_json())
+    assert len(archive) * 3 < len(as_json)
+
+def test_empty_archive_and_bad_file(app, tmp_path):
+    path = tmp_path / 'empty.cfb'
+    path.write_bytes(b''.join(iter_archive()))
+    assert archive_rows(path) == ([], {}, 0)
+    (tmp_path / 'junk').write_bytes(b'not an archive at all')
+    with pytest.raises(ValueError):
+        BallotArchive(tmp_path / 'junk')
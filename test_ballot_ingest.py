@@ -0,0 +1,109 @@
+import threading
+import time
+import pytest
+from backend.app.ingest import ballot_writer, write_ballots
+from backend.app.models import db, Team
+from backend.app.ballots import user_ballots
+from backend.app.snapshots import freeze_week
+
+def async_mode(**config):
+    return {'BALLOT_INGEST_MODE': 'async', 'BALLOT_QUEUE_TIMEOUT': 0.01, **config}
+
+@pytest.fixture
+def writer(app, seed):
+    """The ballot writer with a fresh thread (it reads its batch settings when it starts)"""
+    ballot_writer.stop()
+    seed(teams=30, voters=6)
+    yield ballot_writer
+    ballot_writer.stop()
+
+@pytest.fixture
+def blocked(writer, monkeypatch):
+    """Hold the writer thread before each batch it writes until the event is set"""
+    entered, release = threading.Event(), threading.Event()
+    write = writer._write
+
+    def wait_then_write(batch):
+        entered.set()
+        assert release.wait(10)
+        return write(batch)
+    monkeypatch.setattr(writer, '_write', wait_then_write)
+    yield entered, release
+    release.set()
+
+def team_ids(numbers):
+    return [db.session.query(Team.id).filter_by(name=f'Team {n}').scalar() for n in numbers]
+
+def delta(before, after):
+    return {name: after[name] - before[name] for name in ballot_writer.COUNTERS}
+
+@pytest.mark.parametrize('app', [async_mode(BALLOT_BATCH_LINGER_MS=300)], indirect=True)
+def test_resubmissions_in_one_batch_collapse_to_the_last(app, writer):
+    before = writer.stats()
+    for numbers in (range(1, 26), range(2, 27), range(3, 28)):
+        assert writer.submit(1, 1, team_ids(numbers))
+    assert writer.submit(2, 1, team_ids(range(1, 26)))
+    assert writer.flush(5)
+
+    changed = delta(before, writer.stats())
+    assert (changed['queued'], changed['coalesced'], changed['written'], changed['batches']) == (4, 2, 2, 1)
+    assert user_ballots(1) == {1: team_ids(range(3, 28))}
+
+@pytest.mark.parametrize('app', [async_mode(BALLOT_BATCH_SIZE=2, BALLOT_BATCH_LINGER_MS=5000)], indirect=True)
+def test_full_batch_is_written_without_waiting_for_the_linger(app, writer):
+    before = writer.stats()
+    started = time.monotonic()
+    for user_id in range(1, 5):
+        assert writer.submit(user_id, 1, team_ids(range(1, 26)))
+    assert writer.flush(3)
+    assert time.monotonic() - started < 3
+    changed = delta(before, writer.stats())
+    assert (changed['written'], changed['batches']) == (4, 2)
+
+@pytest.mark.parametrize('app', [async_mode(BALLOT_QUEUE_SIZE=1)], indirect=True)
+def test_full_queue_sheds_load_with_503(app, writer, blocked, login):
+    entered, release = blocked
+    client = login('alice')
+    ballot = {'week': 1, 'rankings': [f'Team {n}' for n in range(1, 26)]}
+    assert client.post('/api/vote/submit_vote', json=ballot).status_code == 202
+    assert entered.wait(5)
+    # The writer holds the first ballot, the second fills the queue
+    assert client.post('/api/vote/submit_vote', json=ballot).status_code == 202
+    before = writer.stats()
+    response = client.post('/api/vote/submit_vote', json=ballot)
+    assert response.status_code == 503 and response.headers['Retry-After'] == '1'
+    assert writer.stats()['rejected'] == before['rejected'] + 1
+    assert writer.stats()['depth'] == 1
+
+    release.set()
+    assert writer.flush(5)
+    assert writer.stats()['depth'] == 0
+
+@pytest.mark.parametrize('app', [async_mode()], indirect=True)
+def test_ballots_for_a_week_frozen_while_queued_are_dropped(app, writer, blocked):
+    entered, release = blocked
+    write_ballots([(6, 1, team_ids(range(1, 26)))])
+    db.session.commit()
+    assert writer.submit(1, 1, team_ids(range(1, 26)))
+    assert entered.wait(5)
+    assert writer.submit(2, 1, team_ids(range(1, 26)))
+    assert writer.submit(3, 2, team_ids(range(1, 26)))
+    freeze_week(1)
+    db.session.commit()
+
+    before = writer.stats()
+    release.set()
+    assert writer.flush(5)
+    changed = delta(before, writer.stats())
+    assert (changed['closed'], changed['written']) == (2, 1)
+    assert user_ballots(1) == user_ballots(2) == {} and 2 in user_ballots(3)
+
+@pytest.mark.parametrize('app', [async_mode(BALLOT_BATCH_SIZE=3)], indirect=True)
+def test_stop_drains_the_queue(app, writer):
+    before = writer.stats()
+    for user_id in range(1, 7):
+        assert writer.submit(user_id, 1, team_ids(range(user_id, user_id + 25)))
+    writer.stop()
+    assert writer.stats()['written'] - before['written'] == 6
+    assert all(1 in user_ballots(user_id) for user_id in range(1, 7))
+    assert not writer._thread
@@ -0,0 +1,43 @@
+import random
+import struct
+from backend.app.models import db, Vote, Ballot
+from backend.app.ingest import write_ballots
+from backend.app.ballots import pack_team_ids, unpack_team_ids, iter_ballots, convert_ballots, convert_ballots_command, PACKED, ROWS
+from backend.app.tally import rebuild_tallies_command
+
+def test_pack_round_trip_is_little_endian_int32():
+    team_ids = [1, 25, 255, 256, 70000, 2 ** 31 - 1]
+    blob = pack_team_ids(team_ids)
+    assert len(blob) == 4 * len(team_ids)
+    assert blob[4:8] == b'\x19\x00\x00\x00' and blob[12:16] == b'\x00\x01\x00\x00'
+    assert blob == b''.join(struct.pack('<i', team_id) for team_id in team_ids)
+    assert unpack_team_ids(blob) == team_ids
+    assert unpack_team_ids(pack_team_ids([])) == []
+
+def test_rows_to_packed_and_back_keeps_every_ballot(app, seed):
+    season = seed(teams=40, voters=60)
+    team_ids = list(season.teams.values())
+    rng = random.Random(7)
+    # Full and partial ballots over several weeks, with some voters skipping a week
+    write_ballots([
+        (user_id, week, rng.sample(team_ids, rng.choice([1, 10, 25])))
+        for user_id in season.user_ids for week in (1, 2, 4) if rng.random() < 0.8
+    ])
+    db.session.commit()
+    original = list(iter_ballots(mode=ROWS))
+
+    assert convert_ballots(PACKED, batch_size=17) == len(original)
+    db.session.commit()
+    assert Vote.query.count() == 0
+    assert list(iter_ballots(mode=PACKED)) == original
+
+    app.config['BALLOT_STORAGE'] = PACKED
+    runner = app.test_cli_runner()
+    result = runner.invoke(rebuild_tallies_command, ['--check'])
+    assert result.exit_code == 0, result.output
+
+    result = runner.invoke(convert_ballots_command, [ROWS, '--batch-size', '9', '--keep-source'])
+    assert result.exit_code == 0, result.output
+    assert f'Copied {len(original)} ballots' in result.output
+    assert list(iter_ballots(mode=ROWS)) == original
+    assert Ballot.query.count() == len(original)
@@ -0,0 +1,97 @@
+import gzip
+from backend.app import conditional
+from backend.app.models import db, Team
+from backend.app.catalog import CATALOG_SCOPE, team_catalog
+from backend.app.versions import bump_version
+
+def test_repeat_poll_gets_304_before_any_work(app, login, count_queries, seed):
+    names = list(seed(teams=60).teams)
+    client = login('alice')
+    client.post('/api/vote/submit_vote', json={'week': 1, 'rankings': names[:25]})
+
+    first = client.get('/api/vote/consensus/1')
+    tag = first.headers['ETag']
+    assert first.headers['Vary'] == 'Accept-Encoding'
+    with count_queries() as counter:
+        again = client.get('/api/vote/consensus/1', headers={'If-None-Match': tag})
+    assert again.status_code == 304 and again.data == b''
+    assert again.headers['ETag'] == tag
+    # Only the data version is read
+    assert counter.count == 1
+
+    # A new ballot moves the version, so the old tag no longer matches
+    client.post('/api/vote/submit_vote', json={'week': 1, 'rankings': names[1:26]})
+    changed = client.get('/api/vote/consensus/1', headers={'If-None-Match': tag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != tag
+
+    # /teams takes its version from the in-process catalog: a 304 runs no SQL at all
+    tag = client.get('/api/vote/teams').headers['ETag']
+    with count_queries() as counter:
+        assert client.get('/api/vote/teams', headers={'If-None-Match': tag}).status_code == 304
+    assert counter.count == 0
+
+def test_team_rename_changes_the_tag_of_payloads_with_team_names(app, login, seed):
+    names = list(seed(teams=60).teams)
+    client = login('alice')
+    client.post('/api/vote/submit_vote', json={'week': 1, 'rankings': names[:25]})
+    paths = ['/api/vote/consensus/1', '/api/vote/consensus/1/dowdall', '/api/vote/schulze/1', '/api/vote/leaderboard/overall']
+    tags = {path: client.get(path).headers['ETag'] for path in paths}
+
+    Team.query.filter_by(name='Team 1').one().name = 'Team One'
+    bump_version(CATALOG_SCOPE)
+    db.session.commit()
+    team_catalog.invalidate()   # as if TEAM_CATALOG_CHECK_INTERVAL had passed
+    for path in paths:
+        response = client.get(path, headers={'If-None-Match': tags[path]})
+        assert response.status_code == 200, path
+        assert 'Team One' in response.get_data(as_text=True), path
+
+def test_large_payloads_are_compressed_once_per_version(app, login, monkeypatch, seed):
+    names = list(seed(teams=60).teams)
+    login('bob').post('/api/vote/submit_vote', json={'week': 1, 'rankings': names[25:50]})
+    client = login('alice')
+    client.post('/api/vote/submit_vote', json={'week': 1, 'rankings': names[:25]})
+    compressed = []
+    compress = conditional._compress
+    monkeypatch.setattr(conditional, '_compress', lambda encoding, body: compressed.append(encoding) or compress(encoding, body))
+
+    plain = client.get('/api/vote/consensus/1')
+    assert 'Content-Encoding' not in plain.headers
+    assert len(plain.data) > app.config['COMPRESS_MIN_BYTES']
+    for _ in range(3):
+        response = client.get('/api/vote/consensus/1', headers={'Accept-Encoding': 'gzip, deflate'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.data) == plain.data
+        assert len(response.data) < len(plain.data) / 2
+    assert compressed == ['gzip']
+    assert response.headers['ETag'] == plain.headers['ETag'][:-1] + '-gzip"'
+    # The gzip tag validates too
+    revalidated = client.get('/api/vote/consensus/1', headers={
+        'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
+
+    # Small payloads and clients that refuse gzip get identity bodies
+    small = client.get('/api/vote/leaderboard/weeks/5/6', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+    refused = client.get('/api/vote/consensus/1', headers={'Accept-Encoding': 'gzip;q=0'})
+    assert 'Content-Encoding' not in refused.headers
+
+def test_gzip_revalidation_echoes_the_gzip_tag(app, login, seed):
+    names = list(seed(teams=60).teams)
+    login('bob').post('/api/vote/submit_vote', json={'week': 1, 'rankings': names[25:50]})
+    client = login('alice')
+    client.post('/api/vote/submit_vote', json={'week': 1, 'rankings': names[:25]})
+
+    stored = client.get('/api/vote/consensus/1', headers={'Accept-Encoding': 'gzip'})
+    assert stored.headers['Content-Encoding'] == 'gzip'
+    tag = stored.headers['ETag']
+    assert tag.endswith('-gzip"')
+    # The 304 must carry the stored response's own validator, or a cache cannot freshen it
+    revalidated = client.get('/api/vote/consensus/1', headers={'Accept-Encoding': 'gzip', 'If-None-Match': tag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers['ETag'] == tag
+    # With several stored variants, the one that matched is named
+    plain_tag = client.get('/api/vote/consensus/1').headers['ETag']
+    both = client.get('/api/vote/consensus/1', headers={'Accept-Encoding': 'gzip', 'If-None-Match': f'"stale", {tag}'})
+    assert both.headers['ETag'] == tag
+    assert client.get('/api/vote/consensus/1', headers={'If-None-Match': plain_tag}).headers['ETag'] == plain_tag
@@ -0,0 +1,66 @@
+import random
+from sqlalchemy import func, insert
+from backend.app.models import db, ConferenceChampionVote
+
+CONFERENCES = {
+    'SEC': ['Alabama', 'Georgia', 'LSU', 'Texas', 'Tennessee'],
+    'Big Ten': ['Michigan', 'Ohio State', 'Oregon', 'Penn State'],
+    'ACC': ['Clemson', 'Florida State', 'Miami'],
+    'Big 12': ['Arizona', 'BYU', 'Kansas State', 'Utah'],
+    'Mountain West': ['Boise State', 'UNLV'],
+}
+
+def seed_picks(seed, voters, rng_seed):
+    rng = random.Random(rng_seed)
+    rows = []
+    for user_id in seed(voters=voters).user_ids:
+        for conference, teams in CONFERENCES.items():
+            # Skewed picks so most conferences have a clear favourite
+            rows.append({'user_id': user_id, 'conference': conference,
+                         'team': rng.choices(teams, weights=range(len(teams), 0, -1))[0]})
+    db.session.execute(insert(ConferenceChampionVote), rows)
+    db.session.commit()
+
+def legacy_consensus():
+    """The per-conference rescan the endpoint used before the single-pass rewrite"""
+    results = db.session.query(
+        ConferenceChampionVote.conference,
+        ConferenceChampionVote.team,
+        func.count(ConferenceChampionVote.team).label('votes')
+    ).group_by(ConferenceChampionVote.conference, ConferenceChampionVote.team).all()
+    consensus = {}
+    for conf in set(r[0] for r in results):
+        conf_teams = [r for r in results if r[0] == conf]
+        winner = max(conf_teams, key=lambda x: x[2]) if conf_teams else None
+        if winner:
+            consensus[conf] = {'team': winner[1], 'votes': winner[2]}
+    return {'consensus': consensus, 'raw': [{'conference': r[0], 'team': r[1], 'votes': r[2]} for r in results]}
+
+def test_matches_legacy_output_on_seeded_data(client, seed):
+    seed_picks(seed, voters=300, rng_seed=11)
+    legacy = legacy_consensus()
+
+    data = client.get('/api/vote/consensus_conference_champions').get_json()
+
+    assert sorted(data['raw'], key=lambda r: (r['conference'], r['team'])) == \
+        sorted(legacy['raw'], key=lambda r: (r['conference'], r['team']))
+    assert data['consensus'].keys() == legacy['consensus'].keys()
+    for conf, old in legacy['consensus'].items():
+        new = data['consensus'][conf]
+        assert new['votes'] == old['votes']
+        if not new['tied']:
+            assert new['team'] == old['team']
+        assert new['share'] == round(new['votes'] / 300, 4)
+        assert new['runner_up']['votes'] <= new['votes']
+
+def test_ties_resolve_alphabetically_and_order_is_stable(client, login):
+    for username, team in [('a', 'Utah'), ('b', 'BYU'), ('c', 'Arizona'), ('d', 'Utah'), ('e', 'BYU')]:
+        login(username).post('/api/vote/submit_conference_champions', json={'champions': {'Big 12': team}})
+
+    data = client.get('/api/vote/consensus_conference_champions').get_json()
+
+    assert data['consensus']['Big 12'] == {
+        'team': 'BYU', 'votes': 2, 'share': 0.4, 'tied': True, 'runner_up': {'team': 'Utah', 'votes': 2}
+    }
+    assert [r['team'] for r in data['raw']] == ['BYU', 'Utah', 'Arizona']
+    assert client.get('/api/vote/consensus_conference_champions').get_json() == data
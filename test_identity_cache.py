@@ -0,0 +1,89 @@
+from sqlalchemy import delete, text
+from backend.app.models import db, User, Team, Vote
+from backend.app.identity import identity_cache
+
+def test_me_is_served_from_the_cache(app, login, count_queries):
+    client = login('alice')
+    identity_cache.clear()
+    assert client.get('/api/auth/me').get_json()['username'] == 'alice'
+
+    before = identity_cache.stats()
+    with count_queries() as queries:
+        assert client.get('/api/auth/me').get_json()['username'] == 'alice'
+        assert client.get('/api/vote/my_votes').status_code == 200
+    assert identity_cache.stats()['hits'] - before['hits'] == 2
+    # my_votes still reads ballots, but neither request touched the user table
+    assert not [s for s in queries.statements if 'FROM user' in s]
+
+def test_rename_and_delete_invalidate_on_commit(app, login):
+    client = login('alice')
+    client.get('/api/auth/me')
+
+    user = User.query.filter_by(username='alice').one()
+    user.username = 'alicia'
+    db.session.commit()
+    assert client.get('/api/auth/me').get_json()['username'] == 'alicia'
+
+    db.session.delete(user)
+    db.session.commit()
+    assert client.get('/api/auth/me').status_code == 404
+    assert client.get('/api/vote/my_votes').status_code == 401
+
+def test_rolled_back_rename_keeps_the_entry(app, login):
+    client = login('alice')
+    client.get('/api/auth/me')
+    invalidations = identity_cache.stats()['invalidations']
+    user = User.query.filter_by(username='alice').one()
+    user.username = 'alicia'
+    db.session.flush()
+    db.session.rollback()
+    assert identity_cache.stats()['invalidations'] == invalidations
+    assert client.get('/api/auth/me').get_json()['username'] == 'alice'
+
+def test_lru_bound_and_ttl(app, login):
+    identity_cache.configure(max_entries=1)
+    first = login('alice')
+    login('bob')
+    assert identity_cache.stats()['entries'] == 1
+    misses = identity_cache.stats()['misses']
+    first.get('/api/auth/me')
+    assert identity_cache.stats()['misses'] == misses + 1
+
+    identity_cache.configure(ttl=0)
+    first.get('/api/auth/me')
+    assert identity_cache.stats()['misses'] == misses + 2
+
+def test_clear_users_drops_cached_identities(app, login):
+    from backend.app.maintenance import clear_users
+    client = login('testuser1')
+    db.session.add_all([Team(name=f'Team {i}') for i in range(25)])
+    db.session.commit()
+    assert client.get('/api/auth/me').status_code == 200
+
+    assert clear_users('testuser%') == 1
+    assert identity_cache.stats()['entries'] == 0
+    assert client.get('/api/auth/me').status_code == 404
+    assert client.get('/api/vote/my_votes').status_code == 401
+    ballot = {'week': 1, 'rankings': [f'Team {i}' for i in range(25)]}
+    assert client.post('/api/vote/submit_vote', json=ballot).status_code == 401
+
+def test_write_for_a_user_deleted_elsewhere_is_unauthorized(app, login):
+    # Another process deleted the user; this one still has it cached
+    db.session.execute(text('PRAGMA foreign_keys=ON'))
+    client = login('alice')
+    db.session.add_all([Team(name=f'Team {i}') for i in range(25)])
+    db.session.commit()
+    identity = identity_cache.get(User.query.filter_by(username='alice').one().id)
+    db.session.execute(delete(User).where(User.id == identity.id))
+    db.session.commit()
+    assert client.get('/api/auth/me').status_code == 200   # until the TTL runs out
+
+    ballot = {'week': 1, 'rankings': [f'Team {i}' for i in range(25)]}
+    assert client.post('/api/vote/submit_vote', json=ballot).status_code == 401
+    assert client.get('/api/auth/me').status_code == 404
+    assert Vote.query.count() == 0
+
+    identity_cache.put(identity)
+    response = client.post('/api/vote/submit_conference_champions', json={'champions': {'SEC': 'Team 1'}})
+    assert response.status_code == 401
+    assert client.get('/api/auth/me').status_code == 404
@@ -0,0 +1,47 @@
+import random
+import pytest
+from sqlalchemy import func
+from backend.app.models import db, Team, Vote
+from backend.app.ingest import write_ballots
+
+BALLOT_WEEKS = [1, 2, 3, 5, 8]
+
+def seed_season(seed):
+    # Not everyone votes every week, so weeks have different voter counts
+    return seed(teams=60, voters=30, weeks=BALLOT_WEEKS, rng_seed=4, turnout=0.8)
+
+def sql_points(start_week, end_week):
+    """{team: points} straight from the Vote rows"""
+    return dict(db.session.query(Team.name, func.sum(26 - Vote.rank)).join(Team).filter(
+        Vote.week.between(start_week, end_week)).group_by(Team.name).all())
+
+def served_points(client, path):
+    payload = client.get(path).get_json()
+    points = {row['team']: row['points'] for row in payload['ranked'] + payload['unranked']}
+    assert len(points) == len(payload['ranked']) + len(payload['unranked'])
+    # Ordered by points, most first
+    assert [row['points'] for row in payload['ranked'] + payload['unranked']] == sorted(points.values(), reverse=True)
+    return points
+
+@pytest.mark.parametrize('start_week, end_week', [(1, 1), (1, 3), (2, 5), (3, 8), (5, 5), (4, 4), (6, 7), (9, 12), (0, 100)])
+def test_range_totals_match_the_ballots(app, client, seed, start_week, end_week):
+    seed_season(seed)
+    expected = sql_points(start_week, end_week)
+    assert served_points(client, f'/api/vote/leaderboard/weeks/{start_week}/{end_week}') == expected
+    # Weeks without ballots contribute nothing
+    if not any(start_week <= week <= end_week for week in BALLOT_WEEKS):
+        assert expected == {}
+
+def test_overall_is_the_full_range_and_follows_resubmissions(app, client, seed):
+    season = seed_season(seed)
+    team_ids, rng = list(season.teams.values()), random.Random(5)
+    overall = served_points(client, '/api/vote/leaderboard/overall')
+    assert overall == sql_points(min(BALLOT_WEEKS), max(BALLOT_WEEKS))
+    assert overall == served_points(client, f'/api/vote/leaderboard/weeks/{min(BALLOT_WEEKS)}/{max(BALLOT_WEEKS)}')
+
+    # Replaced ballots and a new week move every range that covers them
+    write_ballots([(user_id, week, rng.sample(team_ids, 25)) for user_id in season.user_ids[:10] for week in (3, 6)])
+    db.session.commit()
+    assert served_points(client, '/api/vote/leaderboard/overall') == sql_points(1, 8)
+    for start_week, end_week in [(2, 4), (3, 3), (6, 6), (4, 7)]:
+        assert served_points(client, f'/api/vote/leaderboard/weeks/{start_week}/{end_week}') == sql_points(start_week, end_week)
@@ -0,0 +1,54 @@
+import pytest
+from backend.app.models import db, User, ConferenceChampionVote, WeeklyTally, FrozenWeek
+from backend.app.synthetic import generate_season
+from backend.app.snapshots import freeze_week
+from backend.app.ballots import ballot_weeks
+from backend.app.maintenance import clear_command
+from backend.app.tally import rebuild_tallies_command
+
+def assert_tallies_match(runner):
+    result = runner.invoke(rebuild_tallies_command, ['--check'])
+    assert result.exit_code == 0, result.output
+
+@pytest.mark.storage_modes
+def test_clear_users_keeps_tallies_in_step(app):
+    generate_season(40, 2, seed=1, prefix='testuser')
+    generate_season(30, 2, seed=2, prefix='sim')
+    picks = ConferenceChampionVote.query.count()
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(clear_command, ['users', '--batch-size', '7', '--yes'])
+    assert result.exit_code == 0, result.output
+    assert 'Deleted 40 users' in result.output
+    assert result.output.count('🧹') == 6   # 40 users in batches of 7
+    assert sorted(name for name, in db.session.query(User.username)) == sorted(f'sim{i}' for i in range(1, 31))
+    assert ConferenceChampionVote.query.count() == picks * 30 // 70
+    assert_tallies_match(runner)
+    assert db.session.query(WeeklyTally.ballots).filter_by(week=1).order_by(WeeklyTally.ballots.desc()).first()[0] <= 30
+
+@pytest.mark.storage_modes
+def test_clear_week_and_season(app, client):
+    generate_season(50, 3, seed=3)
+    freeze_week(1)
+    db.session.commit()
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(clear_command, ['week', '1', '--batch-size', '20', '--yes'])
+    assert result.exit_code == 0, result.output
+    assert 'Deleted 50 ballots from week 1' in result.output
+    assert ballot_weeks() == [2, 3]
+    assert db.session.get(FrozenWeek, 1) is None
+    assert client.get('/api/vote/consensus/1').get_json() == {'ranked': [], 'unranked': []}
+    assert client.get('/api/vote/consensus/2').get_json()['ranked'] != []
+    assert_tallies_match(runner)
+
+    # Refuses to run without confirmation
+    assert runner.invoke(clear_command, ['season'], input='n\n').exit_code != 0
+    assert ballot_weeks() == [2, 3]
+    result = runner.invoke(clear_command, ['season', '--yes'])
+    assert result.exit_code == 0, result.output
+    assert ballot_weeks() == []
+    assert ConferenceChampionVote.query.count() == 0
+    assert User.query.count() == 50
+    assert client.get('/api/vote/leaderboard/overall').get_json() == {'ranked': [], 'unranked': []}
+    assert_tallies_match(runner)
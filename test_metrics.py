@@ -0,0 +1,38 @@
+import re
+import pytest
+
+def metric(text, name, endpoint):
+    match = re.search(rf'^{name}{{endpoint="{endpoint}"}} (\S+)$', text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+def scrape(client):
+    response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-me'})
+    assert response.status_code == 200
+    return response.get_data(as_text=True)
+
+def test_metrics_are_off_without_a_token(app, client):
+    assert app.config['METRICS_TOKEN'] is None
+    assert client.get('/metrics').status_code == 404
+
+@pytest.mark.parametrize('app', [{'METRICS_TOKEN': 'scrape-me'}], indirect=True)
+def test_metrics_require_the_token(app, client):
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert 'http_request_duration_seconds' in scrape(client)
+
+@pytest.mark.parametrize('app', [{'METRICS_TOKEN': 'scrape-me'}], indirect=True)
+def test_streamed_responses_are_recorded_when_closed(app, client, seed):
+    seed(teams=25, voters=30, weeks=(1,))
+
+    endpoint = 'vote.test_votes_stream'
+    before = scrape(client)
+    response = client.get('/api/vote/test/votes/1/stream')
+    body = response.get_data()
+    response.close()
+    after = scrape(client)
+
+    assert len(body.splitlines()) == 30
+    assert metric(after, 'http_response_size_bytes_sum', endpoint) - metric(before, 'http_response_size_bytes_sum', endpoint) == len(body)
+    assert metric(after, 'http_request_sql_statements_count', endpoint) - metric(before, 'http_request_sql_statements_count', endpoint) == 1
+    # The ballots are read while the body streams, after the view has returned
+    assert metric(after, 'http_request_sql_statements_sum', endpoint) - metric(before, 'http_request_sql_statements_sum', endpoint) >= 1
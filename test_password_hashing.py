@@ -0,0 +1,89 @@
+import threading
+import pytest
+from werkzeug.security import generate_password_hash, DEFAULT_PBKDF2_ITERATIONS
+from backend.app.models import db, User
+from backend.app.passwords import password_hasher
+
+POOLED = {'PASSWORD_HASH_WORKERS': 1, 'PASSWORD_HASH_MAX_PENDING': 1}
+
+@pytest.mark.parametrize('app', [POOLED], indirect=True)
+def test_register_and_login_hash_on_the_pool(app, client):
+    before = password_hasher.stats()
+    assert client.post('/api/auth/register', json={'username': 'alice', 'password': 'pw'}).status_code == 200
+    assert client.post('/api/auth/login', json={'username': 'alice', 'password': 'nope'}).status_code == 401
+    assert client.post('/api/auth/login', json={'username': 'alice', 'password': 'pw'}).status_code == 200
+    assert User.query.filter_by(username='alice').one().password_hash.startswith('pbkdf2:sha256:1000$')
+    after = password_hasher.stats()
+    assert {name: after[name] - before[name] for name in ('hashed', 'verified', 'mismatched')} == {'hashed': 1, 'verified': 1, 'mismatched': 1}
+    assert after['in_flight'] == 0
+
+def test_login_upgrades_hash_to_current_work_factor(app, client):
+    rehashed = password_hasher.stats()['rehashed']
+    db.session.add(User(username='old', password_hash=generate_password_hash('pw', 'pbkdf2:sha256:500')))
+    db.session.commit()
+
+    assert client.post('/api/auth/login', json={'username': 'old', 'password': 'pw'}).status_code == 200
+    db.session.expire_all()
+    upgraded = User.query.filter_by(username='old').one().password_hash
+    assert upgraded.startswith('pbkdf2:sha256:1000$')
+    assert not password_hasher.needs_rehash(upgraded)
+    assert password_hasher.stats()['rehashed'] == rehashed + 1
+
+    # Already current: nothing to rewrite
+    assert client.post('/api/auth/login', json={'username': 'old', 'password': 'pw'}).status_code == 200
+    assert password_hasher.stats()['rehashed'] == rehashed + 1
+
+@pytest.mark.parametrize('app', [POOLED], indirect=True)
+def test_saturated_pool_fails_fast(app, client):
+    client.post('/api/auth/register', json={'username': 'bob', 'password': 'pw'})
+    rejected = password_hasher.stats()['rejected']
+    _, slots = password_hasher._ensure_pool()
+    slots.acquire()  # stand-in for a hash that is still running
+    try:
+        response = client.post('/api/auth/login', json={'username': 'bob', 'password': 'pw'})
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+        assert client.post('/api/auth/register', json={'username': 'carol', 'password': 'pw'}).status_code == 503
+    finally:
+        slots.release()
+    assert password_hasher.stats()['rejected'] == rejected + 2
+    assert client.post('/api/auth/login', json={'username': 'bob', 'password': 'pw'}).status_code == 200
+
+@pytest.mark.parametrize('app', [{'PASSWORD_HASH_WORKERS': 2, 'PASSWORD_HASH_MAX_PENDING': 64}], indirect=True)
+def test_counters_are_exact_under_concurrent_requests(app):
+    password_hash = generate_password_hash('pw', app.config['PASSWORD_HASH_METHOD'])
+    before = password_hasher.stats()
+
+    def verify():
+        for _ in range(8):
+            assert password_hasher.verify(password_hash, 'pw')
+
+    threads = [threading.Thread(target=verify) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    after = password_hasher.stats()
+    assert after['verified'] - before['verified'] == 64
+    assert after['in_flight'] == 0
+
+@pytest.mark.parametrize('configured, stored, rehash', [
+    ('scrypt', 'scrypt:32768:8:1', False),
+    ('scrypt:32768:8:1', 'scrypt:16384:8:1', True),
+    ('pbkdf2', f'pbkdf2:sha256:{DEFAULT_PBKDF2_ITERATIONS}', False),
+    ('pbkdf2:sha256', f'pbkdf2:sha256:{DEFAULT_PBKDF2_ITERATIONS}', False),
+    ('pbkdf2:sha256:1000', 'pbkdf2:sha256:500', True),
+    ('pbkdf2:sha256:1000', 'pbkdf2:sha512:1000', True),
+    ('scrypt', f'pbkdf2:sha256:{DEFAULT_PBKDF2_ITERATIONS}', True),
+    ('pbkdf2', 'scrypt:32768:8:1', True),
+])
+def test_needs_rehash_compares_full_methods(app, configured, stored, rehash):
+    app.config['PASSWORD_HASH_METHOD'] = configured
+    assert password_hasher.needs_rehash(f'{stored}$salt$digest') is rehash
+    # What Werkzeug stores for the configured method never needs a rehash
+    if configured.startswith('pbkdf2'):
+        assert not password_hasher.needs_rehash(generate_password_hash('pw', configured))
+
+def test_unrecognised_hashes_need_a_rehash(app):
+    for password_hash in ('plain-text', 'sha256$salt$digest', 'scrypt:1$salt$digest'):
+        assert password_hasher.needs_rehash(password_hash)
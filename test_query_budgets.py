@@ -0,0 +1,128 @@
+"""Per-endpoint SQL statement budgets.
+
+Every auth/vote route runs with the process-local caches cold, first against
+a small dataset and again after teams, voters and weeks of ballots have been
+added. The statement count must stay within the route's budget and must not
+grow with the data (no N+1 queries).
+"""
+
+import random
+import pytest
+from sqlalchemy import insert
+from backend.app.models import db, Team, User
+from backend.app.ingest import write_ballots
+from backend.app.catalog import team_catalog
+from backend.app.tally import cumulative_tally
+from backend.app.cache import response_cache
+from backend.app.identity import identity_cache
+from backend.app.scoring import scoring_engine
+from backend.app.snapshots import freeze_week, is_frozen
+
+# Cold-cache budgets: identity lookup, team catalog load and data-version checks included
+BUDGETS = {
+    'auth.register': 2,
+    'auth.login': 1,
+    'auth.logout': 0,
+    'auth.get_current_user': 1,
+    'vote.get_teams': 2,
+    'vote.submit_vote': 10,
+    'vote.submit_conference_champions': 4,
+    'vote.consensus_conference_champions': 2,
+    'vote.consensus': 5,
+    'vote.week_movement': 6,
+    'vote.scoring_rules': 0,
+    'vote.consensus_by_rule': 5,
+    'vote.schulze': 5,
+    'vote.overall_leaderboard': 5,
+    'vote.range_leaderboard': 5,
+    'vote.cache_stats': 0,
+    'vote.ingest_stats': 0,
+    'vote.my_votes': 4,
+    'vote.test_votes': 3,
+    'vote.test_votes_stream': 3,
+    'vote.test_stats': 2,
+}
+
+def route_requests(round_no):
+    """(endpoint, method, path, json, logged_in) for every auth/vote route"""
+    return [
+        ('auth.register', 'POST', '/api/auth/register', {'username': f'newcomer{round_no}', 'password': 'pw'}, False),
+        ('auth.login', 'POST', '/api/auth/login', {'username': 'voter0', 'password': 'pw'}, False),
+        ('auth.logout', 'POST', '/api/auth/logout', None, True),
+        ('auth.get_current_user', 'GET', '/api/auth/me', None, True),
+        ('vote.get_teams', 'GET', '/api/vote/teams', None, False),
+        ('vote.submit_vote', 'POST', '/api/vote/submit_vote',
+         {'week': 1, 'rankings': [f'Team {i}' for i in range(25, 0, -1)]}, True),
+        ('vote.submit_conference_champions', 'POST', '/api/vote/submit_conference_champions',
+         {'champions': {'SEC': 'Team 1', 'ACC': 'Team 2', 'Big Ten': 'Team 3'}}, True),
+        ('vote.consensus_conference_champions', 'GET', '/api/vote/consensus_conference_champions', None, False),
+        ('vote.consensus', 'GET', '/api/vote/consensus/1', None, False),
+        ('vote.week_movement', 'GET', '/api/vote/movement/9', None, False),
+        ('vote.scoring_rules', 'GET', '/api/vote/consensus/rules', None, False),
+        ('vote.consensus_by_rule', 'GET', '/api/vote/consensus/1/trimmed_mean', None, False),
+        ('vote.schulze', 'GET', '/api/vote/schulze/1', None, False),
+        ('vote.overall_leaderboard', 'GET', '/api/vote/leaderboard/overall', None, False),
+        ('vote.range_leaderboard', 'GET', '/api/vote/leaderboard/weeks/1/2', None, False),
+        ('vote.cache_stats', 'GET', '/api/vote/cache/stats', None, False),
+        ('vote.ingest_stats', 'GET', '/api/vote/ingest/stats', None, False),
+        ('vote.my_votes', 'GET', '/api/vote/my_votes', None, True),
+        ('vote.test_votes', 'GET', '/api/vote/test/votes/1', None, False),
+        ('vote.test_votes_stream', 'GET', '/api/vote/test/votes/1/stream', None, False),
+        ('vote.test_stats', 'GET', '/api/vote/test/stats', None, False),
+    ]
+
+def grow(teams, voters, weeks, rng):
+    """Add teams and voters until there are at least the given counts, then ballot every voter for every open week"""
+    existing_teams = Team.query.count()
+    db.session.execute(insert(Team), [{'name': f'Team {i}'} for i in range(existing_teams + 1, teams + 1)])
+    existing_voters = User.query.count()
+    db.session.execute(insert(User), [{'username': f'voter{i}', 'password_hash': 'x'} for i in range(existing_voters, voters)])
+    team_ids = [team_id for team_id, in db.session.query(Team.id)]
+    user_ids = [user_id for user_id, in db.session.query(User.id)]
+    open_weeks = [week for week in list(range(1, weeks + 1)) + [9] if not is_frozen(week)]
+    write_ballots([(user_id, week, rng.sample(team_ids, 25)) for week in open_weeks for user_id in user_ids])
+    db.session.commit()
+
+def measure(app, count_queries, user_id, round_no):
+    counts = {}
+    for endpoint, method, path, payload, logged_in in route_requests(round_no):
+        client = app.test_client()
+        if logged_in:
+            with client.session_transaction() as sess:
+                sess['user_id'] = user_id
+        team_catalog.clear()
+        cumulative_tally.clear()
+        response_cache.clear()
+        identity_cache.clear()
+        scoring_engine.clear()
+        db.session.remove()  # start each request with an empty identity map
+        with count_queries() as queries:
+            response = client.open(path, method=method, json=payload)
+            response.get_data()  # run streamed bodies inside the count
+        assert response.status_code < 400, (endpoint, response.get_json())
+        counts[endpoint] = queries.count
+    return counts
+
+def test_every_route_has_a_budget(app):
+    endpoints = {rule.endpoint for rule in app.url_map.iter_rules() if rule.endpoint.split('.')[0] in ('auth', 'vote')}
+    assert endpoints == set(BUDGETS)
+    assert {endpoint for endpoint, *_ in route_requests(0)} == set(BUDGETS)
+
+@pytest.mark.storage_modes
+def test_statement_counts_stay_within_budget_as_data_grows(app, count_queries):
+    rng = random.Random(3)
+    user = User(username='voter0')
+    user.set_password('pw')
+    db.session.add(user)
+    db.session.commit()
+
+    grow(teams=30, voters=3, weeks=1, rng=rng)
+    freeze_week(9)
+    db.session.commit()
+    small = measure(app, count_queries, user.id, 1)
+    grow(teams=260, voters=80, weeks=3, rng=rng)
+    large = measure(app, count_queries, user.id, 2)
+
+    for endpoint, budget in BUDGETS.items():
+        assert large[endpoint] == small[endpoint], f'{endpoint} grows with data: {small[endpoint]} -> {large[endpoint]}'
+        assert large[endpoint] <= budget, f'{endpoint} ran {large[endpoint]} statements, budget is {budget}'
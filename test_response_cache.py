@@ -0,0 +1,111 @@
+import threading
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from backend.app import cache
+from backend.app.cache import ResponseCache
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the cache's monotonic clock with one the test moves by hand"""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(cache, 'time', SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+def counting(body):
+    calls = []
+    def compute():
+        calls.append(body)
+        return body
+    return compute, calls
+
+def test_version_change_and_invalidate_recompute(clock):
+    responses = ResponseCache()
+    compute, calls = counting(b'v1')
+    assert responses.lookup(('consensus', 1), 1, compute) == (1, b'v1')
+    assert responses.lookup(('consensus', 1), 1, compute) == (1, b'v1')
+    assert len(calls) == 1
+
+    compute, calls = counting(b'v2')
+    assert responses.lookup(('consensus', 1), 2, compute) == (2, b'v2')
+    assert responses.get_or_compute(('consensus', 2), 2, compute) == b'v2'
+    assert len(calls) == 2
+
+    responses.invalidate(lambda key: key[1] == 1)
+    compute, calls = counting(b'v2 again')
+    assert responses.get_or_compute(('consensus', 1), 2, compute) == b'v2 again'
+    assert responses.get_or_compute(('consensus', 2), 2, compute) == b'v2'
+    assert len(calls) == 1
+    stats = responses.stats()
+    assert (stats['hits'], stats['misses'], stats['recomputes'], stats['invalidations']) == (2, 2, 2, 1)
+
+def test_ttl_expiry(clock):
+    responses = ResponseCache(ttl=60)
+    compute, calls = counting(b'body')
+    responses.get_or_compute('key', 1, compute)
+    clock.now += 59
+    responses.get_or_compute('key', 1, compute)
+    assert len(calls) == 1
+    clock.now += 2
+    responses.get_or_compute('key', 1, compute)
+    assert len(calls) == 2
+    assert responses.stats()['recomputes'] == 1
+
+def test_lru_eviction(clock):
+    responses = ResponseCache(max_entries=2)
+    for key in 'ab':
+        responses.get_or_compute(key, 1, lambda: key.encode())
+    responses.get_or_compute('a', 1, lambda: b'unused')   # a is now the most recently used
+    responses.get_or_compute('c', 1, lambda: b'c')
+    assert responses.stats()['entries'] == 2 and responses.stats()['evictions'] == 1
+
+    compute, calls = counting(b'b again')
+    assert responses.get_or_compute('b', 1, compute) == b'b again'
+    assert responses.get_or_compute('c', 1, compute) == b'c'
+    assert calls == [b'b again']
+
+    responses.configure(max_entries=1)
+    assert responses.stats()['entries'] == 1
+
+def test_one_thread_recomputes_while_the_rest_get_the_stale_body(clock):
+    responses = ResponseCache()
+    responses.get_or_compute('key', 1, lambda: b'old')
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_compute():
+        calls.append(1)
+        started.set()
+        assert release.wait(5)
+        return b'new'
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        owner = pool.submit(responses.lookup, 'key', 2, slow_compute)
+        assert started.wait(5)
+        # Every other caller is answered at once with the old body and its version
+        assert [responses.lookup('key', 2, slow_compute) for _ in range(5)] == [(1, b'old')] * 5
+        release.set()
+        assert owner.result(5) == (2, b'new')
+    assert len(calls) == 1
+    assert responses.lookup('key', 2, slow_compute) == (2, b'new')
+    assert responses.stats()['stale_hits'] == 5
+
+def test_cold_key_is_computed_once_for_concurrent_callers(clock):
+    responses = ResponseCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_compute():
+        calls.append(1)
+        started.set()
+        assert release.wait(5)
+        return b'body'
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        owner = pool.submit(responses.get_or_compute, 'key', 1, slow_compute)
+        assert started.wait(5)
+        # Nothing to serve yet, so these wait for the first computation instead of repeating it
+        waiters = [pool.submit(responses.get_or_compute, 'key', 1, slow_compute) for _ in range(5)]
+        release.set()
+        assert [f.result(5) for f in [owner] + waiters] == [b'body'] * 6
+    assert len(calls) == 1
@@ -0,0 +1,101 @@
+import random
+import threading
+import pytest
+from backend.app import create_app
+from backend.app.models import db
+from backend.app.ingest import write_ballots
+from backend.app.pairwise import compute_pairs, stored_pairs, schulze_ranking
+from backend.app.tally import rebuild_tallies_command
+
+def test_wikipedia_example(app, client, seed):
+    # en.wikipedia.org/wiki/Schulze_method: 45 voters, winner order E > A > C > B > D
+    season = seed(teams='ABCDE', voters=45)
+    ids = season.teams
+    profile = [(5, 'ACBED'), (5, 'ADECB'), (8, 'BEDAC'), (3, 'CABED'), (7, 'CAEBD'), (2, 'CBADE'), (7, 'DCEBA'), (8, 'EBADC')]
+    voters = iter(season.user_ids)
+    write_ballots([(next(voters), 1, [ids[c] for c in order]) for count, order in profile for _ in range(count)])
+    db.session.commit()
+
+    payload = client.get('/api/vote/schulze/1').get_json()
+    assert [row['team'] for row in payload['ranking']] == list('EACBD')
+    assert [row['beats'] for row in payload['ranking']] == [4, 3, 2, 1, 0]
+
+@pytest.mark.storage_modes
+def test_pair_counts_follow_resubmitted_ballots(app, seed):
+    season = seed(teams=30, voters=25)
+    ids, voters = list(season.teams.values()), season.user_ids
+    rng = random.Random(2)
+    for _ in range(4):
+        # Everyone votes, then a random half changes their mind (sometimes twice in one batch)
+        write_ballots([(user_id, week, rng.sample(ids, 25)) for user_id in voters for week in (1, 2)])
+        write_ballots([(rng.choice(voters), 1, rng.sample(ids, 25)) for _ in range(15)])
+        db.session.commit()
+    assert stored_pairs() == compute_pairs()
+    result = app.test_cli_runner().invoke(rebuild_tallies_command, ['--check'])
+    assert result.exit_code == 0, result.output
+
+@pytest.mark.parametrize('mode', ['rows', 'packed'])
+def test_concurrent_writers_keep_counts_exact(tmp_path, seed, mode):
+    # Separate connections to a file database, so the writers really do overlap
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path}/votes.db',
+        'SQLALCHEMY_ENGINE_OPTIONS': {'connect_args': {'timeout': 30}},
+        'BALLOT_STORAGE': mode,
+    })
+    with app.app_context():
+        season = seed(teams=30, voters=40)
+        ids, voters = list(season.teams.values()), season.user_ids
+    errors = []
+
+    def writer(seed, user_ids):
+        rng = random.Random(seed)
+        try:
+            with app.app_context():
+                for _ in range(5):
+                    # Same teams in every transaction, each in a different order
+                    write_ballots([(user_id, week, rng.sample(ids, 25)) for user_id in user_ids for week in (1, 2)])
+                    db.session.commit()
+                db.session.remove()
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=writer, args=(i, voters[i::8])) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    with app.app_context():
+        assert stored_pairs() == compute_pairs()
+        result = app.test_cli_runner().invoke(rebuild_tallies_command, ['--check'])
+        assert result.exit_code == 0, result.output
+        db.session.remove()
+
+def test_partial_ballots_prefer_ranked_teams(app, seed):
+    # Ballots only rank some teams; an unranked team loses to every ranked one
+    season = seed(teams='ABCD', voters=5)
+    ids, voters = season.teams, season.user_ids
+    write_ballots([
+        (voters[0], 1, [ids['A'], ids['B']]),
+        (voters[1], 1, [ids['B'], ids['C']]),
+        (voters[2], 1, [ids['C'], ids['A']]),
+        (voters[3], 1, [ids['A']]),
+        (voters[4], 1, [ids['D'], ids['A']]),
+    ])
+    db.session.commit()
+    # d[A][B] = 3 (A above B, A alone, D-A ballot) vs d[B][A] = 1, and so on
+    ranking = {team_id: (place, beats) for team_id, place, beats in schulze_ranking(1)}
+    assert ranking[ids['A']] == (1, 3)
+    assert ranking[ids['D']][1] == 0
+
+def test_ranking_refreshes_after_a_vote(app, login, seed):
+    names = list(seed(teams=26).teams)
+    client = login('alice')
+    client.post('/api/vote/submit_vote', json={'week': 1, 'rankings': names[:25]})
+    assert client.get('/api/vote/schulze/1').get_json()['ranking'][0]['team'] == 'Team 1'
+    client.post('/api/vote/submit_vote', json={'week': 1, 'rankings': names[1:]})
+    ranking = client.get('/api/vote/schulze/1').get_json()['ranking']
+    assert ranking[0] == {'team': 'Team 2', 'place': 1, 'beats': 24}
+    assert 'Team 1' not in [row['team'] for row in ranking]
+    assert client.get('/api/vote/schulze/7').get_json() == {'week': 7, 'ranking': []}
@@ -0,0 +1,53 @@
+import pytest
+from backend.app.models import Team
+from backend.app.scoring import scoring_engine, BallotMatrix
+
+def seed_week(seed):
+    """60 voters ranking 25 of 40 teams in week 1; returns their ballots"""
+    return [team_ids for _, _, team_ids in seed(teams=40, voters=60, weeks=(1,), rng_seed=11).ballots]
+
+@pytest.mark.storage_modes
+def test_borda_rule_matches_sql_consensus(app, client, seed):
+    seed_week(seed)
+    assert client.get('/api/vote/consensus/1/borda').get_json() == client.get('/api/vote/consensus/1').get_json()
+
+def test_rules_against_plain_python(app, client, seed):
+    ballots = seed_week(seed)
+    name = {team.id: team.name for team in Team.query}
+    def expect(points_for_rank, keep=lambda team_id: True):
+        totals = {}
+        for ballot in ballots:
+            for rank, team_id in enumerate(ballot, start=1):
+                totals[team_id] = totals.get(team_id, 0) + points_for_rank(rank)
+        return {name[team_id]: points for team_id, points in totals.items()}
+    def scores(rule):
+        payload = client.get(f'/api/vote/consensus/1/{rule}').get_json()
+        return {row['team']: row['points'] for row in payload['ranked'] + payload['unranked']}
+
+    assert scores('first_place') == expect(lambda rank: rank == 1)
+    assert scores('top10') == expect(lambda rank: max(0, 11 - rank))
+    assert scores('dowdall') == pytest.approx({team: round(p, 4) for team, p in expect(lambda rank: 1 / rank).items()}, abs=1e-4)
+
+    trimmed = scores('trimmed_mean')
+    for team_id, team in name.items():
+        if team not in trimmed:
+            continue
+        per_voter = sorted(next((26 - r for r, t in enumerate(b, start=1) if t == team_id), 0) for b in ballots)
+        kept = per_voter[6:-6]  # 10% of 60 voters trimmed from each end
+        assert trimmed[team] == pytest.approx(sum(kept) / len(kept), abs=1e-4)
+
+def test_matrix_is_reused_until_the_week_changes(app, client, login, seed):
+    seed_week(seed)
+    first = scoring_engine.matrix(1)
+    assert scoring_engine.matrix(1) is first
+    assert first.ranks.shape == (60, 25)
+
+    client = login('late')
+    client.post('/api/vote/submit_vote', json={'week': 1, 'rankings': [f'Team {i}' for i in range(1, 26)]})
+    assert scoring_engine.matrix(1).voters == 61
+    assert client.get('/api/vote/consensus/1/nope').status_code == 404
+    assert 'borda' in client.get('/api/vote/consensus/rules').get_json()
+
+def test_empty_week(app):
+    assert BallotMatrix.load(9).voters == 0
+    assert scoring_engine.score(9, 'trimmed_mean') == []
@@ -0,0 +1,60 @@
+import os
+import runpy
+from backend.app.cache import response_cache
+from backend.app.catalog import team_catalog, CATALOG_SCOPE
+from backend.app.models import db, Team
+from backend.app.versions import bump_version
+from backend.app.vote import warm_caches
+
+def test_serving_profile_sizes_workers_from_cpus(monkeypatch):
+    monkeypatch.delenv('WEB_CONCURRENCY', raising=False)
+    monkeypatch.delenv('GUNICORN_THREADS', raising=False)
+    # The profile writes the capped PASSWORD_HASH_WORKERS back; restore it afterwards
+    monkeypatch.setenv('PASSWORD_HASH_WORKERS', '2')
+    conf = runpy.run_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py'))
+    assert conf['preload_app']
+    assert conf['workers'] == conf['available_cpus']() * 2 + 1
+    assert conf['threads'] >= 1
+
+    monkeypatch.setenv('WEB_CONCURRENCY', '3')
+    assert runpy.run_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py'))['workers'] == 3
+
+def test_hash_pools_fit_the_memory_budget(monkeypatch):
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py')
+    monkeypatch.delenv('PASSWORD_HASH_METHOD', raising=False)
+
+    def hash_workers(workers, requested, budget_mb):
+        monkeypatch.setenv('WEB_CONCURRENCY', str(workers))
+        monkeypatch.setenv('PASSWORD_HASH_WORKERS', str(requested))
+        monkeypatch.setenv('PASSWORD_HASH_MEMORY_MB', str(budget_mb))
+        runpy.run_path(path)
+        return int(os.environ['PASSWORD_HASH_WORKERS'])
+
+    # scrypt:32768:8:1 needs about 62 MB per hashing process
+    assert hash_workers(2, 2, 1024) == 2
+    assert hash_workers(4, 4, 512) == 2
+    assert hash_workers(9, 2, 512) == 1   # one per worker at least, logged as over budget
+    assert hash_workers(9, 0, 512) == 0
+
+def test_warm_up_fills_catalog_and_latest_week(app, login):
+    client = login('alice')
+    teams = client.get('/api/vote/teams').get_json()
+    assert teams == []  # no teams seeded yet: warm-up must still work
+    assert warm_caches() is None
+
+    db.session.add_all([Team(name=f'Team {i}') for i in range(1, 26)])
+    bump_version(CATALOG_SCOPE)
+    db.session.commit()
+    for week in (1, 3):
+        response = client.post('/api/vote/submit_vote', json={'week': week, 'rankings': [f'Team {i}' for i in range(1, 26)]})
+        assert response.status_code == 200, response.get_json()
+
+    team_catalog.clear()
+    response_cache.clear()
+    assert warm_caches() == 3
+    hits = response_cache.stats()['hits']
+    assert client.get('/api/vote/consensus/3').status_code == 200
+    assert response_cache.stats()['hits'] == hits + 1
+
+    app.config['CURRENT_WEEK'] = 1
+    assert warm_caches() == 1
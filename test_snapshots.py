@@ -0,0 +1,64 @@
+from backend.app.models import db, FrozenWeek, WeeklySnapshot
+from backend.app.ingest import write_ballots
+from backend.app.snapshots import freeze_week, freeze_week_command
+
+def cast(seed, ballots_by_week):
+    """Teams 1-30 and one voter per ballot; ballots_by_week is {week: [[team numbers]]}"""
+    season = seed(teams=30, voters=max(len(ballots) for ballots in ballots_by_week.values()))
+    team_ids = list(season.teams.values())
+    write_ballots([
+        (season.user_ids[i], week, [team_ids[n - 1] for n in ballot])
+        for week, ballots in ballots_by_week.items() for i, ballot in enumerate(ballots)
+    ])
+    db.session.commit()
+    return list(season.teams)
+
+def test_freeze_stores_final_consensus(app, client, seed):
+    cast(seed, {1: [list(range(1, 26)), [2, 1] + list(range(3, 26)), list(range(1, 26))]})
+    live = client.get('/api/vote/consensus/1').get_json()
+
+    result = app.test_cli_runner().invoke(freeze_week_command, ['1'])
+    assert result.exit_code == 0, result.output
+    frozen = db.session.get(FrozenWeek, 1)
+    assert frozen.voters == 3
+    top = WeeklySnapshot.query.filter_by(week=1).order_by(WeeklySnapshot.rank).limit(2).all()
+    assert [(row.rank, row.points, row.first_place_votes, row.ballots) for row in top] == [(1, 74, 2, 3), (2, 73, 1, 3)]
+    assert client.get('/api/vote/consensus/1').get_json() == live
+
+    # Frozen weeks are closed to voting and cannot be frozen twice
+    result = app.test_cli_runner().invoke(freeze_week_command, ['1'])
+    assert result.exit_code != 0 and 'already frozen' in result.output
+    assert app.test_cli_runner().invoke(freeze_week_command, ['5']).exit_code != 0
+
+def test_frozen_week_rejects_votes(app, login, seed):
+    names = cast(seed, {1: [list(range(1, 26))]})
+    freeze_week(1)
+    db.session.commit()
+    client = login('alice')
+    response = client.post('/api/vote/submit_vote', json={'week': 1, 'rankings': names[:25]})
+    assert response.status_code == 409
+    assert client.post('/api/vote/submit_vote', json={'week': 2, 'rankings': names[:25]}).status_code == 200
+
+def test_movement_between_frozen_weeks(app, client, seed):
+    # Week 2 swaps teams 1 and 2, moves team 5 to 10th and replaces team 25 with team 26
+    week2 = [2, 1, 3, 4, 6, 7, 8, 9, 10, 5] + list(range(11, 25)) + [26]
+    cast(seed, {1: [list(range(1, 26))], 2: [week2]})
+    assert client.get('/api/vote/movement/1').status_code == 404
+    freeze_week(1)
+    db.session.commit()
+    first = client.get('/api/vote/movement/1').get_json()
+    assert first['previous_week'] is None
+    assert {row['status'] for row in first['ranked']} == {'new'}
+
+    assert client.get('/api/vote/movement/2').status_code == 404
+    freeze_week(2)
+    db.session.commit()
+    payload = client.get('/api/vote/movement/2').get_json()
+    assert payload['previous_week'] == 1
+    rows = {row['team']: row for row in payload['ranked']}
+    assert (rows['Team 2']['rank'], rows['Team 2']['status'], rows['Team 2']['change']) == (1, 'up', 1)
+    assert (rows['Team 1']['status'], rows['Team 1']['change']) == ('down', -1)
+    assert (rows['Team 5']['rank'], rows['Team 5']['status'], rows['Team 5']['change']) == (10, 'down', -5)
+    assert rows['Team 3']['status'] == 'same'
+    assert rows['Team 26']['status'] == 'new' and rows['Team 26']['previous_rank'] is None
+    assert payload['dropped'] == [{'team': 'Team 25', 'previous_rank': 25}]
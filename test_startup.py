@@ -0,0 +1,46 @@
+import json
+import os
+import subprocess
+import sys
+import logging
+from sqlalchemy import inspect
+from backend.app import create_app
+from backend.app.models import db
+
+# Generous enough for a loaded CI runner; a boot that talks to the database or
+# imports Alembic on the serving path shows up well before this
+COLD_START_LIMIT_SECONDS = 3.0
+
+COLD_START = '''
+import json, sys, time
+started = time.perf_counter()
+from backend.app import create_app
+app = create_app({'BOOT_MODE': 'production', 'SQLALCHEMY_DATABASE_URI': 'sqlite:////nonexistent/dir/votes.db'})
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    'elapsed': elapsed,
+    'phases': sorted(app.extensions['startup_timings']),
+    'alembic_loaded': 'alembic' in sys.modules,
+    'numpy_loaded': 'numpy' in sys.modules,
+}))
+'''
+
+def test_production_cold_start_is_fast_and_never_touches_the_database():
+    env = {k: v for k, v in os.environ.items() if k not in ('FLASK_RUN_FROM_CLI', 'BOOT_MODE')}
+    out = subprocess.run([sys.executable, '-c', COLD_START], cwd=os.path.dirname(os.path.abspath(__file__)),
+                         env=env, capture_output=True, text=True, check=True)
+    # The database file cannot be opened, so any boot-time query would have raised
+    report = json.loads(out.stdout.strip().splitlines()[-1])
+    assert report['elapsed'] < COLD_START_LIMIT_SECONDS, report
+    assert report['phases'] == ['blueprints', 'config', 'extensions', 'imports']
+    assert not report['alembic_loaded']
+    assert not report['numpy_loaded']
+
+def test_development_boot_creates_tables_and_logs_phases(caplog):
+    with caplog.at_level(logging.INFO, logger='backend.app'):
+        app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'TESTING': True})
+    assert 'create_all' in app.extensions['startup_timings']
+    assert any('create_all' in record.getMessage() and 'Started in' in record.getMessage() for record in caplog.records)
+    with app.app_context():
+        assert 'vote' in inspect(db.engine).get_table_names()
+        db.drop_all()
@@ -0,0 +1,71 @@
+import threading
+import pytest
+from sqlalchemy import Select, event
+from sqlalchemy.dialects import postgresql
+from backend.app.models import db
+from backend.app.ballots import user_ballots
+from backend.app.tally import rebuild_tallies_command
+
+@pytest.mark.storage_modes
+def test_invalid_ballots_are_rejected_before_anything_is_stored(app, login, seed):
+    names = list(seed(teams=30).teams)
+    client = login('alice')
+
+    response = client.post('/api/vote/submit_vote', json={'week': 1, 'rankings': names[:26]})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'A ballot ranks at most 25 teams'}
+    response = client.post('/api/vote/submit_vote', json={'week': 1, 'rankings': names[:24] + ['Nowhere State']})
+    assert response.get_json()['unknown_teams'] == ['Nowhere State']
+    response = client.post('/api/vote/submit_vote', json={'week': 1, 'rankings': names[:24] + ['Team 3']})
+    assert response.get_json()['duplicate_teams'] == ['Team 3']
+    assert client.get('/api/vote/consensus/1').get_json() == {'ranked': [], 'unranked': []}
+
+    assert client.post('/api/vote/submit_vote', json={'week': 1, 'rankings': names[:25]}).status_code == 200
+    user_id = client.get('/api/auth/me').get_json()['id']
+    assert len(user_ballots(user_id)[1]) == 25
+    # The scoring matrix and the export take a full ballot
+    assert client.get('/api/vote/consensus/1/dowdall').status_code == 200
+
+def test_ballot_replace_locks_the_user_row_first(app, login, seed):
+    names = list(seed(teams=30).teams)
+    client = login('alice')
+    client.post('/api/vote/submit_vote', json={'week': 1, 'rankings': names[:25]})
+
+    statements = []
+    record = lambda conn, clause, multiparams, params, execution_options: statements.append(clause)
+    event.listen(db.engine, 'before_execute', record)
+    try:
+        assert client.post('/api/vote/submit_vote', json={'week': 1, 'rankings': names[5:30]}).status_code == 200
+    finally:
+        event.remove(db.engine, 'before_execute', record)
+    # Rendered for PostgreSQL: SQLite has no FOR UPDATE
+    sql = [str(clause.compile(dialect=postgresql.dialect())) if isinstance(clause, Select) else str(clause)
+           for clause in statements]
+    lock = next(i for i, statement in enumerate(sql) if statement.endswith('FOR UPDATE'))
+    delete = next(i for i, statement in enumerate(sql) if statement.startswith('DELETE FROM vote'))
+    assert 'FROM "user"' in sql[lock] and lock < delete
+
+@pytest.mark.postgres
+@pytest.mark.storage_modes
+def test_concurrent_resubmissions_of_one_ballot(app, login, seed):
+    ids = seed(teams=30).teams
+    names = list(ids)
+    clients = [login('alice'), login('alice')]
+    user_id = clients[0].get('/api/auth/me').get_json()['id']
+    barrier = threading.Barrier(len(clients))
+    statuses = []
+
+    def resubmit(client, rankings):
+        for _ in range(20):
+            barrier.wait()
+            statuses.append(client.post('/api/vote/submit_vote', json={'week': 1, 'rankings': rankings}).status_code)
+
+    threads = [threading.Thread(target=resubmit, args=(client, names[i:i + 25])) for i, client in enumerate(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert statuses == [200] * 40
+    assert user_ballots(user_id)[1] in ([ids[name] for name in names[i:i + 25]] for i in range(len(clients)))
+    result = app.test_cli_runner().invoke(rebuild_tallies_command, ['--check'])
+    assert result.exit_code == 0, result.output
@@ -0,0 +1,51 @@
+import pytest
+from backend.app.models import db, ConferenceChampionVote, WeeklyTally
+from backend.app.ballots import iter_ballots
+from backend.app.synthetic import generate_season_command, SYNTHETIC_PASSWORD
+from backend.app.tally import rebuild_tallies_command
+from backend.app.teams import FBS_CONFERENCES, FCS_CONFERENCES
+
+@pytest.mark.storage_modes
+def test_generated_season_is_consistent(app, client):
+    runner = app.test_cli_runner()
+    result = runner.invoke(generate_season_command, ['--users', '300', '--weeks', '3', '--seed', '4'])
+    assert result.exit_code == 0, result.output
+    assert 'Loaded 900 ballots' in result.output
+
+    # Tallies and pair counts were accumulated without reading the ballots back
+    result = runner.invoke(rebuild_tallies_command, ['--check'])
+    assert result.exit_code == 0, result.output
+    stats = client.get('/api/vote/test/stats').get_json()
+    assert stats['total_users'] == 300
+    assert [week['voters'] for week in stats['weeks']] == [300, 300, 300]
+
+    # Ballots are correlated: the consensus #1 is on nearly every ballot, not 25 in 229
+    for week in (1, 2, 3):
+        ballots = db.session.query(WeeklyTally.ballots).filter(
+            WeeklyTally.week == week).order_by(WeeklyTally.points.desc()).first()[0]
+        assert ballots > 0.9 * 300
+
+    conferences = len(FBS_CONFERENCES) + len(FCS_CONFERENCES) - 2   # independents with one team are skipped
+    assert ConferenceChampionVote.query.count() == 300 * conferences
+    assert 'SEC' in client.get('/api/vote/consensus_conference_champions').get_json()['consensus']
+
+    response = client.post('/api/auth/login', json={'username': 'sim42', 'password': SYNTHETIC_PASSWORD})
+    assert response.status_code == 200
+    result = runner.invoke(generate_season_command, ['--users', '10', '--weeks', '1'])
+    assert result.exit_code != 0 and 'already exist' in result.output
+
+@pytest.mark.postgres
+@pytest.mark.storage_modes
+def test_copy_load_on_postgres(app, client):
+    assert db.engine.dialect.name == 'postgresql'
+    runner = app.test_cli_runner()
+    result = runner.invoke(generate_season_command, ['--users', '500', '--weeks', '2', '--seed', '6'])
+    assert result.exit_code == 0, result.output
+
+    # Every ballot came through COPY intact (packed ballots as hex bytea) and matches the maintained tallies
+    ballots = list(iter_ballots())
+    assert len(ballots) == 1000
+    assert all(len(team_ids) == len(set(team_ids)) == 25 for _, _, team_ids in ballots)
+    result = runner.invoke(rebuild_tallies_command, ['--check'])
+    assert result.exit_code == 0, result.output
+    assert client.post('/api/auth/login', json={'username': 'sim500', 'password': SYNTHETIC_PASSWORD}).status_code == 200
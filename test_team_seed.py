@@ -0,0 +1,39 @@
+import time
+from backend.app.models import db, Team
+from backend.app.teams import TEAMS, seed_teams, seed_teams_command
+from backend.app.catalog import CATALOG_SCOPE
+from backend.app.versions import get_version
+
+def test_seed_is_one_statement_and_idempotent(app, count_queries):
+    with count_queries() as counter:
+        assert seed_teams() == len(TEAMS)
+    # The upsert plus the catalog version bump
+    assert counter.count == 2
+    db.session.commit()
+    version = get_version(CATALOG_SCOPE)
+
+    started = time.perf_counter()
+    with count_queries() as counter:
+        assert seed_teams() == 0
+    assert time.perf_counter() - started < 0.5
+    assert counter.count == 1
+    assert get_version(CATALOG_SCOPE) == version
+    alabama = Team.query.filter_by(name='Alabama').one()
+    assert (alabama.conference, alabama.division) == ('SEC', 'FBS')
+
+def test_seed_updates_changed_teams_only(app, client):
+    db.session.add_all([Team(name='Texas', conference='Big 12'), Team(name='Legacy U')])
+    db.session.commit()
+    texas_id = Team.query.filter_by(name='Texas').one().id
+
+    result = app.test_cli_runner().invoke(seed_teams_command)
+    assert result.exit_code == 0, result.output
+    # Texas is moved to the SEC in place, keeping its id (and so its votes)
+    texas = db.session.get(Team, texas_id)
+    assert (texas.name, texas.conference, texas.division) == ('Texas', 'SEC', 'FBS')
+    assert Team.query.filter_by(name='Legacy U').one().conference is None
+    assert Team.query.count() == len(TEAMS) + 1
+
+    teams = {team['name']: team for team in client.get('/api/vote/teams').get_json()}
+    assert teams['Montana'] == {'id': teams['Montana']['id'], 'name': 'Montana', 'conference': 'Big Sky', 'division': 'FCS'}
+    assert 'already up to date' in app.test_cli_runner().invoke(seed_teams_command).output
@@ -0,0 +1,74 @@
+import json
+import random
+import tracemalloc
+import pytest
+from sqlalchemy import insert
+from backend.app.models import db, Team, User, Vote, Ballot
+from backend.app.ballots import storage_mode, pack_team_ids, PACKED
+
+def seed_voters(first, count, week=1):
+    if Team.query.count() == 0:
+        db.session.execute(insert(Team), [{'name': f'Team {i}'} for i in range(1, 41)])
+    db.session.execute(insert(User), [{'username': f'voter{i:06d}', 'password_hash': 'x'} for i in range(first, first + count)])
+    team_ids = [team_id for team_id, in db.session.query(Team.id)]
+    rng = random.Random(first)
+    user_ids = [user_id for user_id, in db.session.query(User.id).filter(User.username >= f'voter{first:06d}')]
+    ballots = [(user_id, rng.sample(team_ids, 25)) for user_id in user_ids]
+    # Straight into the ballot table: these tests only read ballots back, not tallies
+    if storage_mode() == PACKED:
+        db.session.execute(insert(Ballot), [
+            {'user_id': user_id, 'week': week, 'team_ids': pack_team_ids(ballot)} for user_id, ballot in ballots
+        ])
+    else:
+        db.session.execute(insert(Vote), [
+            {'user_id': user_id, 'week': week, 'team_id': team_id, 'rank': rank}
+            for user_id, ballot in ballots for rank, team_id in enumerate(ballot, start=1)
+        ])
+    db.session.commit()
+
+def read_lines(client, path):
+    return [json.loads(line) for line in client.get(path).get_data(as_text=True).splitlines()]
+
+def streamed_peak(client, path):
+    """Peak traced memory while consuming a streamed response chunk by chunk"""
+    response = client.get(path, buffered=False)
+    tracemalloc.start()
+    try:
+        lines = sum(chunk.count(b'\n') for chunk in response.response)
+        return tracemalloc.get_traced_memory()[1], lines
+    finally:
+        tracemalloc.stop()
+        response.close()
+
+@pytest.mark.storage_modes
+def test_stream_matches_json_and_pages_by_cursor(app, client):
+    seed_voters(0, 30)
+    expected = client.get('/api/vote/test/votes/1').get_json()['votes']
+    response = client.get('/api/vote/test/votes/1/stream')
+    assert response.mimetype == 'application/x-ndjson'
+    assert {line['username']: line['votes'] for line in read_lines(client, '/api/vote/test/votes/1/stream')} == expected
+
+    seen, after = [], None
+    while True:
+        lines = read_lines(client, '/api/vote/test/votes/1/stream?limit=7' + (f'&after={after}' if after else ''))
+        if 'next_after' in lines[-1]:
+            after = lines.pop()['next_after']
+            seen += [line['username'] for line in lines]
+            assert len(lines) == 7
+        else:
+            seen += [line['username'] for line in lines]
+            break
+    assert seen == sorted(expected)
+    assert client.get('/api/vote/test/votes/1/stream?limit=0').status_code == 400
+
+@pytest.mark.storage_modes
+def test_stream_memory_stays_flat_as_voters_grow(app, client):
+    # Both sizes span several fetch chunks (1000 packed ballots / 5000 vote rows)
+    seed_voters(0, 3000)
+    small_peak, small_lines = streamed_peak(client, '/api/vote/test/votes/1/stream')
+    seed_voters(3000, 9000)
+    large_peak, large_lines = streamed_peak(client, '/api/vote/test/votes/1/stream')
+
+    assert (small_lines, large_lines) == (3000, 12000)
+    # 4x the voters, about the same memory: only a fetch chunk or two is alive at a time
+    assert large_peak < small_peak * 1.25, (small_peak, large_peak)